@@ -1,10 +1,14 @@
 # NuRV client imports
+import os
 import sys
-from omniORB import CORBA
 from omniORB import any
 import Monitor
 import CosNaming
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "runtime-monitoring-tools"))
+from common.monitor_client import ConnectionLost, MonitorSession
+
 # Segmentation imports
 import cv2
 import torch
@@ -46,35 +50,17 @@ if len(sys.argv) < 2:
     print("Usage: run_experiment.py -ORBInitRef NameService=IOR:...")
     sys.exit(1)
 
-orb = CORBA.ORB_init(sys.argv, CORBA.ORB_ID)
-
-# Obtain a reference to the root naming context
-obj = orb.resolve_initial_references("NameService");
-rootContext = obj._narrow(CosNaming.NamingContext)
-
-if rootContext is None:
-    print("Failed to narrow the root naming context")
-    sys.exit(1)
-
-# Resolve the name "NuRV/Monitor/Service"
-name = [CosNaming.NameComponent("NuRV", ""),
-        CosNaming.NameComponent("Monitor", ""),
-        CosNaming.NameComponent("Service", "")]
-#print(name)
+# The session caches the service IOR between runs (skipping the name service).
+# The bootstrap and reset retry on a dropped connection; a heartbeat does not
+# (a new connection means a fresh monitor), so a lost heartbeat ends the run.
+session = MonitorSession(sys.argv[1:])
 try:
-    obj = rootContext.resolve(name)
-
-#except Exception as ex:
-#    print(ex)
+    service = session.connect()
 except CosNaming.NamingContext.NotFound as ex:
     print("Name not found")
     sys.exit(1)
-
-# Narrow the object to an Example::Echo
-service = obj._narrow(Monitor.MonitorService)
-
-if service is None:
-    print("Object reference is not an Monitor::Service")
+except RuntimeError as ex:     # root context or Monitor::Service narrow failed
+    print(ex)
     sys.exit(1)
 
 
@@ -112,7 +98,8 @@ def predict(image_tensor):
 
 
 # Reset the path history
-service.reset(any.to_any(0), True)
+session.reset(any.to_any(0), True)
+session.report()
 
 
 # Print current evaluation function (state_count, binary_vector.tolist(), flag, state_time, fps)
@@ -134,7 +121,7 @@ def send_in_camera_view(
     state_expr = "inCameraView" if in_camera_view else "!inCameraView"
 
     # Index 0 is the monitor we built with `build_monitor -n 0`
-    verdict = service.heartbeat(any.to_any(0), state_expr)
+    verdict = session.heartbeat(any.to_any(0), state_expr)
 
     # Translate the enum to something human-readable
     text = {Monitor.RV_True:    "True",
@@ -172,7 +159,12 @@ try:
         flag = bool(binary_vector.sum().item())
         
         
-        send_in_camera_view(state_count, binary_vector, flag, state_time, fps)
+        try:
+            send_in_camera_view(state_count, binary_vector, flag, state_time, fps)
+        except ConnectionLost as ex:
+            print(f"Connection lost at step {state_count}: {ex}")
+            log.info("# connection lost at step %d: %s", state_count, ex)
+            sys.exit(1)
         print(f"Binary tool presence vector: {binary_vector.tolist()}, FPS: {fps:.2f}, state time: {state_time}")
 
         state_time = elapsed_time
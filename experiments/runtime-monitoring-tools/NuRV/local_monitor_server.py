@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the NuRV ``Monitor.MonitorService`` CORBA server.
+
+Serves ``reset`` / ``heartbeat`` from the in-process reference monitors in
+common/native.py and binds the service as ``NuRV/Monitor/Service`` in a
+naming context, so the online drivers and run_experiment.py run against it
+unchanged and without ``orbit-name-server-2`` / ``NuRV_orbit``.  With the
+monitor cost reduced to a few microseconds, the client's wall time is almost
+entirely CORBA marshalling and the driver loop.
+
+  python local_monitor_server.py --property in_camera_view
+  # prints: -ORBInitRef NameService=IOR:...
+  python monitor_one_tool_nurv_online.py -ORBInitRef NameService=IOR:... trace.csv
+
+Property index i of ``reset`` / ``heartbeat`` is the i-th ``--property``.
+Verdicts follow NuRV on safety properties: ``RV_Unknown`` while the property
+holds, ``RV_False`` from the first violation on until the next ``reset``.
+``not_stopping`` uses the stillness window of the NuRV models (the 100th
+consecutive stopped step, the first row counting as stopped), so verdicts
+match a real NuRV server step for step; ``--semantics rtamt`` flags the
+RTAMT drivers' step instead, one earlier.  States may carry ``stopped``
+instead of x, y, z, as sent for models/not_stopping_pushdown_*.smv.
+
+Without ``-ORBInitRef NameService=...`` the server hosts its own minimal
+naming context and prints its IOR; otherwise it binds into the given one.
+Needs the ``Monitor`` stubs/skeletons generated from NuRV's Monitor.idl
+(``omniidl -bpython``) on ``PYTHONPATH``.
+"""
+
+import argparse
+import os
+import signal
+import sys
+import time
+from omniORB import CORBA, any
+import CosNaming, CosNaming__POA
+import Monitor, Monitor__POA
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.monitor_client import split_orb_args
+from common.native import MONITORS, SEMANTICS, NotStopping
+
+SERVICE_NAME = (("NuRV", ""), ("Monitor", ""), ("Service", ""))
+
+# state variable → column of a six-column trace row, plus the pushed-down
+# ``stopped`` predicate after it
+COLUMNS = {"x": 0, "y": 1, "z": 2, "inCameraView": 3, "suturing": 4, "gauze": 5,
+           "stopped": 6}
+STOPPED = COLUMNS["stopped"]
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# NuSMV state expression → trace row
+# ──────────────────────────────────────────────────────────────────────────
+def parse_state(state: str, row: list) -> tuple:
+    """
+    Apply ``a = 1 & !b & c`` to ``row`` and return it as a tuple.
+
+    Variables missing from the expression keep their previous value.
+    """
+    for term in state.split("&"):
+        term = term.strip()
+        name, eq, value = term.partition("=")
+        if eq:
+            row[COLUMNS[name.strip()]] = int(value)
+        elif term.startswith("!"):
+            row[COLUMNS[term[1:].strip()]] = 0
+        else:
+            row[COLUMNS[term]] = 1
+    return tuple(row)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Servants
+# ──────────────────────────────────────────────────────────────────────────
+class MonitorService_i(Monitor__POA.MonitorService):
+
+    def __init__(self, properties: list, semantics: str = "nurv") -> None:
+        self.properties = properties
+        self.semantics  = semantics
+        self.monitors   = [None] * len(properties)
+        self.rows       = [None] * len(properties)
+        self.failed     = [False] * len(properties)
+        self.heartbeats = 0
+        self.busy_ns    = 0
+        for i in range(len(properties)):
+            self._reset(i)
+
+    def _index(self, prop) -> int:
+        i = any.from_any(prop)
+        if not 0 <= i < len(self.properties):
+            raise CORBA.BAD_PARAM()
+        return i
+
+    def _reset(self, i: int) -> None:
+        name = self.properties[i]
+        self.monitors[i] = NotStopping(semantics=self.semantics) \
+            if name == NotStopping.name else MONITORS[name]()
+        self.rows[i]     = [0] * len(COLUMNS)
+        self.failed[i]   = False
+
+    def reset(self, prop, flag):
+        self._reset(self._index(prop))
+
+    def heartbeat(self, prop, state):
+        t0 = time.perf_counter_ns()
+        i  = self._index(prop)
+        if not self.failed[i]:
+            row     = parse_state(state, self.rows[i])
+            monitor = self.monitors[i]
+            if "stopped" in state and isinstance(monitor, NotStopping):
+                ok = monitor.update_stopped(row[STOPPED])
+            else:
+                ok = monitor.update(row)
+            if not ok:
+                self.failed[i] = True
+        self.heartbeats += 1
+        self.busy_ns    += time.perf_counter_ns() - t0
+        return Monitor.RV_False if self.failed[i] else Monitor.RV_Unknown
+
+
+class NamingContext_i(CosNaming__POA.NamingContext):
+    """Flat name → object table; enough for bind/resolve of full paths."""
+
+    def __init__(self) -> None:
+        self.table = {}
+
+    @staticmethod
+    def _key(n) -> tuple:
+        return tuple((c.id, c.kind) for c in n)
+
+    def bind(self, n, obj):
+        if self._key(n) in self.table:
+            raise CosNaming.NamingContext.AlreadyBound()
+        self.table[self._key(n)] = obj
+
+    def rebind(self, n, obj):
+        self.table[self._key(n)] = obj
+
+    def resolve(self, n):
+        try:
+            return self.table[self._key(n)]
+        except KeyError:
+            raise CosNaming.NamingContext.NotFound(
+                CosNaming.NamingContext.missing_node, n)
+
+    def unbind(self, n):
+        if self.table.pop(self._key(n), None) is None:
+            raise CosNaming.NamingContext.NotFound(
+                CosNaming.NamingContext.missing_node, n)
+
+    def list(self, how_many):
+        bindings = [CosNaming.Binding([CosNaming.NameComponent(i, k)
+                                       for i, k in key], CosNaming.nobject)
+                    for key in self.table]
+        return bindings[:how_many], None
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Registration
+# ──────────────────────────────────────────────────────────────────────────
+def bind_service(root, obj) -> None:
+    """Bind ``obj`` as NuRV/Monitor/Service, creating missing contexts."""
+    ctx = root
+    for id_, kind in SERVICE_NAME[:-1]:
+        comp = [CosNaming.NameComponent(id_, kind)]
+        try:
+            ctx = ctx.bind_new_context(comp)
+        except CosNaming.NamingContext.AlreadyBound:
+            ctx = ctx.resolve(comp)._narrow(CosNaming.NamingContext)
+    ctx.rebind([CosNaming.NameComponent(*SERVICE_NAME[-1])], obj)
+
+
+def main() -> None:
+    orb_args, rest = split_orb_args(sys.argv[1:])
+    ap = argparse.ArgumentParser(
+        usage="python local_monitor_server.py [-ORBInitRef NameService=IOR:<IOR>] "
+              "--property NAME [NAME ...]")
+    ap.add_argument("--property", nargs="+", default=["in_camera_view"],
+                    choices=list(MONITORS),
+                    help="monitor for property index 0, 1, …")
+    ap.add_argument("--semantics", choices=SEMANTICS, default="nurv",
+                    help="stillness window of not_stopping: as the NuRV "
+                         "models (default) or as the RTAMT drivers")
+    ap.add_argument("--ior-file",
+                    help="also write the -ORBInitRef argument to this file")
+    args = ap.parse_args(rest)
+
+    orb = CORBA.ORB_init([sys.argv[0]] + orb_args, CORBA.ORB_ID)
+    poa = orb.resolve_initial_references("RootPOA")
+
+    servant = MonitorService_i(args.property, args.semantics)
+    service = servant._this()
+
+    # ``any`` is omniORB's module here, hence no builtin any()
+    external = [a for a in orb_args if a.startswith("NameService=")]
+    if external:
+        root = orb.resolve_initial_references("NameService") \
+                  ._narrow(CosNaming.NamingContext)
+        bind_service(root, service)
+        init_ref = None
+    else:
+        naming = NamingContext_i()
+        naming.rebind([CosNaming.NameComponent(*c) for c in SERVICE_NAME],
+                      service)
+        init_ref = "NameService=" + orb.object_to_string(naming._this())
+
+    poa._get_the_POAManager().activate()
+
+    print("Local MonitorService: "
+          + ", ".join(f"{i} = {p}" for i, p in enumerate(args.property)))
+    if init_ref:
+        print(f"-ORBInitRef {init_ref}", flush=True)
+        if args.ior_file:
+            with open(args.ior_file, "w") as fh:
+                fh.write(f"-ORBInitRef {init_ref}\n")
+
+    def stop(*_):
+        orb.shutdown(False)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    orb.run()
+
+    n = servant.heartbeats
+    print(f"\n▶ {n} heartbeats, monitor time {servant.busy_ns / 1e9:.3f} s"
+          + (f" ({servant.busy_ns / n / 1000:.2f} µs/heartbeat)" if n else ""))
+
+
+if __name__ == "__main__":
+    main()
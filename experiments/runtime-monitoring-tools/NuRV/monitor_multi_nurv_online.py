@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Several properties over one NuRV server in a single trace pass.
+
+Each property is a monitor index on the server (``build_monitor -n <i>``,
+or one ``--property`` of local_monitor_server.py).  Every row is split once,
+converted to one state expression per property, and queued to a per-index
+``HeartbeatSender``; the senders run concurrently, each in step order, so
+up to one heartbeat per property is in flight.
+
+  python monitor_multi_nurv_online.py -ORBInitRef NameService=IOR:<IOR> \\
+      --property in_camera_view=0 not_stopping=1 suturing_gauze=2 trace.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+from omniORB import any
+import Monitor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.monitor_client import (ConnectionLost, HeartbeatSender,
+                                   MonitorSession, split_orb_args)
+from common.timeline import Timeline
+from common.timing import StepTimer, report_early_stop
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Row (split CSV fields) → state expression, per property
+# ──────────────────────────────────────────────────────────────────────────
+def in_camera_view(parts) -> str:
+    return "inCameraView" if parts[3].lstrip().startswith("1") else "!inCameraView"
+
+
+def not_stopping(parts) -> str:
+    return f"x = {int(parts[0])} & y = {int(parts[1])} & z = {int(parts[2])}"
+
+
+def suturing_gauze(parts) -> str:
+    return ("suturing" if parts[4].strip().startswith("1") else "!suturing") \
+        + " & " + ("gauze" if parts[5].strip().startswith("1") else "!gauze")
+
+
+CONVERTERS = {f.__name__: f for f in (in_camera_view, not_stopping, suturing_gauze)}
+
+VERDICT_TEXT = {Monitor.RV_True:    "True",
+                Monitor.RV_False:   "False",
+                Monitor.RV_Unknown: "Unknown"}
+
+
+def _prop_index(text: str) -> tuple:
+    name, _, index = text.partition("=")
+    if name not in CONVERTERS:
+        raise argparse.ArgumentTypeError(
+            f"unknown property {name!r} (choose from {', '.join(CONVERTERS)})")
+    return name, int(index or 0)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+def main() -> None:
+    orb_args, rest = split_orb_args(sys.argv[1:])
+    ap = argparse.ArgumentParser(
+        usage="python monitor_multi_nurv_online.py "
+              "-ORBInitRef NameService=IOR:<IOR> "
+              "--property NAME=INDEX [NAME=INDEX ...] <csv_file>")
+    ap.add_argument("csv_file")
+    ap.add_argument("--property", nargs="+", type=_prop_index, required=True,
+                    metavar="NAME=INDEX",
+                    help=f"monitor index per property ({', '.join(CONVERTERS)})")
+    ap.add_argument("--prefetch", type=int, default=64, metavar="N",
+                    help="states queued per property")
+    ap.add_argument("--stop-on-final", action="store_true",
+                    help="stop once every property has a final RV_False")
+    args = ap.parse_args(rest)
+
+    session = MonitorSession(orb_args)
+    session.connect()
+    props = [(name, index, any.to_any(index)) for name, index in args.property]
+    for _, _, prop in props:
+        session.reset(prop, True)
+    session.report()
+
+    # ── one pass over the trace, one sender per monitor index ───────────
+    timers = [StepTimer.from_env() for _ in props]
+    pipes  = [HeartbeatSender(session.heartbeat, prop, args.prefetch, timer,
+                              Monitor.RV_False)
+              for (_, _, prop), timer in zip(props, timers)]
+    feeds  = [(CONVERTERS[name], pipe.submit) for (name, _, _), pipe
+              in zip(props, pipes)]
+    last   = [None] * len(props)
+    lines  = [Timeline.from_env() for _ in props]
+
+    def collect(i, done):
+        if lines[i] is not None:
+            lines[i].extend(done)
+        if done:
+            last[i] = done[-1][1]
+
+    n_rows  = 0
+    n_steps = [0] * len(props)                    # heartbeats per property
+    left    = None
+    lost    = None                                # ConnectionLost
+    start   = time.time()
+    try:
+        with open(args.csv_file, "r", encoding="utf-8") as fh:
+            for step_idx, raw in enumerate(fh, 1):
+                parts = raw.rstrip("\n").split(",", 6)
+                # a row unusable for one property (short, or a bad value in
+                # its columns) is dropped for that property only
+                for i, (convert, submit) in enumerate(feeds):
+                    try:
+                        state = convert(parts)
+                    except (IndexError, ValueError):
+                        continue
+                    submit(step_idx, state)
+                    n_steps[i] += 1
+                n_rows += 1
+                if args.stop_on_final and all(p.first for p in pipes):
+                    left = sum(1 for _ in fh)
+                    break
+                if n_rows % 256 == 0:
+                    for i, pipe in enumerate(pipes):
+                        collect(i, pipe.drain())
+    except ConnectionLost as exc:
+        lost = exc
+    for i, pipe in enumerate(pipes):
+        try:
+            collect(i, pipe.close())
+        except ConnectionLost as exc:
+            lost = lost or exc
+    total = time.time() - start
+    first = [p.first and (p.first[0], p.first[1] - start) for p in pipes]
+
+    # ── verdict table ────────────────────────────────────────────────────
+    print(f"▶ Python wall-clock runtime: {total:.3f} s "
+          f"({n_rows} rows × {len(props)} properties)")
+    print(f"{'property':<16} {'index':>5} {'steps':>10} {'first violation':>16} "
+          f"{'at [s]':>8} {'last verdict':>13}")
+    for (name, index, _), n, fv, lv in zip(props, n_steps, first, last):
+        step, at = fv if fv else ("–", None)
+        print(f"{name:<16} {index:>5} {n:>10} {step:>16} "
+              f"{'–' if at is None else f'{at:.3f}':>8} "
+              f"{'pending' if lv is None else VERDICT_TEXT.get(lv, str(lv)):>13}")
+    extra = {}
+    if lost is not None:
+        print(f"✘ Connection lost at step {lost.step}: {lost}")
+        extra["aborted_at_step"] = lost.step
+    if left is not None:
+        extra.update(report_early_stop(max(fv[0] for fv in first), total,
+                                       n_rows, left))
+    for (name, index, _), n, fv, timer, timeline in zip(props, n_steps, first,
+                                                         timers, lines):
+        timer.report(f"monitor_multi_nurv_online:{name}", total, n,
+                     fv and fv[0], step_base=1, index=index,
+                     prefetch=args.prefetch, **extra, **session.record())
+        if timeline:
+            timeline.write(f"monitor_multi_nurv_online.{name}", args.csv_file,
+                           step_base=1)
+    if lost is not None:
+        sys.exit("✘ Run aborted, no verdict (the monitors lost their state)")
+
+
+if __name__ == "__main__":
+    main()
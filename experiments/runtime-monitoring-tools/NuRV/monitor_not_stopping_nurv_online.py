@@ -1,9 +1,17 @@
 
+import argparse
+import json
+import os
 import sys
-import time
-from omniORB import CORBA, any
+from omniORB import any
 import Monitor
-import CosNaming
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.monitor_client import MonitorSession, split_orb_args, sweep_prefetch
+from common.nurv_trace import PREDICATES
+from common.replay import aborted, replay_trace
+from common.timeline import Timeline
+from common.timing import StepTimer
 
 
 # ──────────────────────────────────────────────────────────────────────────
@@ -22,67 +30,133 @@ def csv_to_state(line: str) -> str:
     return f"x = {x} & y = {y} & z = {z}"
 
 
+def remapped(value_map: dict):
+    """
+    ``csv_to_state`` for a model with dense domains: each value becomes its
+    index in ``value_map`` (the ``.dense.json`` of tools/tighten_smv.py).
+    A value missing from the map ends the run: the model cannot express it.
+    """
+    mx, my, mz = ({v: i for i, v in enumerate(value_map[k])}
+                  for k in ("x", "y", "z"))
+
+    def convert(line: str) -> str:
+        parts = line.split(",", 3)
+        if len(parts) < 3:
+            return ""
+        try:
+            x = int(parts[0])
+            y = int(parts[1])
+            z = int(parts[2])
+        except ValueError:
+            return ""
+        try:
+            return f"x = {mx[x]} & y = {my[y]} & z = {mz[z]}"
+        except KeyError:
+            col, value = next((c, v) for c, v, m in
+                              (("x", x, mx), ("y", y, my), ("z", z, mz))
+                              if v not in m)
+            sys.exit(f"✘ {col} = {value} is not in the --remap value map "
+                     f"(row {line!r}); re-run tools/tighten_smv.py on a trace "
+                     f"that contains it")
+    return convert
+
+
+def pushed_down():
+    """
+    Converter for models/not_stopping_pushdown_*.smv: the ``stopped``
+    predicate is evaluated here and sent as the only proposition.
+    """
+    stopped = PREDICATES["stopped"]()
+
+    def convert(line: str) -> str:
+        parts = line.split(",", 3)
+        if len(parts) < 3:
+            return ""
+        try:
+            return "stopped" if stopped(parts) else "!stopped"
+        except ValueError:
+            return ""
+    return convert
+
+
+def read_states(csv_file: str, convert=csv_to_state):
+    """Yield ``(step, state)`` per usable row; steps are 1-based."""
+    with open(csv_file, "r", encoding="utf-8") as fh:
+        for step_idx, raw in enumerate(fh, 1):
+            state = convert(raw.rstrip("\n"))
+            if state:
+                yield step_idx, state
+
+
 # ──────────────────────────────────────────────────────────────────────────
 def main() -> None:
-    if len(sys.argv) < 3:
-        print("Usage: python monitor_not_stopping_nurv_online.py "
-              "-ORBInitRef NameService=IOR:<IOR> <csv_file>")
-        sys.exit(1)
-
-    orb_args, csv_file = sys.argv[1:-1], sys.argv[-1]
-
-    # ── CORBA bind ───────────────────────────────────────────────────────
-    orb   = CORBA.ORB_init(orb_args, CORBA.ORB_ID)
-    root  = orb.resolve_initial_references("NameService") \
-               ._narrow(CosNaming.NamingContext)
-    name  = [
-        CosNaming.NameComponent("NuRV", ""),
-        CosNaming.NameComponent("Monitor", ""),
-        CosNaming.NameComponent("Service", "")
-    ]
-    svc   = root.resolve(name)._narrow(Monitor.MonitorService)
-
-    hb    = svc.heartbeat            # local alias (saves attr-lookups)
+    orb_args, rest = split_orb_args(sys.argv[1:])
+    ap = argparse.ArgumentParser(
+        usage="python monitor_not_stopping_nurv_online.py "
+              "-ORBInitRef NameService=IOR:<IOR> [--prefetch N | --rate HZ] "
+              "[--pushdown | --remap MAP.json] <csv_file>")
+    ap.add_argument("csv_file")
+    ap.add_argument("--prefetch", type=int, default=0, metavar="N",
+                    help="states queued for a sender thread "
+                         "(0 = none; one heartbeat is in flight either way)")
+    ap.add_argument("--sweep", metavar="N,N,...",
+                    help="print throughput for each prefetch depth and exit")
+    ap.add_argument("--predecode", action="store_true",
+                    help="decode all states before the clock starts")
+    ap.add_argument("--rate", type=float, default=0.0, metavar="HZ",
+                    help="replay at a fixed rate, e.g. 30 (implies --predecode)")
+    ap.add_argument("--stop-on-final", action="store_true",
+                    help="stop sending heartbeats at the first RV_False")
+    encoding = ap.add_mutually_exclusive_group()
+    encoding.add_argument("--remap", metavar="MAP.json",
+                        help="send dense indices for a model from tools/tighten_smv.py")
+    encoding.add_argument("--pushdown", action="store_true",
+                        help="send the stopped predicate instead of x, y, z "
+                             "(server loaded with models/not_stopping_pushdown_*.smv)")
+    args = ap.parse_args(rest)
+
+    convert = csv_to_state
+    if args.remap:
+        with open(args.remap, encoding="utf-8") as fh:
+            convert = remapped(json.load(fh))
+
+    def states():
+        # pushed_down() remembers the previous row: one per replay
+        return read_states(args.csv_file,
+                           pushed_down() if args.pushdown else convert)
+
+    # ── CORBA bind (service IOR cached between runs) ────────────────────
+    session = MonitorSession(orb_args)
+    session.connect()
+
+    hb    = session.heartbeat        # local alias (saves attr-lookups)
     prop0 = any.to_any(0)
-    svc.reset(prop0, True)           # property index 0
 
-    # ── timing and violation tracking ───────────────────────────────────
-    start_wall = None
-    end_wall   = None
-    viol_step  = None
-    viol_time  = None
-    step_idx   = 1
-    max_dt    = 0.0
-    max_step  = None
+    if args.sweep:
+        sweep_prefetch(lambda: session.reset(prop0, True), hb, prop0,
+                       states, Monitor.RV_False,
+                       [int(w) for w in args.sweep.split(",")])
+        return
 
-    with open(csv_file, "r", encoding="utf-8") as fh:
-        for raw in fh:
-            state = csv_to_state(raw.rstrip("\n"))
-            if not state:
-                step_idx += 1
-                continue
-
-            if start_wall is None:
-                start_wall = time.time()   # timer starts *right before* 1st hb
-
-            t0=time.time()
-            verdict = hb(prop0, state)
-            t1=time.time()
-            dt = t1 - t0
-            if dt > max_dt:
-                max_dt = dt
-                max_step = step_idx
-            end_wall = t1         # updated after *each* heartbeat
-
-            if verdict == Monitor.RV_False and viol_step is None:
-                viol_step = step_idx
-                viol_time = end_wall - start_wall
-
-            step_idx += 1
-
-    total_wall = 0 if start_wall is None else end_wall - start_wall
-    print(f"Max per-step time: {max_dt*1000:.2f} ms at step {max_step}")
+    session.reset(prop0, True)       # property index 0
+    session.report()
+
+    # ── replay; the clock starts *right before* the 1st heartbeat ───────
+    timer = StepTimer.from_env()
+    timeline = Timeline.from_env()
+    n_steps, viol_step, viol_time, total_wall, extra = replay_trace(
+        hb, prop0, states(), timer, Monitor.RV_False,
+        args.prefetch, args.predecode, args.rate, args.stop_on_final, timeline)
+
+    print(f"Max per-step time: {timer.max_s*1000:.2f} ms at step {timer.max_step}")
     print(f"▶ Python wall-clock runtime: {total_wall:.3f} s")
+    timer.report("monitor_not_stopping_nurv_online",
+                 total_wall, n_steps, viol_step, step_base=1,
+                 pushdown=args.pushdown, **extra, **session.record())
+    if timeline:
+        timeline.write("monitor_not_stopping_nurv_online", args.csv_file, step_base=1)
+    if aborted(extra):
+        sys.exit("✘ Run aborted, no verdict (the monitor lost its state)")
     if viol_step is None:
         print("✔ No violation of not stopping for 100 steps found.")
     else:
@@ -1,9 +1,15 @@
 
+import argparse
+import os
 import sys
-import time
-from omniORB import CORBA, any
+from omniORB import any
 import Monitor
-import CosNaming
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.monitor_client import MonitorSession, split_orb_args, sweep_prefetch
+from common.replay import aborted, replay_trace
+from common.timeline import Timeline
+from common.timing import StepTimer
 
 
 # ────────────────────────────────────────────────────────────────────────
@@ -17,63 +23,65 @@ def csv_to_state(line: str) -> str:
     return "inCameraView" if parts[3].lstrip().startswith("1") else "!inCameraView"
 
 
-# ────────────────────────────────────────────────────────────────────────
-def main() -> None:
-    if len(sys.argv) < 3:
-        print("Usage: python _monitor_one_tool_nurv.py "
-              "-ORBInitRef NameService=IOR:<IOR> <csv_file>")
-        sys.exit(1)
-
-    orb_args, csv_file = sys.argv[1:-1], sys.argv[-1]
-
-    # CORBA bind
-    orb   = CORBA.ORB_init(orb_args, CORBA.ORB_ID)
-    root  = orb.resolve_initial_references("NameService") \
-               ._narrow(CosNaming.NamingContext)
-    name  = [CosNaming.NameComponent("NuRV", ""),
-             CosNaming.NameComponent("Monitor", ""),
-             CosNaming.NameComponent("Service", "")]
-    svc   = root.resolve(name)._narrow(Monitor.MonitorService)
-    hb    = svc.heartbeat          # local alias (saves an attr lookup)
-    prop0 = any.to_any(0)
-    svc.reset(prop0, True)
-
-    start_wall = None
-    end_wall   = None
-    viol_step  = None
-    viol_time  = None
-    step_idx   = 1
-    max_dt    = 0.0
-    max_step  = None
-
+def read_states(csv_file: str):
+    """Yield ``(step, state)`` per usable row; steps are 1-based."""
     with open(csv_file, "r", encoding="utf-8") as fh:
-        for raw in fh:
+        for step_idx, raw in enumerate(fh, 1):
             state = csv_to_state(raw.rstrip("\n"))
-            if not state:
-                step_idx += 1
-                continue
+            if state:
+                yield step_idx, state
+
 
-            if start_wall is None:
-                start_wall = time.time()        # timer starts here
+# ────────────────────────────────────────────────────────────────────────
+def main() -> None:
+    orb_args, rest = split_orb_args(sys.argv[1:])
+    ap = argparse.ArgumentParser(
+        usage="python monitor_one_tool_nurv_online.py "
+              "-ORBInitRef NameService=IOR:<IOR> [--prefetch N | --rate HZ] <csv_file>")
+    ap.add_argument("csv_file")
+    ap.add_argument("--prefetch", type=int, default=0, metavar="N",
+                    help="states queued for a sender thread "
+                         "(0 = none; one heartbeat is in flight either way)")
+    ap.add_argument("--sweep", metavar="N,N,...",
+                    help="print throughput for each prefetch depth and exit")
+    ap.add_argument("--predecode", action="store_true",
+                    help="decode all states before the clock starts")
+    ap.add_argument("--rate", type=float, default=0.0, metavar="HZ",
+                    help="replay at a fixed rate, e.g. 30 (implies --predecode)")
+    ap.add_argument("--stop-on-final", action="store_true",
+                    help="stop sending heartbeats at the first RV_False")
+    args = ap.parse_args(rest)
+
+    # CORBA bind (service IOR cached between runs)
+    session = MonitorSession(orb_args)
+    session.connect()
+    hb    = session.heartbeat      # local alias (saves an attr lookup)
+    prop0 = any.to_any(0)
 
-            t0=time.time()
-            verdict = hb(prop0, state)
-            t1=time.time()
-            dt = t1 - t0
-            if dt > max_dt:
-                max_dt = dt
-                max_step = step_idx
-            end_wall = t1              # updated after EACH heartbeat
+    if args.sweep:
+        sweep_prefetch(lambda: session.reset(prop0, True), hb, prop0,
+                       lambda: read_states(args.csv_file), Monitor.RV_False,
+                       [int(w) for w in args.sweep.split(",")])
+        return
 
-            if verdict == Monitor.RV_False and viol_step is None:
-                viol_step = step_idx
-                viol_time = end_wall - start_wall
+    session.reset(prop0, True)
+    session.report()
 
-            step_idx += 1
+    timer = StepTimer.from_env()
+    timeline = Timeline.from_env()
+    n_steps, viol_step, viol_time, total, extra = replay_trace(
+        hb, prop0, read_states(args.csv_file), timer, Monitor.RV_False,
+        args.prefetch, args.predecode, args.rate, args.stop_on_final, timeline)
 
-    total = 0 if start_wall is None else end_wall - start_wall
-    print(f"Max per-step time: {max_dt*1000:.2f} ms at step {max_step}")
+    print(f"Max per-step time: {timer.max_s*1000:.2f} ms at step {timer.max_step}")
     print(f"▶ Python wall-clock runtime: {total:.3f} s")
+    timer.report("monitor_one_tool_nurv_online",
+                 total, n_steps, viol_step, step_base=1,
+                 **extra, **session.record())
+    if timeline:
+        timeline.write("monitor_one_tool_nurv_online", args.csv_file, step_base=1)
+    if aborted(extra):
+        sys.exit("✘ Run aborted, no verdict (the monitor lost its state)")
     if viol_step is None:
         print("✔ No violation of G(inCameraView) found.")
     else:
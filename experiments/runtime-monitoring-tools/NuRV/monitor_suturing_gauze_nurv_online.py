@@ -1,48 +1,49 @@
 #!/usr/bin/env python3
 
-import sys, time
-from omniORB import CORBA, any
-import Monitor, CosNaming
+import argparse, os, sys
+from omniORB import any
+import Monitor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.monitor_client import MonitorSession, split_orb_args, sweep_prefetch
+from common.replay import aborted, replay_trace
+from common.timeline import Timeline
+from common.timing import StepTimer
 
 def build_state(parts):
     return ("suturing" if parts[4].strip().startswith("1") else "!suturing") + " & " +            ("gauze" if parts[5].strip().startswith("1") else "!gauze")
 
-def main():
-    if len(sys.argv)<3:
-        print("Usage: python monitor_suture_once_online.py -ORBInitRef NameService=IOR:<IOR> <csv>")
-        sys.exit(1)
-    orb_args, csv_file = sys.argv[1:-1], sys.argv[-1]
-    orb = CORBA.ORB_init(orb_args, CORBA.ORB_ID)
-    root= orb.resolve_initial_references("NameService")._narrow(CosNaming.NamingContext)
-    name=[CosNaming.NameComponent("NuRV",""),CosNaming.NameComponent("Monitor",""),CosNaming.NameComponent("Service","")]
-    svc = root.resolve(name)._narrow(Monitor.MonitorService)
-    prop0= any.to_any(0)
-    svc.reset(prop0,True)
-    hb = svc.heartbeat
-    start=None; end=None
-    viol_step=None; viol_time=None
-    max_dt=0.0; max_step=None
-    step=1
+def read_states(csv_file):
     with open(csv_file) as fh:
-        for raw in fh:
+        for step, raw in enumerate(fh, 1):
             parts = raw.rstrip("\n").split(',',6)
-            if len(parts)<6:
-                step+=1; continue
-            state = build_state(parts)
-            if start is None:
-                start=time.time()
-            t0=time.time()
-            verdict = hb(prop0,state)
-            t1=time.time()
-            dt=t1-t0
-            if dt>max_dt: max_dt=dt; max_step=step
-            end=t1
-            if verdict==Monitor.RV_False and viol_step is None:
-                viol_step=step; viol_time=end-start
-            step+=1
-    total=end-start if start else 0
+            if len(parts)>=6:
+                yield step, build_state(parts)
+
+def main():
+    orb_args, rest = split_orb_args(sys.argv[1:])
+    ap = argparse.ArgumentParser(usage="python monitor_suturing_gauze_nurv_online.py -ORBInitRef NameService=IOR:<IOR> [--prefetch N | --rate HZ] <csv>")
+    ap.add_argument("csv_file")
+    ap.add_argument("--prefetch", type=int, default=0, metavar="N", help="states queued for a sender thread (0 = none; one heartbeat is in flight either way)")
+    ap.add_argument("--sweep", metavar="N,N,...", help="print throughput for each prefetch depth and exit")
+    ap.add_argument("--predecode", action="store_true", help="decode all states before the clock starts")
+    ap.add_argument("--rate", type=float, default=0.0, metavar="HZ", help="replay at a fixed rate, e.g. 30 (implies --predecode)")
+    ap.add_argument("--stop-on-final", action="store_true", help="stop sending heartbeats at the first RV_False")
+    args = ap.parse_args(rest)
+    session = MonitorSession(orb_args); session.connect()
+    prop0= any.to_any(0)
+    hb = session.heartbeat
+    if args.sweep:
+        sweep_prefetch(lambda: session.reset(prop0,True), hb, prop0, lambda: read_states(args.csv_file), Monitor.RV_False, [int(w) for w in args.sweep.split(",")])
+        return
+    session.reset(prop0,True); session.report()
+    timer=StepTimer.from_env(); timeline=Timeline.from_env()
+    n_steps, viol_step, viol_time, total, extra = replay_trace(hb, prop0, read_states(args.csv_file), timer, Monitor.RV_False, args.prefetch, args.predecode, args.rate, args.stop_on_final, timeline)
     print(f"▶ Python wall-clock runtime: {total:.3f} s")
-    print(f"Max per-step time: {max_dt*1000:.2f} ms at step {max_step}")
+    print(f"Max per-step time: {timer.max_s*1000:.2f} ms at step {timer.max_step}")
+    timer.report("monitor_suturing_gauze_nurv_online", total, n_steps, viol_step, step_base=1, **extra, **session.record())
+    if timeline: timeline.write("monitor_suturing_gauze_nurv_online", args.csv_file, step_base=1)
+    if aborted(extra): sys.exit("✘ Run aborted, no verdict (the monitor lost its state)")
     if viol_step is None:
         print("✔ No violation found.")
     else:
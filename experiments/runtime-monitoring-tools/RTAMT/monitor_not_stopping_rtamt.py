@@ -1,46 +1,54 @@
 
-import rtamt, sys, time
+import argparse, functools, os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.timing import Startup, StepTimer, report_batch, report_early_stop
+STARTUP = Startup()
+import rtamt
+from common.timeline import Timeline
+from common.shard import run_sharded
+from common.spec_cache import parsed_spec
+from common.stream import monitor_stream, native_update
+from common.stl import FORMS, WINDOW, size, stillness
+from common.trace import columns_from_lines, read_columns
+STARTUP.mark('import')
 _find   = str.find
 _int    = int
 _now    = time.time
 
-# ---- build the gigantic STL formula ----------------------------------------
-def nested_prev(var: str, k: int) -> str:
-    expr = var
-    for _ in range(k):
-        expr = f'prev({expr})'
-    return expr
-
-def build_freeze_clause(var: str, window: int = 99) -> str:
-    terms = [f'({var} == {nested_prev(var, k)})' for k in range(1, window + 1)]
-    return ' and '.join(terms)
-
-WINDOW = 99
-freeze_x = build_freeze_clause('x', WINDOW)
-freeze_y = build_freeze_clause('y', WINDOW)
-freeze_z = build_freeze_clause('z', WINDOW)
-
-SPEC_FORMULA = f'safe = historically( not( ({freeze_x}) and ({freeze_y}) and ({freeze_z}) ) )'
-
-def monitor(csv_path: str) -> None:
-    spec = rtamt.StlDiscreteTimeOnlineSpecificationCpp()
-    for v in ('x','y','z'):
-        spec.declare_var(v,'int')
-    spec.declare_var('safe','int')
-    spec.spec = SPEC_FORMULA
-    spec.parse()
+# ---- the stillness formula (common/stl.py) ---------------------------------
+# built on first use rather than at import, so the build is its own
+# start-up phase and the parsed spec can come from common/spec_cache.py.
+# `nested` is the original prev(prev(...)) spelling; `shared` and `bounded`
+# are linear / constant in WINDOW and give the same verdicts.
+def load_spec(cls, form: str):
+    """Parsed spec of the ``form`` formula (cached), start-up phases marked."""
+    stl = stillness(WINDOW, form)
+    STARTUP.mark('build')
+    spec, hit = parsed_spec(cls, stl.declarations, stl.formula, stl.sub_specs)
+    STARTUP.mark('parse')
+    return spec, hit, size(stl)
+
+def monitor(csv_path: str, stop_on_final: bool = False,
+            form: str = 'nested') -> None:
+    spec, hit, sz = load_spec(rtamt.StlDiscreteTimeOnlineSpecificationCpp,
+                              form)
+    startup = STARTUP.report('spec cache hit' if hit else 'parsed')
     _spec_update = spec.update
     _now_time    = _now
 
+    timer = StepTimer.from_env()
+    _start, _stop = timer.start, timer.stop
+    timeline = Timeline.from_env()
+    _add = timeline.add if timeline else None
+
     start_wall = _now_time()
-    max_step_time = 0.0
-    max_step_idx  = -1
     first_violation = None
+    steps_left = None
     step = 0
 
     with open(csv_path,'r') as fh:
         for line in fh:
-            t0 = _now_time()
+            _start()
             line = line.rstrip('\n')
             if line:
                 i1 = _find(line, ',')
@@ -54,16 +62,137 @@ def monitor(csv_path: str) -> None:
                     step += 1
                     continue
                 rob = _spec_update(step, [('x',x),('y',y),('z',z)])
+                if _add:
+                    _add(step, 'false' if rob <= 0 and step>=WINDOW else 'true')
                 if rob <= 0 and step>=WINDOW and first_violation is None:
                     first_violation = (step, _now_time() - start_wall)
-            elapsed = _now_time() - t0
-            if elapsed > max_step_time:
-                max_step_time, max_step_idx = elapsed, step
+            _stop(step)
             step += 1
+            if stop_on_final and first_violation is not None:
+                steps_left = sum(1 for _ in fh)
+                break
 
     total_wall = _now_time() - start_wall
     print(f'▶ Wall‑clock runtime: {total_wall:.3f} s')
-    print(f'⏱ Max per‑step time:  {max_step_time:.6f} s at step {max_step_idx}')
+    print(f'⏱ Max per‑step time:  {timer.max_s:.6f} s at step {timer.max_step}')
+    extra = {}
+    if steps_left is not None:
+        extra = report_early_stop(first_violation[0], total_wall, step,
+                                  steps_left)
+    timer.report('monitor_not_stopping_rtamt', total_wall, step,
+                 first_violation and first_violation[0], mode='online',
+                 startup=startup, spec_cache_hit=hit, form=form,
+                 formula_size=sz, **extra)
+    if timeline:
+        timeline.write('monitor_not_stopping_rtamt', csv_path)
+    _print_verdict(first_violation)
+
+# ---- offline: one batch evaluation over the columnar trace -----------------
+def monitor_offline(csv_path: str, form: str = 'nested') -> None:
+    spec, hit, sz = load_spec(rtamt.StlDiscreteTimeOfflineSpecification,
+                              form)
+    startup = STARTUP.report('spec cache hit' if hit else 'parsed')
+
+    start_wall = _now()
+    steps, cols = read_columns(csv_path, ('x','y','z'))
+    built_wall = _now()
+    rob = spec.evaluate({'time': steps, 'x': cols['x'],
+                         'y': cols['y'], 'z': cols['z']})
+    total_wall = _now() - start_wall
+
+    first_violation = None
+    for t, r in rob:
+        if r <= 0 and t >= WINDOW:
+            first_violation = (int(t), total_wall)
+            break
+
+    print(f'▶ Wall‑clock runtime: {total_wall:.3f} s')
+    print(f'⏱ Offline build: {built_wall - start_wall:.3f} s, '
+          f'evaluate: {start_wall + total_wall - built_wall:.3f} s '
+          f'({len(steps)} steps)')
+    report_batch('monitor_not_stopping_rtamt', total_wall, len(steps),
+                 first_violation and first_violation[0],
+                 mode='offline', build_s=built_wall - start_wall,
+                 startup=startup, spec_cache_hit=hit, form=form,
+                 formula_size=sz)
+    timeline = Timeline.from_env()
+    if timeline:
+        timeline.extend((int(t), 'false' if r <= 0 and t >= WINDOW else 'true')
+                        for t, r in rob)
+        timeline.write('monitor_not_stopping_rtamt', csv_path)
+    _print_verdict(first_violation)
+
+# ---- sharded: bounded body per shard on a process pool ---------------------
+_shard_specs = {}
+
+def _shard_verdicts(form: str, lines) -> bytearray:
+    spec = _shard_specs.get(form)
+    if spec is None:                            # parse once per worker
+        stl  = stillness(WINDOW, form, body=True)
+        spec = _shard_specs[form] = parsed_spec(
+            rtamt.StlDiscreteTimeOfflineSpecification,
+            stl.declarations, stl.formula, stl.sub_specs)[0]
+    steps, cols = columns_from_lines(lines, ('x','y','z'))
+    out = bytearray(b'\x01') * len(lines)
+    if steps:
+        for t, r in spec.evaluate({'time': steps, 'x': cols['x'],
+                                          'y': cols['y'], 'z': cols['z']}):
+            if r <= 0:
+                out[int(t)] = 0
+    return out
+
+def monitor_sharded(csv_path: str, workers: int = None,
+                    shards: int = None, form: str = 'nested') -> None:
+    timeline = Timeline.from_env()
+    startup = STARTUP.report()
+    start_wall = _now()
+    res = run_sharded(csv_path, functools.partial(_shard_verdicts, form), WINDOW,
+                      workers=workers, shards=shards, min_step=WINDOW,
+                      keep_verdicts=timeline is not None)
+    total_wall = _now() - start_wall
+
+    first_violation = None
+    if res.first_violation is not None:
+        first_violation = (res.first_violation, total_wall)
+
+    print(f'▶ Wall‑clock runtime: {total_wall:.3f} s')
+    print(f'⏱ Sharded: {res.shards} shards on '
+          f'{workers or os.cpu_count()} workers ({res.steps} steps)')
+    report_batch('monitor_not_stopping_rtamt', total_wall, res.steps,
+                 res.first_violation, mode='sharded', shards=res.shards,
+                 startup=startup, form=form)
+    if timeline:
+        verdicts = res.verdicts
+        verdicts[:WINDOW] = b'\x01' * min(WINDOW, len(verdicts))   # warm-up
+        timeline.extend_bytes(verdicts)
+        timeline.write('monitor_not_stopping_rtamt', csv_path)
+    _print_verdict(first_violation)
+
+# ---- live feed: one update per sample as its batch arrives ----------------
+def monitor_live(source: str, stop_on_final: bool = False,
+                 form: str = 'nested', native: bool = False) -> None:
+    if native:
+        names, update = native_update('not_stopping')
+        extra = {'backend': 'native'}
+    else:
+        spec, hit, sz = load_spec(rtamt.StlDiscreteTimeOnlineSpecificationCpp,
+                                  form)
+        _spec_update = spec.update
+        names = ('x','y','z')
+        extra = {'backend': 'rtamt', 'spec_cache_hit': hit, 'form': form,
+                 'formula_size': sz}
+        def update(step, values):
+            x, y, z = values
+            rob = _spec_update(step, [('x',x),('y',y),('z',z)])
+            return rob > 0 or step < WINDOW
+    startup = STARTUP.report('native monitor' if native else
+                             'spec cache hit' if hit else 'parsed')
+    res = monitor_stream(source, names, update, 'monitor_not_stopping_rtamt',
+                         stop_on_final, startup=startup, **extra)
+    _print_verdict(None if res.first_violation is None
+                   else (res.first_violation, res.first_violation_s))
+
+def _print_verdict(first_violation) -> None:
     if first_violation is None:
         print('✔ Tool never remained motionless for 100 consecutive steps.')
     else:
@@ -72,7 +201,40 @@ def monitor(csv_path: str) -> None:
               f'(wall‑clock {v_time:.3f} s)')
 
 if __name__ == '__main__':
-    if len(sys.argv)!=2:
-        print('Usage: python monitor_not_stopping.py <csv_file>')
-        sys.exit(1)
-    monitor(sys.argv[1])
+    ap = argparse.ArgumentParser(prog='monitor_not_stopping_rtamt.py')
+    ap.add_argument('csv_file', nargs='?')
+    ap.add_argument('--offline', action='store_true',
+                    help='evaluate the whole trace in one batch call')
+    ap.add_argument('--stop-on-final', action='store_true',
+                    help='stop feeding the monitor at the first violation, '
+                         'which is final for historically(...) (online only)')
+    ap.add_argument('--workers', type=int, default=0, metavar='N',
+                    help='evaluate overlapping shards on N processes '
+                         '(0 = sequential; -1 = all cores)')
+    ap.add_argument('--shards', type=int, default=None,
+                    help='number of shards (default: ≥ one per worker)')
+    ap.add_argument('--form', choices=FORMS, default='nested',
+                    help='spelling of the window: nested prev chains (default), '
+                         'shared prev sub-specs, or bounded historically[0:98]')
+    ap.add_argument('--stream', metavar='SOURCE',
+                    help='monitor live samples instead of a CSV file: '
+                         '- (stdin), unix:PATH or udp:[HOST:]PORT')
+    ap.add_argument('--native', action='store_true',
+                    help='with --stream: update the reference monitor of '
+                         'common/native.py instead of RTAMT')
+    args = ap.parse_args()
+    if (args.csv_file is None) == (args.stream is None):
+        ap.error('give either a CSV file or --stream SOURCE')
+    if args.native and not args.stream:
+        ap.error('--native needs --stream')
+    if args.stream:
+        if args.offline or args.workers:
+            ap.error('--stream is online only')
+        monitor_live(args.stream, args.stop_on_final, args.form, args.native)
+    elif args.workers:
+        monitor_sharded(args.csv_file, None if args.workers < 0 else args.workers,
+                        args.shards, args.form)
+    elif args.offline:
+        monitor_offline(args.csv_file, args.form)
+    else:
+        monitor(args.csv_file, args.stop_on_final, args.form)
@@ -1,26 +1,45 @@
 
-import rtamt, sys, time
-
-def monitor_in_camera_view(file_path):
-    spec = rtamt.StlDiscreteTimeOnlineSpecificationCpp()
-    spec.declare_var('inCameraView', 'int')
-    spec.declare_var('out',          'int')
-    spec.spec = 'out = historically(inCameraView)'
-    spec.parse()
+import argparse, os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.timing import Startup, StepTimer, report_batch, report_early_stop
+STARTUP = Startup()
+import rtamt
+from common.timeline import Timeline
+from common.spec_cache import parsed_spec
+from common.stream import monitor_stream, native_update
+from common.trace import read_columns
+STARTUP.mark('import')
+
+FORMULA      = 'out = historically(inCameraView)'
+DECLARATIONS = (('inCameraView','int'), ('out','int'))
+
+def load_spec(cls):
+    """Parsed spec of ``FORMULA`` (cached), with the start-up phase marked."""
+    spec, hit = parsed_spec(cls, DECLARATIONS, FORMULA)
+    STARTUP.mark('parse')
+    return spec, hit
+
+def monitor_in_camera_view(file_path, stop_on_final=False):
+    spec, hit      = load_spec(rtamt.StlDiscreteTimeOnlineSpecificationCpp)
+    startup        = STARTUP.report('spec cache hit' if hit else 'parsed')
     _spec_update   = spec.update
     _time          = time.time
     _find          = str.find
 
+    timer            = StepTimer.from_env()
+    _start, _stop    = timer.start, timer.stop
+    timeline         = Timeline.from_env()
+    _add             = timeline.add if timeline else None
+
     start_wall       = _time()
-    max_step_time    = 0.0
-    max_step_index   = -1
     violation_step   = None
     violation_real   = None
+    steps_left       = None
 
     step_index = 0
     with open(file_path, 'r') as f:
         for raw_line in f:
-            t0 = _time()
+            _start()
             line = raw_line.strip()
             if line:
                 # fast‑path: skip first 3 commas → char after = tool flag
@@ -37,17 +56,82 @@ def monitor_in_camera_view(file_path):
 
                 out_rob = _spec_update(step_index, [('inCameraView', in_camera)])
 
+                if _add:
+                    _add(step_index, 'false' if out_rob == 0 else 'true')
                 if out_rob == 0 and violation_step is None:
                     violation_step = step_index
                     violation_real = _time() - start_wall
-            step_elapsed = _time() - t0
-            if step_elapsed > max_step_time:
-                max_step_time, max_step_index = step_elapsed, step_index
+            _stop(step_index)
             step_index += 1
+            if stop_on_final and violation_step is not None:
+                steps_left = sum(1 for _ in f)
+                break
 
     total_wall = _time() - start_wall
     print(f'▶ Wall‑clock runtime: {total_wall:.3f} s')
-    print(f'⏱ Max per‑step time:  {max_step_time:.6f} s at step {max_step_index}')
+    print(f'⏱ Max per‑step time:  {timer.max_s:.6f} s at step {timer.max_step}')
+    extra = {}
+    if steps_left is not None:
+        extra = report_early_stop(violation_step, total_wall, step_index,
+                                  steps_left)
+    timer.report('monitor_one_tool_rtamt', total_wall, step_index,
+                 violation_step, mode='online', startup=startup,
+                 spec_cache_hit=hit, **extra)
+    if timeline:
+        timeline.write('monitor_one_tool_rtamt', file_path)
+    _print_verdict(violation_step, violation_real)
+
+def monitor_in_camera_view_offline(file_path):
+    spec, hit = load_spec(rtamt.StlDiscreteTimeOfflineSpecification)
+    startup   = STARTUP.report('spec cache hit' if hit else 'parsed')
+
+    start_wall = time.time()
+    steps, cols = read_columns(file_path, ('inCameraView',))
+    built_wall = time.time()
+    out_rob    = spec.evaluate({'time': steps,
+                                'inCameraView': cols['inCameraView']})
+    total_wall = time.time() - start_wall
+
+    violation_step = None
+    for t, r in out_rob:
+        if r == 0:
+            violation_step = int(t)
+            break
+
+    print(f'▶ Wall‑clock runtime: {total_wall:.3f} s')
+    print(f'⏱ Offline build: {built_wall - start_wall:.3f} s, '
+          f'evaluate: {start_wall + total_wall - built_wall:.3f} s '
+          f'({len(steps)} steps)')
+    report_batch('monitor_one_tool_rtamt', total_wall, len(steps),
+                 violation_step, mode='offline',
+                 build_s=built_wall - start_wall,
+                 startup=startup, spec_cache_hit=hit)
+    timeline = Timeline.from_env()
+    if timeline:
+        timeline.extend((int(t), 'false' if r == 0 else 'true')
+                        for t, r in out_rob)
+        timeline.write('monitor_one_tool_rtamt', file_path)
+    _print_verdict(violation_step, total_wall)
+
+# ---- live feed: one update per sample as its batch arrives ----------------
+def monitor_live(source, stop_on_final=False, native=False):
+    if native:
+        names, update = native_update('in_camera_view')
+        extra = {'backend': 'native'}
+    else:
+        spec, hit = load_spec(rtamt.StlDiscreteTimeOnlineSpecificationCpp)
+        _spec_update = spec.update
+        names = ('inCameraView',)
+        extra = {'backend': 'rtamt', 'spec_cache_hit': hit}
+        def update(step, values):
+            return _spec_update(step, [('inCameraView', values[0])]) != 0
+    startup = STARTUP.report('native monitor' if native else
+                             'spec cache hit' if hit else 'parsed')
+    res = monitor_stream(source, names, update, 'monitor_one_tool_rtamt',
+                         stop_on_final, startup=startup, **extra)
+    _print_verdict(res.first_violation, res.first_violation_s)
+
+def _print_verdict(violation_step, violation_real):
     if violation_step is None:
         print('✔ No violation of historically(inCameraView == 1) found.')
     else:
@@ -55,7 +139,29 @@ def monitor_in_camera_view(file_path):
               f'(wall‑clock {violation_real:.3f} s)')
 
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        print('Usage: python monitor_one_tool.py <csv_file>')
-        sys.exit(1)
-    monitor_in_camera_view(sys.argv[1])
+    ap = argparse.ArgumentParser(prog='monitor_one_tool_rtamt.py')
+    ap.add_argument('csv_file', nargs='?')
+    ap.add_argument('--offline', action='store_true',
+                    help='evaluate the whole trace in one batch call')
+    ap.add_argument('--stop-on-final', action='store_true',
+                    help='stop feeding the monitor at the first violation, '
+                         'which is final for historically(...) (online only)')
+    ap.add_argument('--stream', metavar='SOURCE',
+                    help='monitor live samples instead of a CSV file: '
+                         '- (stdin), unix:PATH or udp:[HOST:]PORT')
+    ap.add_argument('--native', action='store_true',
+                    help='with --stream: update the reference monitor of '
+                         'common/native.py instead of RTAMT')
+    args = ap.parse_args()
+    if (args.csv_file is None) == (args.stream is None):
+        ap.error('give either a CSV file or --stream SOURCE')
+    if args.native and not args.stream:
+        ap.error('--native needs --stream')
+    if args.stream:
+        if args.offline:
+            ap.error('--stream is online only')
+        monitor_live(args.stream, args.stop_on_final, args.native)
+    elif args.offline:
+        monitor_in_camera_view_offline(args.csv_file)
+    else:
+        monitor_in_camera_view(args.csv_file, args.stop_on_final)
@@ -1,5 +1,14 @@
 
-import rtamt, sys, time
+import argparse, os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.timing import Startup, StepTimer, report_batch, report_early_stop
+STARTUP = Startup()
+import rtamt
+from common.timeline import Timeline
+from common.spec_cache import parsed_spec
+from common.stream import monitor_stream, native_update
+from common.trace import read_columns
+STARTUP.mark('import')
 _find = str.find
 _now  = time.time
 
@@ -8,26 +17,33 @@ FORMULA = (
     'suturing -> ( once(gauze) -> once( (not gauze) and once(gauze) ) ) '
     ')'
 )
+DECLARATIONS = (('suturing','int'), ('gauze','int'), ('ok','int'))
 
-def monitor(csv_file: str) -> None:
-    spec = rtamt.StlDiscreteTimeOnlineSpecificationCpp()
-    spec.declare_var('suturing','int')
-    spec.declare_var('gauze',   'int')
-    spec.declare_var('ok',      'int')
-    spec.spec = FORMULA
-    spec.parse()
+def load_spec(cls):
+    """Parsed spec of ``FORMULA`` (cached), with the start-up phase marked."""
+    spec, hit = parsed_spec(cls, DECLARATIONS, FORMULA)
+    STARTUP.mark('parse')
+    return spec, hit
+
+def monitor(csv_file: str, stop_on_final: bool = False) -> None:
+    spec, hit = load_spec(rtamt.StlDiscreteTimeOnlineSpecificationCpp)
+    startup = STARTUP.report('spec cache hit' if hit else 'parsed')
     _spec_update = spec.update
     _int    = int
 
+    timer          = StepTimer.from_env()
+    _start, _stop  = timer.start, timer.stop
+    timeline       = Timeline.from_env()
+    _add           = timeline.add if timeline else None
+
     start_wall     = _now()
-    max_step_time  = 0.0
-    max_step_idx   = -1
     first_violation= None
+    steps_left     = None
     step           = 0
 
     with open(csv_file,'r') as fh:
         for line in fh:
-            t0 = _now()
+            _start()
             line = line.rstrip('\n')
             if line:
                 # fast: locate 4th and 5th commas to extract columns 5 & 6
@@ -56,16 +72,83 @@ def monitor(csv_file: str) -> None:
 
                 rob = _spec_update(step, [('suturing', suturing),
                                           ('gauze', gauze)])
+                if _add:
+                    _add(step, 'false' if rob < 0 else 'true')
                 if rob < 0 and first_violation is None:
                     first_violation = (step, _now() - start_wall)
-            elapsed = _now() - t0
-            if elapsed > max_step_time:
-                max_step_time, max_step_idx = elapsed, step
+            _stop(step)
             step += 1
+            if stop_on_final and first_violation is not None:
+                steps_left = sum(1 for _ in fh)
+                break
 
     total_wall = _now() - start_wall
     print(f'▶ Wall‑clock runtime: {total_wall:.3f} s')
-    print(f'⏱ Max per‑step time:  {max_step_time:.6f} s at step {max_step_idx}')
+    print(f'⏱ Max per‑step time:  {timer.max_s:.6f} s at step {timer.max_step}')
+    extra = {}
+    if steps_left is not None:
+        extra = report_early_stop(first_violation[0], total_wall, step,
+                                  steps_left)
+    timer.report('monitor_suturing_gauze_rtamt', total_wall, step,
+                 first_violation and first_violation[0], mode='online',
+                 startup=startup, spec_cache_hit=hit, **extra)
+    if timeline:
+        timeline.write('monitor_suturing_gauze_rtamt', csv_file)
+    _print_verdict(first_violation)
+
+def monitor_offline(csv_file: str) -> None:
+    spec, hit = load_spec(rtamt.StlDiscreteTimeOfflineSpecification)
+    startup = STARTUP.report('spec cache hit' if hit else 'parsed')
+
+    start_wall  = _now()
+    steps, cols = read_columns(csv_file, ('suturing','gauze'))
+    built_wall  = _now()
+    rob = spec.evaluate({'time': steps, 'suturing': cols['suturing'],
+                         'gauze': cols['gauze']})
+    total_wall  = _now() - start_wall
+
+    first_violation = None
+    for t, r in rob:
+        if r < 0:
+            first_violation = (int(t), total_wall)
+            break
+
+    print(f'▶ Wall‑clock runtime: {total_wall:.3f} s')
+    print(f'⏱ Offline build: {built_wall - start_wall:.3f} s, '
+          f'evaluate: {start_wall + total_wall - built_wall:.3f} s '
+          f'({len(steps)} steps)')
+    report_batch('monitor_suturing_gauze_rtamt', total_wall, len(steps),
+                 first_violation and first_violation[0], mode='offline',
+                 build_s=built_wall - start_wall,
+                 startup=startup, spec_cache_hit=hit)
+    timeline = Timeline.from_env()
+    if timeline:
+        timeline.extend((int(t), 'false' if r < 0 else 'true') for t, r in rob)
+        timeline.write('monitor_suturing_gauze_rtamt', csv_file)
+    _print_verdict(first_violation)
+
+# ---- live feed: one update per sample as its batch arrives ----------------
+def monitor_live(source: str, stop_on_final: bool = False,
+                 native: bool = False) -> None:
+    if native:
+        names, update = native_update('suturing_gauze')
+        extra = {'backend': 'native'}
+    else:
+        spec, hit = load_spec(rtamt.StlDiscreteTimeOnlineSpecificationCpp)
+        _spec_update = spec.update
+        names = ('suturing', 'gauze')
+        extra = {'backend': 'rtamt', 'spec_cache_hit': hit}
+        def update(step, values):
+            return _spec_update(step, [('suturing', values[0]),
+                                       ('gauze', values[1])]) >= 0
+    startup = STARTUP.report('native monitor' if native else
+                             'spec cache hit' if hit else 'parsed')
+    res = monitor_stream(source, names, update, 'monitor_suturing_gauze_rtamt',
+                         stop_on_final, startup=startup, **extra)
+    _print_verdict(None if res.first_violation is None
+                   else (res.first_violation, res.first_violation_s))
+
+def _print_verdict(first_violation) -> None:
     if first_violation is None:
         print('✔ Formula held for entire trace.')
     else:
@@ -74,7 +157,29 @@ def monitor(csv_file: str) -> None:
               f'(wall‑clock {v_time:.3f} s)')
 
 if __name__ == '__main__':
-    if len(sys.argv)!=2:
-        print('Usage: python monitor_suturing_gauze.py <csv_file>')
-        sys.exit(1)
-    monitor(sys.argv[1])
+    ap = argparse.ArgumentParser(prog='monitor_suturing_gauze_rtamt.py')
+    ap.add_argument('csv_file', nargs='?')
+    ap.add_argument('--offline', action='store_true',
+                    help='evaluate the whole trace in one batch call')
+    ap.add_argument('--stop-on-final', action='store_true',
+                    help='stop feeding the monitor at the first violation, '
+                         'which is final for historically(...) (online only)')
+    ap.add_argument('--stream', metavar='SOURCE',
+                    help='monitor live samples instead of a CSV file: '
+                         '- (stdin), unix:PATH or udp:[HOST:]PORT')
+    ap.add_argument('--native', action='store_true',
+                    help='with --stream: update the reference monitor of '
+                         'common/native.py instead of RTAMT')
+    args = ap.parse_args()
+    if (args.csv_file is None) == (args.stream is None):
+        ap.error('give either a CSV file or --stream SOURCE')
+    if args.native and not args.stream:
+        ap.error('--native needs --stream')
+    if args.stream:
+        if args.offline:
+            ap.error('--stream is online only')
+        monitor_live(args.stream, args.stop_on_final, args.native)
+    elif args.offline:
+        monitor_offline(args.csv_file)
+    else:
+        monitor(args.csv_file, args.stop_on_final)
@@ -0,0 +1 @@
+"""Helpers shared by the NuRV and RTAMT front-end drivers."""
@@ -0,0 +1,356 @@
+"""
+In-process three-valued monitor for future-time LTL.
+
+Gives NuRV-style verdicts on the prefix seen so far: ``"false"`` once every
+continuation violates the property, ``"true"`` once every continuation
+satisfies it, ``"unknown"`` otherwise.  One verdict per row, available as
+soon as the row has been read.
+
+Formulas are hash-consed ``Node`` trees in negation normal form, built with
+``ap``, ``Not``, ``And``, ``Or``, ``Implies``, ``X``, ``G``, ``F``, ``U``
+and ``R``; equal formulas are the same object.  The monitor keeps a residual
+formula, the obligation the rest of the trace still has to meet, and
+progresses it through each row (``progress``).  A bounded operator such as
+``X^d p`` stays pending for at most d rows and is discharged by the row that
+decides it, so the residual is the lookahead buffer: it holds the
+undecided obligations rather than the rows themselves.  Transitions are
+memoised per ``(residual, atom valuation)``, which builds the monitor's
+automaton lazily; after warm-up a step is one dict lookup.
+
+A residual simplifies to true or false syntactically only, which decides
+every formula of the form ``G(bounded)`` (all models here) at the earliest
+step.  In general the monitor never gives a wrong verdict, but it can stay
+``"unknown"`` where full LTL3 would already be conclusive (e.g. ``G F p &
+G !p``).
+
+``FUTURE_PROPERTIES`` holds the formulas of NuRV/models/*_future.smv with
+their atoms as functions of a six-column row (as common/native.py); steps
+are 1-based, as in NuRV.
+"""
+
+from common.smv import WINDOW
+
+TRUE, FALSE, UNKNOWN = "true", "false", "unknown"
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Hash-consed formulas
+# ──────────────────────────────────────────────────────────────────────────
+class Node:
+    """One interned formula node; compare with ``is``."""
+
+    __slots__ = ("op", "args")
+
+    def __init__(self, op: str, args) -> None:
+        self.op   = op
+        self.args = args
+
+    def __repr__(self) -> str:
+        return show(self)
+
+
+_table = {}
+
+
+def _mk(op: str, args=()) -> Node:
+    key  = (op, args)
+    node = _table.get(key)
+    if node is None:
+        node = _table[key] = Node(op, args)
+    return node
+
+
+TT = _mk("true")
+FF = _mk("false")
+
+
+def ap(name: str, positive: bool = True) -> Node:
+    return _mk("ap", (name, positive))
+
+
+def Not(f: Node) -> Node:
+    op, a = f.op, f.args
+    if op == "true":
+        return FF
+    if op == "false":
+        return TT
+    if op == "ap":
+        return ap(a[0], not a[1])
+    if op == "and":
+        return Or(*(Not(g) for g in a))
+    if op == "or":
+        return And(*(Not(g) for g in a))
+    if op == "X":
+        return X(Not(a[0]))
+    if op == "G":
+        return F(Not(a[0]))
+    if op == "F":
+        return G(Not(a[0]))
+    if op == "U":
+        return R(Not(a[0]), Not(a[1]))
+    return U(Not(a[0]), Not(a[1]))                      # R
+
+
+def _junction(op: str, unit: Node, zero: Node, fs) -> Node:
+    terms = set()
+    for f in fs:
+        if f is zero:
+            return zero
+        if f is unit:
+            continue
+        if f.op == op:
+            terms.update(f.args)
+        else:
+            terms.add(f)
+    for t in terms:
+        if t.op == "ap" and ap(t.args[0], not t.args[1]) in terms:
+            return zero
+    if not terms:
+        return unit
+    if len(terms) == 1:
+        return terms.pop()
+    return _mk(op, frozenset(terms))
+
+
+def And(*fs) -> Node:
+    return _junction("and", TT, FF, fs)
+
+
+def Or(*fs) -> Node:
+    return _junction("or", FF, TT, fs)
+
+
+def Implies(a: Node, b: Node) -> Node:
+    return Or(Not(a), b)
+
+
+def X(f: Node) -> Node:
+    return f if f is TT or f is FF else _mk("X", (f,))
+
+
+def G(f: Node) -> Node:
+    return f if f is TT or f is FF else _mk("G", (f,))
+
+
+def F(f: Node) -> Node:
+    return f if f is TT or f is FF else _mk("F", (f,))
+
+
+def U(a: Node, b: Node) -> Node:
+    if b is TT or b is FF or a is FF:
+        return b
+    return _mk("U", (a, b))
+
+
+def R(a: Node, b: Node) -> Node:
+    if b is TT or b is FF or a is TT:
+        return b
+    return _mk("R", (a, b))
+
+
+def atoms(f: Node) -> set:
+    """Names of the atomic propositions in ``f``."""
+    out, todo, seen = set(), [f], set()
+    while todo:
+        g = todo.pop()
+        if g in seen:
+            continue
+        seen.add(g)
+        if g.op == "ap":
+            out.add(g.args[0])
+        else:
+            todo.extend(g.args)
+    return out
+
+
+def to_data(f: Node):
+    """JSON-able nested lists; ``from_data`` rebuilds the interned formula."""
+    op, a = f.op, f.args
+    if op in ("true", "false"):
+        return [op]
+    if op == "ap":
+        return [op, a[0], a[1]]
+    return [op] + [to_data(g) for g in a]
+
+
+_BUILD = {"and": And, "or": Or, "X": X, "G": G, "F": F, "U": U, "R": R}
+
+
+def from_data(data) -> Node:
+    op = data[0]
+    if op in ("true", "false"):
+        return TT if op == "true" else FF
+    if op == "ap":
+        return ap(data[1], data[2])
+    return _BUILD[op](*(from_data(d) for d in data[1:]))
+
+
+def show(f: Node) -> str:
+    op, a = f.op, f.args
+    if op in ("true", "false"):
+        return op.upper()
+    if op == "ap":
+        return a[0] if a[1] else "!" + a[0]
+    if op in ("and", "or"):
+        sep = " & " if op == "and" else " | "
+        return "(" + sep.join(sorted(show(g) for g in a)) + ")"
+    if op in ("U", "R"):
+        return f"({show(a[0])} {op} {show(a[1])})"
+    return f"{op}({show(a[0])})"
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Progression
+# ──────────────────────────────────────────────────────────────────────────
+def progress(f: Node, value: dict, memo: dict = None) -> Node:
+    """
+    The residual of ``f`` after one row with atom truth values ``value``:
+    ``f`` holds on the trace from this row on iff the residual holds from
+    the next row on.
+    """
+    if memo is None:
+        memo = {}
+    hit = memo.get(f)
+    if hit is not None:
+        return hit
+    op, a = f.op, f.args
+    if op == "true" or op == "false":
+        out = f
+    elif op == "ap":
+        out = TT if value[a[0]] == a[1] else FF
+    elif op == "and":
+        out = And(*(progress(g, value, memo) for g in a))
+    elif op == "or":
+        out = Or(*(progress(g, value, memo) for g in a))
+    elif op == "X":
+        out = a[0]
+    elif op == "G":
+        out = And(progress(a[0], value, memo), f)
+    elif op == "F":
+        out = Or(progress(a[0], value, memo), f)
+    elif op == "U":
+        out = Or(progress(a[1], value, memo),
+                 And(progress(a[0], value, memo), f))
+    else:                                               # R
+        out = And(progress(a[1], value, memo),
+                  Or(progress(a[0], value, memo), f))
+    memo[f] = out
+    return out
+
+
+def lookahead(f: Node) -> int:
+    """Rows a residual's bounded part can still wait for (its X depth)."""
+    op, a = f.op, f.args
+    if op in ("true", "false", "ap"):
+        return 0
+    if op == "X":
+        return 1 + lookahead(a[0])
+    return max(lookahead(g) for g in a)
+
+
+def _labeller(makers: list):
+    """Factory of ``row → mask`` from per-atom factories (bit i = atom i)."""
+    def make():
+        fns = [m() for m in makers]
+
+        def label(row) -> int:
+            mask = 0
+            bit  = 1
+            for fn in fns:
+                if fn(row):
+                    mask |= bit
+                bit <<= 1
+            return mask
+        return label
+    return make
+
+
+class FutureMonitor:
+    """
+    Three-valued monitor of ``formula``.
+
+    ``definitions`` maps each proposition to a factory of a ``row → bool``
+    function.  Alternatively ``labeller`` is a factory of a ``row → mask``
+    function evaluating all of ``names`` at once (bit i = ``names[i]``), as
+    compiled by common/smv_parse.py.  Factories are called again on
+    ``reset``, so stateful atoms (``stopped``) start afresh.
+    """
+
+    def __init__(self, formula: Node, definitions: dict = None, *,
+                 names=None, labeller=None) -> None:
+        if labeller is None:
+            names    = sorted(atoms(formula))
+            missing  = set(names) - set(definitions)
+            if missing:
+                raise ValueError(f"no definition for atom(s) "
+                                 f"{', '.join(sorted(missing))}")
+            labeller = _labeller([definitions[n] for n in names])
+        elif atoms(formula) - set(names):
+            raise ValueError("labeller does not cover every atom of the formula")
+        self.formula = formula
+        self.names   = list(names)
+        self._make   = labeller
+        self._delta  = {}                   # (residual, mask) → residual
+        self.reset()
+
+    def reset(self) -> None:
+        self.state  = self.formula
+        self._label = self._make()
+
+    @property
+    def states(self) -> int:
+        """Distinct residuals reached so far (automaton states built)."""
+        return len({s for s, _ in self._delta} | set(self._delta.values()))
+
+    def _step(self, mask: int) -> Node:
+        value = {n: bool(mask >> i & 1) for i, n in enumerate(self.names)}
+        nxt   = progress(self.state, value)
+        self._delta[(self.state, mask)] = nxt
+        return nxt
+
+    def update(self, row) -> str:
+        mask = self._label(row)
+        nxt  = self._delta.get((self.state, mask))
+        if nxt is None:
+            nxt = self._step(mask)
+        self.state = nxt
+        return TRUE if nxt is TT else FALSE if nxt is FF else UNKNOWN
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# The *_future.smv properties
+# ──────────────────────────────────────────────────────────────────────────
+def column(index: int):
+    """Atom factory: column ``index`` of the row is 1."""
+    return lambda: (lambda row: row[index] == 1)
+
+
+def stopped():
+    """Atom factory: x, y, z as in the previous row (true on the first)."""
+    def make():
+        prev = [None]
+
+        def value(row) -> bool:
+            pos  = row[:3]
+            same = prev[0] is None or pos == prev[0]
+            prev[0] = pos
+            return same
+        return value
+    return make
+
+
+def _shift(f: Node, k: int) -> Node:
+    for _ in range(k):
+        f = X(f)
+    return f
+
+
+FUTURE_PROPERTIES = {
+    # instruments_future.smv
+    "in_camera_view": (G(ap("inCameraView")),
+                       {"inCameraView": column(3)}),
+    # not_stopping_future.smv
+    "not_stopping":   (G(Not(And(*(_shift(ap("stopped"), k)
+                                   for k in range(WINDOW))))),
+                       {"stopped": stopped()}),
+}
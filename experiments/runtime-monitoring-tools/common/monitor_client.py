@@ -0,0 +1,400 @@
+"""
+Client-side helpers for the NuRV online (CORBA heartbeat) drivers.
+
+``MonitorSession`` owns the CORBA bootstrap (ORB, name service lookup of
+``NuRV/Monitor/Service``, narrow) and caches the service IOR on disk, so a
+later run skips the name service.  The bootstrap and ``reset`` retry on a
+dropped connection by re-resolving the name; a heartbeat never does: the
+monitor behind a new connection has not seen the earlier steps, so its
+verdicts would be wrong.  A lost heartbeat raises ``ConnectionLost`` and
+the run is aborted.
+
+``HeartbeatSender`` decouples producing heartbeats from sending them: the
+driver thread parses rows and queues ``(step, state)`` pairs, while a single
+sender thread issues ``heartbeat`` calls strictly in step order.  Up to
+``prefetch`` states can be queued ahead of the call in flight, so parsing
+overlaps with the CORBA round trip; there is still one call in flight per
+monitor.  Sending several heartbeats of one monitor at once is not an
+option: concurrent calls may be dispatched on different connections and
+reordered on the server, and the monitor's verdict depends on the order.
+Calls for different monitor indices are independent, so one sender per
+index (monitor_multi_nurv_online.py) does overlap round trips.
+"""
+
+import collections
+import hashlib
+import os
+import queue
+import sys
+import threading
+import time
+
+from common.timing import StepTimer
+
+_ns = time.perf_counter_ns
+
+
+def split_orb_args(argv: list) -> tuple:
+    """Split ``argv`` into ``(orb_args, rest)``; ``-ORBxxx value`` pairs go to the ORB."""
+    orb, rest = [], []
+    it = iter(argv)
+    for arg in it:
+        if arg.startswith("-ORB"):
+            orb.append(arg)
+            nxt = next(it, None)
+            if nxt is not None:
+                orb.append(nxt)
+        else:
+            rest.append(arg)
+    return orb, rest
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Persistent session
+# ──────────────────────────────────────────────────────────────────────────
+SERVICE_PATH = ("NuRV", "Monitor", "Service")
+
+# Directory for cached service IORs; NURV_IOR_CACHE=off disables the cache.
+IOR_CACHE = os.environ.get(
+    "NURV_IOR_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "nurv-ior"))
+
+_orbs = {}                                  # ORB args → ORB, one per process
+
+
+class ConnectionLost(RuntimeError):
+    """The service went away in the middle of a trace."""
+
+    def __init__(self, op: str, cause) -> None:
+        super().__init__(f"{op} failed: {cause!r}; the monitor state is lost")
+        self.op   = op
+        self.step = None                        # failed step, set by the replay
+        self.done = 0                           # heartbeats answered before it
+
+
+class MonitorSession:
+    """
+    Connection to the NuRV monitor service.
+
+    ``connect`` takes the service IOR from the cache when there is one and
+    answers a ``_non_existent`` ping, and from the name service otherwise.
+    ``connect`` and ``reset`` retry up to ``retries`` times on ``TRANSIENT``
+    / ``COMM_FAILURE`` / ``OBJECT_NOT_EXIST``, re-resolving the name in
+    between with exponential backoff; a cached IOR that turns out stale is
+    replaced at once.  ``heartbeat`` raises ``ConnectionLost`` instead: a
+    restarted server also restarted its monitors, so the steps sent so far
+    are gone.
+    """
+
+    def __init__(self, orb_args: list, retries: int = 3,
+                 backoff_s: float = 0.2) -> None:
+        self.orb_args   = list(orb_args)
+        self.retries    = retries
+        self.backoff_s  = backoff_s
+        self.cache_path = None
+        if IOR_CACHE != "off":
+            key = hashlib.sha1(" ".join(self.orb_args).encode()).hexdigest()
+            self.cache_path = os.path.join(IOR_CACHE, key[:16] + ".ior")
+        self.orb        = None
+        self.service    = None
+        self.source     = None                  # "cache" | "naming"
+        self.bootstrap  = {}                    # phase → seconds
+        self.reconnects = 0
+        self.lost       = None                  # op of a lost heartbeat
+        self._hb        = None
+
+    # ── bootstrap ────────────────────────────────────────────────────────
+    def connect(self):
+        from omniORB import CORBA
+
+        self._transient = (CORBA.TRANSIENT, CORBA.COMM_FAILURE,
+                           CORBA.OBJECT_NOT_EXIST)
+        return self._retry("connect", self._connect, resolve=False)
+
+    def _connect(self):
+        from omniORB import CORBA
+        import Monitor
+
+        t0  = time.perf_counter()
+        key = tuple(self.orb_args)
+        if key not in _orbs:
+            _orbs[key] = CORBA.ORB_init([sys.argv[0]] + self.orb_args,
+                                        CORBA.ORB_ID)
+        self.orb = _orbs[key]
+        self.bootstrap["orb_init_s"] = time.perf_counter() - t0
+
+        ior = self._read_cache()
+        if ior:
+            t0  = time.perf_counter()
+            try:
+                svc = self.orb.string_to_object(ior) \
+                          ._narrow(Monitor.MonitorService)
+                # a stale IOR of a restarted server narrows fine offline
+                if svc is not None and svc._non_existent():
+                    svc = None
+            except CORBA.SystemException:
+                svc = None                      # garbled or unreachable
+            self.bootstrap["resolve_s"] = time.perf_counter() - t0
+            if svc is not None:
+                self._use(svc, "cache")
+                return svc
+        return self._resolve()
+
+    def _resolve(self):
+        import CosNaming
+        import Monitor
+
+        t0   = time.perf_counter()
+        root = self.orb.resolve_initial_references("NameService") \
+                   ._narrow(CosNaming.NamingContext)
+        if root is None:
+            raise RuntimeError("Failed to narrow the root naming context")
+        obj  = root.resolve([CosNaming.NameComponent(n, "") for n in SERVICE_PATH])
+        t1   = time.perf_counter()
+        svc  = obj._narrow(Monitor.MonitorService)
+        self.bootstrap["resolve_s"] = t1 - t0
+        self.bootstrap["narrow_s"]  = time.perf_counter() - t1
+        if svc is None:
+            raise RuntimeError("Object reference is not an Monitor::Service")
+        self._use(svc, "naming")
+        self._write_cache(self.orb.object_to_string(svc))
+        return svc
+
+    def _use(self, svc, source: str) -> None:
+        self.service, self.source, self._hb = svc, source, svc.heartbeat
+
+    def _read_cache(self):
+        if not self.cache_path:
+            return None
+        try:
+            with open(self.cache_path, encoding="ascii") as fh:
+                return fh.read().strip() or None
+        except OSError:
+            return None
+
+    def _write_cache(self, ior: str) -> None:
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp = f"{self.cache_path}.{os.getpid()}"
+            with open(tmp, "w", encoding="ascii") as fh:
+                fh.write(ior)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass                                # the cache is best effort
+
+    # ── retried calls ────────────────────────────────────────────────────
+    def _retry(self, op: str, call, resolve: bool = True):
+        for attempt in range(self.retries + 1):
+            try:
+                return call()
+            except self._transient:
+                if attempt == self.retries:
+                    raise
+                if self.source != "cache":      # a stale cache is not a failure
+                    time.sleep(self.backoff_s * (1 << attempt))
+                    self.reconnects += 1
+                    print(f"⚠ {op} failed, reconnecting to "
+                          f"{'/'.join(SERVICE_PATH)} (attempt {attempt + 1})",
+                          file=sys.stderr)
+                if resolve:
+                    try:
+                        self._resolve()
+                    except self._transient:
+                        pass
+
+    def reset(self, prop, flag) -> None:
+        t0 = time.perf_counter()
+        self._retry("reset", lambda: self.service.reset(prop, flag))
+        self.bootstrap.setdefault("reset_s", time.perf_counter() - t0)
+
+    def heartbeat(self, prop, state):
+        try:
+            return self._hb(prop, state)
+        except self._transient as exc:
+            self.lost = "heartbeat"
+            raise ConnectionLost("heartbeat", exc) from None
+
+    # ── reporting ────────────────────────────────────────────────────────
+    def record(self) -> dict:
+        """Fields for the timing record."""
+        return {"bootstrap_s": sum(self.bootstrap.values()),
+                "bootstrap":   dict(self.bootstrap),
+                "ior_source":  self.source,
+                "reconnects":  self.reconnects,
+                "connection_lost": self.lost is not None}
+
+    def report(self) -> None:
+        b = self.bootstrap
+        parts = [f"ORB init {b.get('orb_init_s', 0) * 1000:.1f}",
+                 f"resolve {b.get('resolve_s', 0) * 1000:.1f} ({self.source})"]
+        if "narrow_s" in b:
+            parts.append(f"narrow {b['narrow_s'] * 1000:.1f}")
+        if "reset_s" in b:
+            parts.append(f"reset {b['reset_s'] * 1000:.1f}")
+        print(f"⏱ Bootstrap: {', '.join(parts)} ms "
+              f"(total {sum(b.values()) * 1000:.1f} ms)")
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Prefetched heartbeats
+# ──────────────────────────────────────────────────────────────────────────
+class HeartbeatSender:
+    """
+    Ordered heartbeats from a sender thread with ``prefetch`` states queued.
+
+    With ``false_verdict`` the sender notes the first such verdict as
+    ``first = (step, time.time())`` the moment it returns, so callers can
+    stop without waiting for ``drain``.
+    """
+
+    def __init__(self, heartbeat, prop, prefetch: int = 1, timer=None,
+                 false_verdict=None) -> None:
+        self._hb     = heartbeat
+        self._prop   = prop
+        self._timer  = timer
+        self._false  = false_verdict
+        self._in     = queue.Queue(maxsize=max(1, prefetch))
+        self._done   = collections.deque()      # (step, verdict)
+        self._error  = None
+        self.first   = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        get, hb, prop  = self._in.get, self._hb, self._prop
+        done, observe  = self._done.append, self._timer and self._timer.observe
+        false          = self._false
+        step, n = None, 0
+        try:
+            while True:
+                item = get()
+                if item is None:
+                    return
+                step, state = item
+                t0 = _ns()
+                verdict = hb(prop, state)
+                if observe:
+                    observe(step, _ns() - t0)
+                if verdict == false and self.first is None:
+                    self.first = (step, time.time())
+                done((step, verdict))
+                n += 1
+        except Exception as exc:                 # surfaced in submit/close
+            if isinstance(exc, ConnectionLost):
+                exc.step, exc.done = step, n
+            self._error = exc
+            try:                                 # unblock a waiting submit
+                while True:
+                    self._in.get_nowait()
+            except queue.Empty:
+                pass
+
+    def submit(self, step, state) -> None:
+        if self._error is not None:
+            raise self._error
+        self._in.put((step, state))
+
+    def drain(self) -> list:
+        """Verdicts completed so far, in step order."""
+        done, out = self._done, []
+        while done:
+            out.append(done.popleft())
+        return out
+
+    def close(self) -> list:
+        """Wait for all queued heartbeats and return the remaining verdicts."""
+        if self._error is None:
+            self._in.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self.drain()
+
+
+def replay(heartbeat, prop, items, timer, false_verdict, prefetch: int = 0,
+           stop: bool = False, timeline=None) -> tuple:
+    """
+    Send ``(step, state)`` items as heartbeats, synchronously or from a
+    ``HeartbeatSender`` with ``prefetch`` states queued.
+
+    Returns ``(n_steps, viol_step, viol_time, wall_s)`` where ``viol_time``
+    is the wall time at which the first ``false_verdict`` was seen.  The
+    clock starts right before the first heartbeat.  With ``stop`` no more
+    items are taken once ``false_verdict`` was seen, which is final for the
+    safety properties monitored here.  Every verdict is added to
+    ``timeline`` if one is given.  A ``ConnectionLost`` carries the step
+    whose heartbeat failed and the number answered before it.
+    """
+    if prefetch:
+        return replay_prefetched(heartbeat, prop, items, prefetch, timer,
+                                 false_verdict, stop, timeline)
+
+    start     = None
+    n_steps   = 0
+    viol_step = viol_time = None
+    _start, _stop = timer.start, timer.stop
+    add = timeline.add if timeline is not None else None
+    for step, state in items:
+        if start is None:
+            start = time.time()
+        _start()
+        try:
+            verdict = heartbeat(prop, state)
+        except ConnectionLost as exc:
+            exc.step, exc.done = step, n_steps
+            raise
+        _stop(step)
+        n_steps += 1
+        if add:
+            add(step, verdict)
+        if verdict == false_verdict and viol_step is None:
+            viol_step, viol_time = step, time.time() - start
+            if stop:
+                break
+    wall = 0 if start is None else time.time() - start
+    return n_steps, viol_step, viol_time, wall
+
+
+def replay_prefetched(heartbeat, prop, items, prefetch: int, timer,
+                      false_verdict, stop: bool = False, timeline=None) -> tuple:
+    """
+    ``replay`` through a ``HeartbeatSender``.  The first ``false_verdict``
+    is timed by the sender as it returns; with ``stop`` no item is queued
+    after it (the ones already queued still go out).
+    """
+    pipe    = HeartbeatSender(heartbeat, prop, prefetch, timer, false_verdict)
+    submit  = pipe.submit
+    n_steps = 0
+    start   = time.time()
+    for step, state in items:
+        submit(step, state)
+        n_steps += 1
+        if stop and pipe.first is not None:
+            break
+        if timeline is not None and n_steps % 256 == 0:
+            timeline.extend(pipe.drain())
+    done = pipe.close()
+    if timeline is not None:
+        timeline.extend(done)
+    viol_step, viol_time = pipe.first or (None, None)
+    if viol_time is not None:
+        viol_time -= start
+    return n_steps, viol_step, viol_time, time.time() - start
+
+
+def sweep_prefetch(reset, heartbeat, prop, make_items, false_verdict,
+                   depths) -> list:
+    """
+    Replay the trace once per prefetch depth (0 = synchronous) and print
+    throughput per depth; ``reset()`` restarts the monitor between runs.
+    """
+    rows = []
+    print(f"{'prefetch':>8} {'steps':>10} {'wall [s]':>10} {'steps/s':>12}")
+    for w in depths:
+        reset()
+        n, _, _, wall = replay(heartbeat, prop, make_items(), StepTimer(),
+                               false_verdict, w)
+        rows.append((w, n, wall))
+        print(f"{w:>8} {n:>10} {wall:>10.3f} {n / wall if wall else 0:>12,.0f}")
+    return rows
@@ -0,0 +1,95 @@
+"""
+Reference in-process monitors for the three properties of this toolkit.
+
+They follow the RTAMT drivers' semantics on 0-based steps and take one row of
+the six-column trace at a time as ``(x, y, z, inCameraView, suturing, gauze)``;
+``columns`` names the ones a monitor reads.
+``update`` returns whether the current step satisfies the body of the
+property's ``historically`` and does not latch: the first ``False`` is the
+first violation, and a caller that wants the final verdict keeps it (as
+NuRV/local_monitor_server.py does).
+
+The stillness window differs between the backends: ``NotStopping()`` flags
+the RTAMT driver's step (99 equal pairs), ``NotStopping(semantics="nurv")``
+the step of the NuRV models and tools/ltl3_monitor.py (the 100th
+consecutive ``stopped`` step, where the first row counts as stopped).
+"""
+
+STILL_WINDOW = 99          # equal consecutive pairs, as WINDOW in the RTAMT driver
+NURV_WINDOW  = 100         # consecutive stopped steps, as common.smv.WINDOW
+SEMANTICS    = ("rtamt", "nurv")
+
+
+class InCameraView:
+    """``inCameraView`` at the current step."""
+
+    name    = "in_camera_view"
+    columns = ("inCameraView",)
+
+    def update(self, row) -> bool:
+        return row[3] == 1
+
+
+class NotStopping:
+    """
+    No stillness for ``window`` consecutive steps.
+
+    ``rtamt``: step k is violated when x, y and z are unchanged over rows
+    k-window .. k, which needs k ≥ window (``window`` equal pairs).
+    ``nurv``: ``window`` counts consecutive ``stopped`` steps (x, y, z equal
+    to the previous row's) and the first row counts as stopped, as
+    ``init(prev_x) := x`` in the models: violated on window+1 equal rows,
+    or window at the start of the trace.  ``window`` defaults to
+    ``STILL_WINDOW`` resp. ``NURV_WINDOW``.  ``update_stopped`` takes the
+    ``stopped`` predicate instead of a row, for the pushdown models; under
+    ``rtamt`` the first row is not stopped whatever it says.
+    """
+
+    name    = "not_stopping"
+    columns = ("x", "y", "z")
+
+    def __init__(self, window: int = None, semantics: str = "rtamt") -> None:
+        if semantics not in SEMANTICS:
+            raise ValueError(f"unknown semantics {semantics!r} "
+                             f"(choose from {', '.join(SEMANTICS)})")
+        if window is None:
+            window = STILL_WINDOW if semantics == "rtamt" else NURV_WINDOW
+        self.window = window
+        self.prev   = None
+        self.run    = 0                 # consecutive stopped steps / equal pairs
+        self._first = semantics == "nurv"       # is the first row stopped?
+        self._start = True
+
+    def update(self, row) -> bool:
+        pos  = row[:3]
+        prev = self.prev
+        self.prev = pos
+        return self.update_stopped(prev is not None and pos == prev)
+
+    def update_stopped(self, stopped) -> bool:
+        if self._start:
+            self._start = False
+            stopped = self._first
+        self.run = self.run + 1 if stopped else 0
+        return self.run < self.window
+
+
+class SuturingGauze:
+    """``suturing -> (once(gauze) -> once(!gauze & once(gauze)))`` at the current step."""
+
+    name    = "suturing_gauze"
+    columns = ("suturing", "gauze")
+
+    def __init__(self) -> None:
+        self.seen_gauze = False
+        self.seen_gap   = False
+
+    def update(self, row) -> bool:
+        if row[5]:
+            self.seen_gauze = True
+        elif self.seen_gauze:
+            self.seen_gap = True
+        return not (row[4] and self.seen_gauze and not self.seen_gap)
+
+
+MONITORS = {cls.name: cls for cls in (InCameraView, NotStopping, SuturingGauze)}
@@ -0,0 +1,244 @@
+"""
+Running the NuRV batch binary for the offline drivers.
+
+``run_nurv`` starts NuRV on a generated command file, streams its verdict
+lines (``<step>, true|false``) and times the gap between consecutive lines.
+All properties of this toolkit are safety properties — ``G(...)`` on the
+future models, ``H(...)`` on the past ones — so the first ``false`` is
+irrevocable: with ``stop_on_final`` NuRV is terminated right there instead
+of verifying the rest of the trace.
+
+``NuRVSession`` keeps one interactive NuRV process per model instead: the
+monitor is built once and every further trace only costs ``read_trace`` +
+``verify_property``.  Each cycle ends with an ``echo`` of a unique marker,
+which frames that trace's output on the shared stdout.
+"""
+
+import itertools
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+from common.timing import StepTimer
+
+NURV_CMD = os.environ.get("NURV_CMD",
+                          "/home/okitim/Programs/RV/NuRV-2.0.0-linuxx64/NuRV")
+
+# NuRV's stdout is scanned in blocks of complete lines, as bytes
+VERDICT_RE = re.compile(rb"^[ \t]*(\d+),[ \t]*(true|false)", re.M | re.I)
+PROMPT_RE  = re.compile(rb"^(?:\w+ > )+", re.M)  # "NuRV > " in interactive mode
+STORED     = b"Trace is stored"
+READ_SIZE  = 1 << 16
+
+
+def _verify_cmd(trace_id: int, past: bool) -> str:
+    # past-time models are verified with -r, future-time ones without
+    return (f"verify_property -r -n 0 {trace_id}\n" if past
+            else f"verify_property -n 0 {trace_id}\n")
+
+
+def make_cmd(trace_xml: str, cmd_path: str, past: bool) -> None:
+    """Batch script: build monitor 0, load the trace, verify it, quit."""
+    with open(cmd_path, "w") as f:
+        f.write("go\n")
+        f.write("build_monitor -n 0\n")
+        f.write(f"read_trace {trace_xml}\n")
+        f.write(_verify_cmd(1, past))
+        f.write("quit\n")
+
+
+def nurv_build(smv: str) -> tuple:
+    """``go`` + ``build_monitor`` only; returns ``(wall_s, peak_rss_kb)``."""
+    fd, cmd = tempfile.mkstemp(suffix=".cmd")
+    with os.fdopen(fd, "w") as fh:
+        fh.write("go\nbuild_monitor -n 0\nquit\n")
+    try:
+        t0   = time.perf_counter()
+        proc = subprocess.Popen([NURV_CMD, "-quiet", "-source", cmd, smv],
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - t0
+    finally:
+        os.remove(cmd)
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"build_monitor failed for {smv}")
+    return elapsed, usage.ru_maxrss
+
+
+def _blocks(stream):
+    """Whatever output is available, cut after its last complete line."""
+    read = stream.read1
+    rest = b""
+    while True:
+        data = read(READ_SIZE)
+        if not data:
+            if rest:
+                yield rest + b"\n"
+            return
+        data = rest + data
+        cut  = data.rfind(b"\n") + 1
+        if cut:
+            yield data[:cut]
+        rest = data[cut:]
+
+
+def _parse(blocks, stop_on_final: bool, timeline=None):
+    """
+    Time the verdict lines of one verification; returns
+    ``(first_step, first_time, total, timer, stopped)``.
+
+    Each block is scanned with one ``findall``.  Lines that arrive in the
+    same block were written together, so the first one gets the gap since
+    the previous block and the others none, as with a per-line reader.
+    Every line is recorded (``RV_TIMING_SAMPLE`` does not apply): the gaps
+    cost no extra clock read, and ``timer.hist.count`` is the step count.
+    """
+    start = last = None
+    timer = StepTimer()
+    observe = timer.observe
+    add = timeline.add if timeline is not None else None
+    first_step = first_time = None
+    stopped = False
+
+    for block in blocks:
+        now = time.perf_counter_ns()
+        if start is None:
+            i = block.find(STORED)
+            if i < 0:
+                continue                   # still in start up chatter
+            start = last = now             # monitoring starts here
+            block = block[block.find(b"\n", i) + 1:]
+
+        for step, verdict in VERDICT_RE.findall(block):
+            step = int(step)
+            observe(step, now - last)
+            last = now
+            holds = verdict[0] in b"tT"
+            if add:
+                add(step, "true" if holds else "false")
+            if not holds and first_step is None:
+                first_step, first_time = step, (now - start) / 1e9
+                if stop_on_final:
+                    stopped = True
+                    break
+        if stopped:
+            break
+
+    total = (last - start) / 1e9 if start else 0
+    return first_step, first_time, total, timer, stopped
+
+
+def run_nurv(smv: str, cmd_file: str, stop_on_final: bool = False,
+             timeline=None):
+    """
+    Returns ``(first_step, first_time, total, timer)``; monitoring time
+    starts at NuRV's "Trace is stored" line.  Every verdict is added to
+    ``timeline`` if one is given.
+    """
+    proc = subprocess.Popen(
+        [NURV_CMD, "-quiet", "-source", cmd_file, smv],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,   # capture “Trace is stored …”
+    )
+
+    first_step, first_time, total, timer, stopped = _parse(
+        _blocks(proc.stdout), stop_on_final, timeline)
+    if stopped:
+        proc.terminate()
+    proc.stdout.close()
+    proc.wait()
+    return first_step, first_time, total, timer
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Persistent interactive session
+# ──────────────────────────────────────────────────────────────────────────
+class NuRVSession:
+    """
+    One interactive NuRV process with monitor 0 built for ``smv``.
+
+    ``verify`` returns the same tuple as ``run_nurv``.  NuRV numbers the
+    loaded traces 1, 2, … and keeps them for the lifetime of the process,
+    so the session verifies trace ``n`` on its ``n``-th call.  With
+    ``stop_on_final`` the rest of the trace's output is read but not timed;
+    the process has to stay usable for the next trace.
+    """
+
+    _frames = itertools.count(1)
+
+    def __init__(self, smv: str, past: bool) -> None:
+        self.smv    = smv
+        self.past   = past
+        self.traces = 0
+        # line-buffer NuRV's stdout where possible: the marker has to reach
+        # the pipe while NuRV sits at its prompt
+        prefix = ["stdbuf", "-oL"] if shutil.which("stdbuf") else []
+        t0 = time.perf_counter()
+        self.proc = subprocess.Popen(
+            prefix + [NURV_CMD, "-quiet", "-int", smv],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        self._stream  = _blocks(self.proc.stdout)
+        self._pending = b""
+        self._send("go\nbuild_monitor -n 0\n")
+        for _ in self._frame():          # wait until the monitor is built
+            pass
+        self.startup_s = time.perf_counter() - t0
+
+    def _send(self, commands: str) -> None:
+        marker = f"@@nurv-frame-{next(self._frames)}@@"
+        self._marker = re.compile(rb"^" + re.escape(marker.encode())
+                                  + rb"[ \t\r]*\n", re.M)
+        self.proc.stdin.write(f"{commands}echo {marker}\n".encode())
+        self.proc.stdin.flush()
+
+    def _frame(self):
+        """Output blocks up to the current marker, prompts stripped."""
+        pending, self._pending = self._pending, b""
+        blocks = itertools.chain([pending] if pending else [], self._stream)
+        for block in blocks:
+            block = PROMPT_RE.sub(b"", block)
+            m = self._marker.search(block)
+            if m:
+                self._pending = block[m.end():]
+                if m.start():
+                    yield block[:m.start()]
+                return
+            yield block
+        raise RuntimeError(f"NuRV exited (status {self.proc.wait()}) "
+                           f"while verifying {self.smv}")
+
+    def verify(self, trace_xml: str, stop_on_final: bool = False,
+               timeline=None):
+        self.traces += 1
+        self._send(f"read_trace {trace_xml}\n"
+                   + _verify_cmd(self.traces, self.past))
+        frame = self._frame()
+        first_step, first_time, total, timer, _ = _parse(frame, stop_on_final,
+                                                         timeline)
+        for _ in frame:                  # drain to the marker
+            pass
+        return first_step, first_time, total, timer
+
+    def close(self) -> None:
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.write(b"quit\n")
+                self.proc.stdin.close()
+                self.proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+                self.proc.wait()
+        self.proc.stdout.close()
+
+    def __enter__(self) -> "NuRVSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,335 @@
+"""
+Streaming CSV → NuRV XML trace conversion for the offline drivers.
+
+NuRV's ``read_trace`` takes a ``counter-example`` document with one
+``node``/``state`` per step and one ``value`` per variable.  ``write_trace``
+emits it row by row with buffered writes instead of building an ElementTree
+first, so memory stays constant however long the trace is.  The output is
+byte-identical to what the drivers' former ElementTree code wrote for
+any non-empty trace.
+
+Rows with fewer than six columns (or non-integer coordinates) are skipped
+but still advance the 1-based step id, as before.
+
+``cached_trace`` keeps converted traces in a content-addressed cache keyed
+by the CSV's content hash and the projected variables, so the past and
+future variants of a property, and repeated runs, convert a trace once.
+The content hash is memoised per (path, size, mtime, inode), so an
+unchanged CSV is not even re-read.  ``NURV_TRACE_CACHE`` sets the cache
+directory (default ``~/.cache/nurv-trace``); ``NURV_TRACE_CACHE=off`` writes
+a temporary trace per run as before.
+
+``TraceFifo`` skips the file altogether: the trace goes through a named pipe
+(in ``/dev/shm`` where available) that a writer thread fills while NuRV reads
+it.  Conversion starts right away, overlapping NuRV's start-up; up to
+``PENDING_BYTES`` of blocks converted before NuRV opens the pipe wait in
+memory, then the writer blocks until NuRV gets to ``read_trace``.
+
+Besides the CSV columns a trace can carry derived booleans from
+``PREDICATES`` (``stopped``), computed here instead of in the model.
+"""
+
+import errno
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+HEADER = ("<?xml version='1.0' encoding='utf-8'?>\n"
+          '<counter-example type="0" id="1" desc="LTL Counterexample">')
+FOOTER = "</counter-example>"
+
+# variable → (CSV column, integer-valued?)
+VARIABLES = {
+    "x":            (0, True),
+    "y":            (1, True),
+    "z":            (2, True),
+    "inCameraView": (3, False),
+    "suturing":     (4, False),
+    "gauze":        (5, False),
+}
+
+
+def stopped():
+    """
+    Stateful ``parts → bool``: x, y, z equal to the previous row's.
+
+    The first row counts as stopped, like ``init(prev_x) := x`` in the
+    not-stopping models; rows that fail to parse raise ValueError and are
+    not remembered.
+    """
+    prev = None
+
+    def value(parts) -> bool:
+        nonlocal prev
+        pos  = (int(parts[0]), int(parts[1]), int(parts[2]))
+        same = prev is None or pos == prev
+        prev = pos
+        return same
+    return value
+
+
+# derived boolean variable → factory of a stateful ``parts → bool``
+PREDICATES = {"stopped": stopped}
+
+BLOCK_ROWS = 1 << 15                    # rows formatted per write()
+
+
+def _row_format(variables) -> str:
+    values = "".join(f'<value variable="{v}">{{}}</value>' for v in variables)
+    return '<node><state id="{}">' + values + "</state></node>"
+
+
+def _decoder(variables, remap=None):
+    """
+    ``parts → list of value texts``; raises ValueError on bad integers.
+
+    ``remap`` maps a variable to ``{value: replacement}`` for its integers.
+    Variables in ``PREDICATES`` are computed after all plain columns parsed.
+    """
+    if any(v in PREDICATES for v in variables):
+        plain = _decoder([v for v in variables if v not in PREDICATES], remap)
+        preds = {v: PREDICATES[v]() for v in variables if v in PREDICATES}
+        order = [(v in preds, preds.get(v)) for v in variables]
+
+        def decode(parts):
+            values = iter(plain(parts))
+            return [("TRUE" if pred(parts) else "FALSE") if is_pred
+                    else next(values) for is_pred, pred in order]
+        return decode
+
+    if remap:
+        cols = [(c, is_int, remap.get(v)) for v in variables
+                for c, is_int in (VARIABLES[v],)]
+
+        def decode(parts):
+            return [(str(m[int(parts[c])]) if m else str(int(parts[c])))
+                    if is_int else
+                    ("TRUE" if parts[c].lstrip().startswith("1") else "FALSE")
+                    for c, is_int, m in cols]
+        return decode
+
+    cols = [VARIABLES[v] for v in variables]
+
+    def decode(parts):
+        return [str(int(parts[c])) if is_int else
+                ("TRUE" if parts[c].lstrip().startswith("1") else "FALSE")
+                for c, is_int in cols]
+    return decode
+
+
+def iter_trace(csv_path: str, variables, last: list, remap=None):
+    """
+    Yield the XML document in blocks of up to ``BLOCK_ROWS`` rows.
+
+    ``last[0]`` is set to the last step id once the generator is exhausted.
+    """
+    fmt    = _row_format(variables).format
+    decode = _decoder(variables, remap)
+    step   = 0
+    buf    = []
+    yield HEADER
+    with open(csv_path, "r", encoding="utf-8") as src:
+        for step, raw in enumerate(src, 1):
+            parts = raw.rstrip("\n").split(",", 6)
+            if len(parts) < 6:
+                continue
+            try:
+                buf.append(fmt(step, *decode(parts)))
+            except ValueError:
+                continue
+            if len(buf) >= BLOCK_ROWS:
+                yield "".join(buf)
+                buf.clear()
+    yield "".join(buf)
+    yield FOOTER
+    last[0] = step
+
+
+def write_trace(csv_path: str, xml_path: str, variables, remap=None) -> int:
+    """Write the projection of ``csv_path`` on ``variables``; returns the last step id."""
+    last = [0]
+    with open(xml_path, "w", encoding="utf-8", buffering=1 << 20) as out:
+        for block in iter_trace(csv_path, variables, last, remap):
+            out.write(block)
+    return last[0]
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Content-addressed cache
+# ──────────────────────────────────────────────────────────────────────────
+TRACE_CACHE = os.environ.get(
+    "NURV_TRACE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "nurv-trace"))
+FORMAT_VERSION = 1                      # bump when the XML layout changes
+
+CachedTrace = namedtuple("CachedTrace",
+                         "path last_step hit temporary convert_s")
+
+
+def content_hash(csv_path: str, cache_dir: str = TRACE_CACHE) -> str:
+    """SHA-256 of the file, memoised by its stat signature under ``cache_dir``."""
+    st  = os.stat(csv_path)
+    sig = f"{os.path.abspath(csv_path)}|{st.st_size}|{st.st_mtime_ns}|{st.st_ino}"
+    memo = os.path.join(cache_dir, "stat",
+                        hashlib.sha1(sig.encode()).hexdigest())
+    try:
+        with open(memo, encoding="ascii") as fh:
+            return fh.read().strip()
+    except OSError:
+        pass
+    h = hashlib.sha256()
+    with open(csv_path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    _atomic_write(memo, digest)
+    return digest
+
+
+def _atomic_write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(text)
+    os.replace(tmp, path)
+
+
+def cached_trace(csv_path: str, variables) -> CachedTrace:
+    """
+    The NuRV XML trace of ``csv_path`` projected on ``variables``.
+
+    ``temporary`` is set when the cache is off; the caller then removes
+    ``path`` after use.  Cached files are never modified in place.
+    """
+    t0 = time.perf_counter()
+    if TRACE_CACHE == "off":
+        fd, path = tempfile.mkstemp(suffix=".xml")
+        os.close(fd)
+        last = write_trace(csv_path, path, variables)
+        return CachedTrace(path, last, False, True, time.perf_counter() - t0)
+
+    key  = f"{content_hash(csv_path)}-{'_'.join(variables)}-v{FORMAT_VERSION}"
+    base = os.path.join(TRACE_CACHE, key[:2], key)
+    try:
+        with open(base + ".json", encoding="utf-8") as fh:
+            last = json.load(fh)["last_step"]
+        if os.path.exists(base + ".xml"):
+            return CachedTrace(base + ".xml", last, True, False,
+                               time.perf_counter() - t0)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    tmp  = f"{base}.xml.{os.getpid()}"
+    last = write_trace(csv_path, tmp, variables)
+    os.replace(tmp, base + ".xml")
+    _atomic_write(base + ".json", json.dumps(
+        {"last_step": last, "variables": list(variables),
+         "csv": os.path.abspath(csv_path)}))
+    return CachedTrace(base + ".xml", last, False, False,
+                       time.perf_counter() - t0)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Named pipe
+# ──────────────────────────────────────────────────────────────────────────
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+PENDING_BYTES = 1 << 24                 # converted ahead of the reader, at most
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _count_rows(csv_path: str) -> int:
+    with open(csv_path, "rb") as fh:
+        return sum(block.count(b"\n")
+                   for block in iter(lambda: fh.read(1 << 20), b""))
+
+
+class TraceFifo:
+    """
+    NuRV XML trace of ``csv_path`` streamed through a FIFO at ``path``.
+
+    Has the attributes of ``CachedTrace``; ``last_step`` and ``convert_s``
+    are known after ``close``, which waits for the writer and removes the
+    pipe.  If NuRV stops reading early (``--stop-on-final``) or never opens
+    the pipe, the writer is released and ``last_step`` comes from counting
+    the CSV's rows.
+    """
+
+    hit       = False
+    temporary = False
+
+    def __init__(self, csv_path: str, variables, directory: str = SHM_DIR):
+        self.csv_path  = csv_path
+        self.dir       = tempfile.mkdtemp(prefix="nurv-", dir=directory)
+        self.path      = os.path.join(self.dir, "trace.xml")
+        self.last_step = None
+        self.convert_s = None
+        self._closing  = False
+        os.mkfifo(self.path)
+        self._thread = threading.Thread(target=self._fill,
+                                        args=(variables,), daemon=True)
+        self._thread.start()
+
+    def _try_open(self):
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+        except OSError as exc:
+            if exc.errno == errno.ENXIO:            # no reader yet
+                return None
+            raise
+        os.set_blocking(fd, True)
+        return fd
+
+    def _fill(self, variables) -> None:
+        t0, fd, pending, held, last = time.perf_counter(), None, [], 0, [0]
+        try:
+            for block in iter_trace(self.csv_path, variables, last):
+                if self._closing:
+                    return                            # NuRV is gone
+                data = block.encode("utf-8")
+                if fd is not None:
+                    _write_all(fd, data)
+                    continue
+                pending.append(data)
+                held += len(data)
+                fd = self._try_open()
+                if fd is None and held >= PENDING_BYTES:
+                    fd = os.open(self.path, os.O_WRONLY)  # wait for the reader
+                if fd is not None:
+                    for early in pending:
+                        _write_all(fd, early)
+                    pending = None
+            if fd is None:
+                fd = os.open(self.path, os.O_WRONLY)  # wait for the reader
+                for early in pending:
+                    _write_all(fd, early)
+            self.last_step = last[0]
+        except BrokenPipeError:
+            pass                                      # reader left early
+        finally:
+            if fd is not None:
+                os.close(fd)
+            self.convert_s = time.perf_counter() - t0
+
+    def close(self) -> None:
+        self._closing = True
+        while self._thread.is_alive():
+            # hold the read end briefly: a writer blocked in open() gets
+            # through, then fails with EPIPE once it is dropped again
+            fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+            self._thread.join(0.05)
+            os.close(fd)
+        if self.last_step is None:
+            self.last_step = _count_rows(self.csv_path)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+            os.rmdir(self.dir)
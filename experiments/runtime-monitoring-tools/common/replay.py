@@ -0,0 +1,142 @@
+"""
+Pre-decoded, optionally rate-controlled trace replay for the online drivers.
+
+``predecode`` turns a driver's ``(step, state)`` generator into two lists
+before the clock starts, so the timed loop only issues heartbeats.  Equal
+state expressions are interned to one string object: traces with few
+distinct states (camera view, suturing × gauze) then cost one string per
+distinct state instead of one per row.
+
+``replay_at_rate`` releases step i at ``t0 + i / rate`` to mimic a live
+camera at e.g. 30 or 60 Hz.  A step whose heartbeat has not returned by the
+release time of the next step counts as a deadline miss; the replay never
+skips steps, so a slow monitor drifts behind and the lag is reported.
+"""
+
+import time
+from collections import namedtuple
+
+from common.monitor_client import ConnectionLost, replay
+from common.timing import report_early_stop
+
+RateStats = namedtuple("RateStats", "rate_hz deadline_misses max_lag_s")
+
+
+def predecode(items) -> tuple:
+    """
+    Materialise ``(step, state)`` items as ``(steps, states, decode_s)``.
+
+    Identical states share one interned string.
+    """
+    t0     = time.perf_counter()
+    intern = {}.setdefault
+    steps, states = [], []
+    add_step, add_state = steps.append, states.append
+    for step, state in items:
+        add_step(step)
+        add_state(intern(state, state))
+    return steps, states, time.perf_counter() - t0
+
+
+def distinct(states: list) -> int:
+    return len({id(s) for s in states})
+
+
+def replay_at_rate(heartbeat, prop, steps: list, states: list, timer,
+                   false_verdict, rate: float, stop: bool = False,
+                   timeline=None) -> tuple:
+    """
+    Send one heartbeat per ``1 / rate`` seconds.
+
+    Returns ``(n_steps, viol_step, viol_time, wall_s, RateStats)``.
+    """
+    period    = 1.0 / rate
+    clock     = time.perf_counter
+    sleep     = time.sleep
+    _start, _stop = timer.start, timer.stop
+    add       = timeline.add if timeline is not None else None
+    viol_step = viol_time = None
+    misses    = 0
+    max_lag   = 0.0
+    n_steps   = 0
+
+    start_wall = time.time()
+    t0 = clock()
+    for i, (step, state) in enumerate(zip(steps, states)):
+        release = t0 + i * period
+        ahead   = release - clock()
+        if ahead > 0:
+            sleep(ahead)
+        _start()
+        try:
+            verdict = heartbeat(prop, state)
+        except ConnectionLost as exc:
+            exc.step, exc.done = step, n_steps
+            raise
+        _stop(step)
+        n_steps += 1
+        if add:
+            add(step, verdict)
+        lag = clock() - (release + period)
+        if lag > 0:
+            misses += 1
+            if lag > max_lag:
+                max_lag = lag
+        if verdict == false_verdict and viol_step is None:
+            viol_step, viol_time = step, time.time() - start_wall
+            if stop:
+                break
+    wall = time.time() - start_wall
+    return n_steps, viol_step, viol_time, wall, \
+        RateStats(rate, misses, max_lag)
+
+
+def aborted(extra: dict) -> bool:
+    """Whether ``replay_trace`` gave up on a lost connection."""
+    return "aborted_at_step" in extra
+
+
+def replay_trace(heartbeat, prop, items, timer, false_verdict, prefetch: int = 0,
+                 pre: bool = False, rate: float = 0.0,
+                 stop: bool = False, timeline=None) -> tuple:
+    """
+    Driver entry point: replay ``items`` as configured on the command line.
+
+    ``pre`` pre-decodes before the clock starts (implied by ``rate``);
+    ``prefetch`` queues states for a sender thread when replaying at full
+    speed; ``stop`` ends the replay at the first (final) ``false_verdict``;
+    ``timeline`` collects every verdict.  Returns
+    ``(n_steps, viol_step, viol_time, wall_s, extra)`` with ``extra`` the
+    fields for the timing record.  A lost connection ends the replay with
+    ``extra["aborted_at_step"]`` set and no verdict: the drivers report the
+    partial run and exit with an error (see ``aborted``).
+    """
+    extra = {"prefetch": prefetch}
+    if pre or rate:
+        steps, states, decode_s = predecode(items)
+        print(f"⏱ Pre-decoded {len(steps)} states "
+              f"({distinct(states)} distinct) in {decode_s:.3f} s")
+        items = zip(steps, states)
+        extra["decode_s"] = decode_s
+    items = iter(items)
+    t0    = time.time()
+    try:
+        if not rate:
+            n_steps, viol_step, viol_time, wall = replay(
+                heartbeat, prop, items, timer, false_verdict, prefetch, stop,
+                timeline)
+        else:
+            n_steps, viol_step, viol_time, wall, rs = replay_at_rate(
+                heartbeat, prop, steps, states, timer, false_verdict, rate,
+                stop, timeline)
+            print(f"⏱ Rate {rs.rate_hz:g} Hz: {rs.deadline_misses} deadline "
+                  f"misses of {n_steps} (max lag {rs.max_lag_s * 1000:.2f} ms)")
+            extra.update(rs._asdict())
+    except ConnectionLost as exc:
+        print(f"✘ Connection lost at step {exc.step}: {exc}")
+        extra["aborted_at_step"] = exc.step
+        return exc.done, None, None, time.time() - t0, extra
+    if stop and viol_step is not None:
+        left = len(steps) - n_steps if rate else sum(1 for _ in items)
+        extra.update(report_early_stop(viol_step, wall, n_steps, left))
+    return n_steps, viol_step, viol_time, wall, extra
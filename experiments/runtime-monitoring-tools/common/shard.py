@@ -0,0 +1,130 @@
+"""
+Sharded parallel evaluation of bounded-history properties on long traces.
+
+If the verdict at step k only depends on rows k-lookback .. k, the trace can
+be cut into shards that are evaluated independently: each shard is prefixed
+with the ``lookback`` rows before it as context, evaluated in a worker
+process, and the context verdicts are dropped again.  Shards are merged in
+file order, so the per-step verdicts and the earliest violation do not depend
+on scheduling.
+
+An evaluator is a picklable callable ``evaluate(lines) -> bytes`` that gets a
+list of raw CSV rows (bytes, no newline) and returns one byte per row:
+1 = the bounded formula holds at that row, 0 = it is violated.
+"""
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+ShardedResult = namedtuple(
+    "ShardedResult", "steps first_violation violations verdicts shards")
+
+# Upper bound on the bytes one worker holds in memory at a time.
+SHARD_BYTES = 64 << 20
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Planning and reading
+# ──────────────────────────────────────────────────────────────────────────
+def plan_shards(csv_path: str, n_shards: int) -> list:
+    """Split the file into ``n_shards`` byte ranges aligned to line starts."""
+    size   = os.path.getsize(csv_path)
+    bounds = [0]
+    with open(csv_path, "rb") as fh:
+        for i in range(1, n_shards):
+            fh.seek(size * i // n_shards)
+            fh.readline()
+            pos = fh.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _split(data: bytes) -> list:
+    lines = data.split(b"\n")
+    if lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _context_lines(fh, start: int, n: int) -> list:
+    """The ``n`` complete rows that end right before byte offset ``start``."""
+    if n <= 0 or start == 0:
+        return []
+    pos, block, buf = start, 1 << 16, b""
+    while pos > 0 and buf.count(b"\n") <= n:
+        step  = min(block, pos)
+        pos  -= step
+        fh.seek(pos)
+        buf   = fh.read(step) + buf
+        block <<= 1
+    lines = _split(buf)
+    if pos > 0:
+        lines = lines[1:]                   # first row is only partially read
+    return lines[-n:]
+
+
+def _run_shard(job) -> tuple:
+    csv_path, start, end, lookback, min_step, evaluate, keep = job
+    with open(csv_path, "rb") as fh:
+        context = _context_lines(fh, start, lookback)
+        fh.seek(start)
+        lines = _split(fh.read(end - start))
+
+    verdicts = bytes(evaluate(context + lines))[len(context):]
+
+    # Local positions of violations up to (and including) the first one that
+    # is ≥ min_step locally; the merge needs no more than that.
+    bad = []
+    pos = verdicts.find(0)
+    while pos >= 0:
+        bad.append(pos)
+        if pos >= min_step:
+            break
+        pos = verdicts.find(0, pos + 1)
+    return len(lines), verdicts.count(0), bad, (verdicts if keep else None)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Runner
+# ──────────────────────────────────────────────────────────────────────────
+def run_sharded(csv_path: str, evaluate, lookback: int, workers: int = None,
+                shards: int = None, min_step: int = 0,
+                keep_verdicts: bool = False) -> ShardedResult:
+    """
+    Evaluate ``evaluate`` over the whole trace on a process pool.
+
+    ``min_step`` is the first (0-based) step at which a violation counts, as
+    in the drivers' warm-up guard.  By default the trace is cut into at
+    least one shard per worker and at most ``SHARD_BYTES`` per shard.
+    ``verdicts`` is the merged per-step bytearray when ``keep_verdicts`` is
+    set, otherwise ``None``.
+    """
+    workers = workers or os.cpu_count() or 1
+    if not shards:
+        shards = max(workers, -(-os.path.getsize(csv_path) // SHARD_BYTES))
+    plan    = plan_shards(csv_path, shards)
+    jobs    = [(csv_path, s, e, lookback, min_step, evaluate, keep_verdicts)
+               for s, e in plan]
+
+    if workers == 1 or len(jobs) == 1:
+        results = list(map(_run_shard, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_run_shard, jobs))
+
+    offset     = 0
+    first      = None
+    violations = 0
+    merged     = bytearray() if keep_verdicts else None
+    for n_lines, n_bad, bad, verdicts in results:
+        early = sum(1 for pos in bad if offset + pos < min_step)
+        if first is None and len(bad) > early:
+            first = offset + bad[early]
+        violations += n_bad - early
+        if merged is not None:
+            merged += verdicts
+        offset += n_lines
+    return ShardedResult(offset, first, violations, merged, len(plan))
@@ -0,0 +1,212 @@
+"""
+SMV model generation for the windowed stillness property.
+
+"The tool tip is not stopped for N consecutive steps" has two encodings:
+
+``nested``   what NuRV/models/not_stopping_{past,future}.smv spell out by
+             hand: ``stopped`` compares x, y, z with a one-step copy, and the
+             LTLSPEC conjoins ``stopped`` with N-1 nested ``Y(...)`` (past)
+             or ``X(...)`` (future) shifts of it.  The formula grows
+             quadratically in N and the monitor has one state bit per shift.
+``counter``  a bounded counter ``still_count : 0..N`` of consecutive
+             ``stopped`` steps ending at the current step, saturating at N;
+             the property becomes ``H (still_count < N)`` resp.
+             ``G (still_count < N)``.  The first step counts as stopped, as
+             ``init(prev_x) := x`` does in the nested models.
+
+Both reject a trace at the same step: the N-th consecutive step whose
+x, y, z equal the previous row's, i.e. N+1 equal rows, or N at the start of
+the trace (the RTAMT driver's and common/native.py's WINDOW counts 99 equal
+pairs).  ``nested_model(100, past)`` reproduces the shipped models byte for
+byte.
+
+With ``pushdown`` the model drops x, y, z and the ``prev_*`` copies and
+declares ``stopped : boolean`` instead; the front end computes it per row
+(``common.nurv_trace.PREDICATES``) and the formula is unchanged.
+
+``infer_domains`` and ``tighten`` shrink the declared integer ranges of a
+model to what a trace actually contains: either the tight ``lo..hi`` range,
+or a dense ``0..k-1`` index over the k distinct values.  The dense form
+changes the values themselves, so it is only sound for models that compare
+the variables for equality (not-stopping); the trace and heartbeats then
+have to be encoded with the same ``dense_maps``.
+"""
+
+import re
+from collections import namedtuple
+
+from common.nurv_trace import VARIABLES
+
+DOMAINS = (("x", 640), ("y", 480), ("z", 480))
+WINDOW  = 100                           # rows, as in the shipped models
+ENCODINGS = ("nested", "counter")
+
+
+def _vars(domains) -> str:
+    return "".join(f"  {v} : 0..{hi};\n" for v, hi in domains)
+
+
+def _nested_spec(window: int, past: bool) -> str:
+    op     = "Y" if past else "X"
+    indent = " " * (8 if past else 6)
+    terms  = [f"{op}(" * k + "stopped" + ")" * k for k in range(window)]
+    return ("\nLTLSPEC\n  G ( ! (\n"
+            + " &\n".join(indent + t for t in terms) + "\n"
+            + (" " * 6 if past else " " * 2) + ") )\n")
+
+
+def nested_model(window: int = WINDOW, past: bool = True,
+                 domains=DOMAINS, pushdown: bool = False) -> str:
+    if pushdown:
+        return "MODULE main\nVAR\n  stopped : boolean;\n" \
+            + _nested_spec(window, past)
+    if past:
+        assign = "".join(f"  init(prev_{v}) := {v};\n  next(prev_{v}) := {v};\n"
+                         for v, _ in domains)
+    else:
+        assign = ("".join(f"  init(prev_{v}) := {v};\n" for v, _ in domains)
+                  + "".join(f"  next(prev_{v}) := {v};\n" for v, _ in domains))
+    stopped = " & ".join(f"({v} = prev_{v})" for v, _ in domains)
+    return ("MODULE main\nVAR\n" + _vars(domains)
+            + "".join(f"  prev_{v} : 0..{hi};\n" for v, hi in domains)
+            + "\nASSIGN\n" + assign
+            + f"\nDEFINE\n  stopped := {stopped};\n"
+            + _nested_spec(window, past))
+
+
+def counter_model(window: int = WINDOW, past: bool = True,
+                  domains=DOMAINS, pushdown: bool = False) -> str:
+    if pushdown:
+        decl, first, same, reset = "  stopped : boolean;\n", \
+            "stopped ? 1 : 0", "next(stopped)", "0"
+    else:
+        decl, first, reset = _vars(domains), "1", "0"
+        same = " & ".join(f"next({v}) = {v}" for v, _ in domains)
+    return ("MODULE main\nVAR\n" + decl
+            + f"  still_count : 0..{window};\n"
+            + "\nASSIGN\n"
+            + f"  init(still_count) := {first};\n"
+            + f"  next(still_count) := ({same})\n"
+            + f"                       ? (still_count < {window} ? still_count + 1"
+              f" : {window}) : {reset};\n"
+            + "\nLTLSPEC\n"
+            + f"  {'H' if past else 'G'} (still_count < {window})\n")
+
+
+def stillness_model(encoding: str, window: int = WINDOW, past: bool = True,
+                    domains=DOMAINS, pushdown: bool = False) -> str:
+    if encoding not in ENCODINGS:
+        raise ValueError(f"unknown encoding {encoding!r} "
+                         f"(choose from {', '.join(ENCODINGS)})")
+    make = nested_model if encoding == "nested" else counter_model
+    return make(window, past, domains, pushdown)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Tight integer domains
+# ──────────────────────────────────────────────────────────────────────────
+INT_VARIABLES = tuple(v for v, (_, is_int) in VARIABLES.items() if is_int)
+
+Domain = namedtuple("Domain", "lo hi values")       # values: sorted, distinct
+
+_DECL_RE = re.compile(
+    r"^([ \t]*)(prev_)?(\w+)([ \t]*:[ \t]*)(-?\d+)[ \t]*\.\.[ \t]*(-?\d+)([ \t]*;)", re.M)
+_PAST_RE = re.compile(r"\b[YHOSZ]\s*\(|\bT\b|\bS\b")
+
+
+def infer_domains(csv_path: str, variables=INT_VARIABLES) -> dict:
+    """
+    ``{variable: Domain}`` over the rows the trace writer keeps (six
+    columns, all of ``variables`` integers).
+    """
+    cols   = [VARIABLES[v][0] for v in variables]
+    seen   = [set() for _ in variables]
+    adders = [s.add for s in seen]
+    with open(csv_path, "r", encoding="utf-8") as fh:
+        for raw in fh:
+            parts = raw.rstrip("\n").split(",", 6)
+            if len(parts) < 6:
+                continue
+            try:
+                values = [int(parts[c]) for c in cols]
+            except ValueError:
+                continue
+            for add, value in zip(adders, values):
+                add(value)
+    return {v: Domain(min(s), max(s), sorted(s))
+            for v, s in zip(variables, seen) if s}
+
+
+def dense_maps(domains: dict) -> dict:
+    """``{variable: {value: index}}`` onto ``0..k-1``."""
+    return {v: {value: i for i, value in enumerate(d.values)}
+            for v, d in domains.items()}
+
+
+def tighten(text: str, domains: dict, dense: bool = False) -> str:
+    """
+    Rewrite the ``v : lo..hi;`` declarations of ``text`` (and of their
+    ``prev_v`` copies) to the inferred domains.  ``dense`` raises
+    ValueError for a model with ``dense_conflicts``.
+    """
+    if dense:
+        conflicts = dense_conflicts(text, tuple(domains))
+        if conflicts:
+            raise ValueError("dense domains would change the model's meaning at "
+                             + "; ".join(conflicts))
+
+    def repl(m):
+        d = domains.get(m.group(3))
+        if d is None:
+            return m.group(0)
+        lo, hi = (0, len(d.values) - 1) if dense else (d.lo, d.hi)
+        return (f"{m.group(1)}{m.group(2) or ''}{m.group(3)}{m.group(4)}"
+                f"{lo}..{hi}{m.group(7)}")
+    return _DECL_RE.sub(repl, text)
+
+
+_OPERAND_RE = re.compile(r"\b(?:next|init)\s*\(\s*((?:prev_)?\w+)\s*\)")
+_TOKEN_RE   = re.compile(r"\w+|:=|<=|>=|!=|->|<->|\S")
+_ORDER_OPS  = {"<", ">", "<=", ">=", "+", "-", "*", "/", "mod", "in"}
+_EQ_OPS     = {"=", "!=", ":="}
+
+
+def dense_conflicts(text: str, variables=INT_VARIABLES) -> list:
+    """
+    Uses of ``variables`` (or their ``prev_`` copies) in ``text`` that a
+    dense remapping would change the meaning of: order comparisons,
+    arithmetic, set membership and comparisons with integer constants.
+    Each is given as ``"line N: <source line>"``; an empty list means the
+    model only compares the variables with each other for equality.
+    """
+    names = set(variables) | {f"prev_{v}" for v in variables}
+    out   = []
+    for n, line in enumerate(text.splitlines(), 1):
+        code = line.split("--", 1)[0]
+        if _DECL_RE.match(code):
+            continue
+        toks = _TOKEN_RE.findall(_OPERAND_RE.sub(r"\1", code))
+        for i, tok in enumerate(toks):
+            if tok not in names:
+                continue
+            left  = toks[i - 1] if i else ""
+            right = toks[i + 1] if i + 1 < len(toks) else ""
+            const = ((right in _EQ_OPS and i + 2 < len(toks)
+                      and toks[i + 2].lstrip("-").isdigit())
+                     or (left in _EQ_OPS and i >= 2 and toks[i - 2].isdigit()))
+            if left in _ORDER_OPS or right in _ORDER_OPS or const:
+                out.append(f"line {n}: {line.strip()}")
+                break
+    return out
+
+
+def declared_domains(text: str) -> dict:
+    """``{variable: (lo, hi)}`` of the integer declarations in ``text``."""
+    return {(m.group(2) or "") + m.group(3): (int(m.group(5)), int(m.group(6)))
+            for m in _DECL_RE.finditer(text)}
+
+
+def is_past(text: str) -> bool:
+    """True if the LTLSPEC uses past-time operators (verify with ``-r``)."""
+    spec = text[text.find("LTLSPEC"):]
+    return bool(_PAST_RE.search(spec))
@@ -0,0 +1,517 @@
+"""
+Front end for the SMV subset of NuRV/models, for the in-process monitors.
+
+Reads ``MODULE main`` with ``VAR`` (``boolean`` and ``lo..hi``), ``DEFINE``,
+``ASSIGN`` (``init(v)``, ``next(v)``, ``v := e``) and ``LTLSPEC`` over
+``G F X U`` and ``H O Y Z S``, and compiles each spec into
+
+``formula``   a common/ltl3.py formula over atoms ``a0, a1, …``; every
+              maximal subformula without future operators is one atom, so
+              a past-time body is evaluated per row, not progressed
+``source``    Python source of a labeller factory: one function per row that
+              reads the input variables from the six-column row, steps the
+              ``ASSIGN`` state and the past operators' bits, and returns the
+              atoms as a bit mask
+
+A spec without future operators (``H (...)``) holds at every step under
+``verify_property -r``; it is monitored as ``G (spec)``, and ``past`` is set.
+Input variables (declared, never assigned) come from the trace columns of
+the same name, or from a derived predicate such as ``stopped`` (pushdown
+models).  Domains are not range-checked.
+
+``load_model`` caches both forms on disk, keyed by the SHA-256 of the model
+text (``NURV_SMV_CACHE``, default ``~/.cache/nurv-smv``; ``off`` disables),
+with the compiled code objects marshalled per interpreter version, so a
+later run of an unchanged model neither parses nor compiles.
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+
+from common.ltl3 import (And, F, FutureMonitor, G, Implies, Not, Or, TT, FF,
+                         U, X, ap, from_data, to_data, stopped)
+from common.trace import COLUMNS
+
+SMV_CACHE = os.environ.get(
+    "NURV_SMV_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "nurv-smv"))
+FORMAT_VERSION = 1                      # bump when the compiled form changes
+
+# derived input variable → factory of a stateful ``row → value``
+DERIVED = {"stopped": stopped()}
+
+Spec  = namedtuple("Spec", "formula names source past")
+# labellers[i]: factory of spec i's ``row → mask``, built from its source
+Model = namedtuple("Model", "path specs labellers hit load_s")
+
+FUTURE = ("G", "F", "X", "U")
+PAST   = ("H", "O", "Y", "Z", "S")
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Lexer / parser  →  tuples ``(op, *args)``
+# ──────────────────────────────────────────────────────────────────────────
+_TOKEN_RE = re.compile(r"""
+    (?P<skip>[ \t\r\n]+|--[^\n]*)
+  | (?P<num>\d+)
+  | (?P<id>[A-Za-z_][A-Za-z0-9_$\#]*)
+  | (?P<op>:=|\.\.|<->|->|!=|<=|>=|[=<>&|!()\;:?+\-*,])
+""", re.X)
+
+SECTIONS = ("MODULE", "VAR", "IVAR", "DEFINE", "ASSIGN", "LTLSPEC")
+_UNARY   = {"!": "not", "G": "G", "F": "F", "X": "X",
+            "H": "H", "O": "O", "Y": "Y", "Z": "Z"}
+# binary operator → precedence (tighter binds higher); ``->`` is right-assoc
+_BINARY  = {"->": 1, "<->": 2, "|": 4, "xor": 4, "&": 5, "U": 6, "S": 6,
+            "=": 7, "!=": 7, "<": 7, "<=": 7, ">": 7, ">=": 7, "+": 8, "-": 8}
+_BINARY_OP = {"->": "implies", "<->": "iff", "|": "or", "&": "and",
+              "=": "eq", "!=": "ne", "<": "lt", "<=": "le", ">": "gt",
+              ">=": "ge", "+": "add", "-": "sub"}
+_TERNARY = 3
+
+
+def _tokens(text: str, path: str) -> list:
+    out, pos, line = [], 0, 1
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if m is None:
+            raise ValueError(f"{path}:{line}: unexpected {text[pos]!r}")
+        if m.lastgroup != "skip":
+            out.append((m.lastgroup, m.group(), line))
+        line += m.group().count("\n")
+        pos   = m.end()
+    out.append(("eof", "", line))
+    return out
+
+
+class _Parser:
+
+    def __init__(self, text: str, path: str) -> None:
+        self.toks = _tokens(text, path)
+        self.path = path
+        self.i    = 0
+
+    # ── token helpers ───────────────────────────────────────────────────
+    def peek(self) -> str:
+        return self.toks[self.i][1]
+
+    def take(self, expect: str = None) -> str:
+        kind, text, line = self.toks[self.i]
+        if expect is not None and text != expect:
+            self.fail(f"expected {expect!r}, found {text or 'end of file'!r}")
+        if kind == "eof":
+            self.fail("unexpected end of file")
+        self.i += 1
+        return text
+
+    def ident(self) -> str:
+        if self.toks[self.i][0] != "id":
+            self.fail(f"expected a name, found {self.peek()!r}")
+        return self.take()
+
+    def fail(self, msg: str):
+        raise ValueError(f"{self.path}:{self.toks[self.i][2]}: {msg}")
+
+    # ── sections ────────────────────────────────────────────────────────
+    def module(self) -> dict:
+        m = {"vars": {}, "defines": {}, "init": {}, "next": {}, "specs": []}
+        self.take("MODULE")
+        if self.ident() != "main":
+            self.fail("only MODULE main is supported")
+        while self.peek() != "":
+            sec = self.take()
+            if sec not in SECTIONS[1:]:
+                self.fail(f"unsupported section {sec!r}")
+            if sec == "LTLSPEC":
+                m["specs"].append(self.expr())
+                self.skip(";")
+                continue
+            while self.peek() not in SECTIONS and self.peek() != "":
+                getattr(self, sec.lower().replace("ivar", "var"))(m)
+        return m
+
+    def skip(self, text: str) -> None:
+        if self.peek() == text:
+            self.take()
+
+    def var(self, m: dict) -> None:
+        name = self.ident()
+        self.take(":")
+        if self.peek() == "boolean":
+            self.take()
+            m["vars"][name] = None
+        else:
+            lo = self.integer()
+            self.take("..")
+            m["vars"][name] = (lo, self.integer())
+        self.take(";")
+
+    def integer(self) -> int:
+        sign = 1
+        if self.peek() == "-":
+            self.take()
+            sign = -1
+        if self.toks[self.i][0] != "num":
+            self.fail(f"expected an integer, found {self.peek()!r}")
+        return sign * int(self.take())
+
+    def define(self, m: dict) -> None:
+        name = self.ident()
+        self.take(":=")
+        m["defines"][name] = self.expr()
+        self.take(";")
+
+    def assign(self, m: dict) -> None:
+        if self.peek() in ("init", "next"):
+            kind = self.take()
+            self.take("(")
+            name = self.ident()
+            self.take(")")
+            self.take(":=")
+            m[kind][name] = self.expr()
+        else:
+            name = self.ident()
+            self.take(":=")
+            m["defines"][name] = self.expr()
+        self.take(";")
+
+    # ── expressions ─────────────────────────────────────────────────────
+    # precedence climbing: three frames per nesting level, so 100 nested
+    # Y(...) stay well inside the recursion limit
+    def expr(self, min_prec: int = 1):
+        left = self.unary()
+        while True:
+            tok = self.peek()
+            if tok == "?" and min_prec <= _TERNARY:
+                self.take()
+                then = self.expr()
+                self.take(":")
+                left = ("ite", left, then, self.expr(_TERNARY))
+                continue
+            prec = _BINARY.get(tok) if self.toks[self.i][0] != "num" else None
+            if prec is None or prec < min_prec:
+                return left
+            self.take()
+            right = self.expr(prec if tok == "->" else prec + 1)
+            left  = (_BINARY_OP.get(tok, tok), left, right)
+
+    def unary(self):
+        tok = self.peek()
+        if tok in _UNARY and self.toks[self.i][0] != "num":
+            self.take()
+            return (_UNARY[tok], self.unary())
+        if tok == "-":
+            self.take()
+            return ("sub", ("const", 0), self.unary())
+        return self.primary()
+
+    def primary(self):
+        kind, tok, _ = self.toks[self.i]
+        if kind == "num":
+            return ("const", int(self.take()))
+        if tok in ("TRUE", "FALSE"):
+            self.take()
+            return ("const", tok == "TRUE")
+        if tok == "(":
+            self.take()
+            e = self.expr()
+            self.take(")")
+            return e
+        if tok == "next":
+            self.take()
+            self.take("(")
+            e = self.expr()
+            self.take(")")
+            return ("next", e)
+        if kind == "id":
+            return ("var", self.take())
+        self.fail(f"unexpected {tok or 'end of file'!r}")
+
+
+def parse(text: str, path: str = "<smv>") -> dict:
+    """``{vars, defines, init, next, specs}`` of a ``MODULE main`` model."""
+    return _Parser(text, path).module()
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Compiler
+# ──────────────────────────────────────────────────────────────────────────
+def _has(e, ops) -> bool:
+    if e[0] in ops:
+        return True
+    return any(isinstance(a, tuple) and _has(a, ops) for a in e[1:])
+
+
+_PY = {"and": "({} and {})", "or": "({} or {})", "xor": "({} != {})",
+       "implies": "((not {}) or {})", "iff": "({} == {})",
+       "eq": "({} == {})", "ne": "({} != {})", "lt": "({} < {})",
+       "le": "({} <= {})", "gt": "({} > {})", "ge": "({} >= {})",
+       "add": "({} + {})", "sub": "({} - {})", "not": "(not {})"}
+
+# past operator → (initial bit, update of S[i] from the argument(s))
+_PAST_STEP = {
+    "H": (True,  "{s} = {s} and {a}"),
+    "O": (False, "{s} = {s} or {a}"),
+    "S": (False, "{s} = {b} or ({a} and {s})"),
+}
+
+
+class _Compiler:
+
+    def __init__(self, model: dict, path: str) -> None:
+        self.m       = model
+        self.path    = path
+        self.lines   = []                  # body of label(row)
+        self.slots   = [False]             # S[0]: a row has been seen
+        self.prev    = {}                  # variable → P index
+        self.temps   = {}                  # (expr, prev) → local name
+        self.inputs  = [v for v in model["vars"]
+                        if v not in model["init"] and v not in model["next"]
+                        and v not in model["defines"]]
+        self.derived = [v for v in self.inputs if v not in COLUMNS]
+        for v in self.derived:
+            if v not in DERIVED:
+                raise ValueError(f"{path}: input variable {v!r} is neither a "
+                                 f"trace column nor a derived predicate")
+        for v in model["vars"]:
+            if (v in model["init"]) != (v in model["next"]):
+                raise ValueError(f"{path}: {v!r} needs both init() and next()")
+
+    # ── inline expressions (ASSIGN) ─────────────────────────────────────
+    def inline(self, e, prev: bool) -> str:
+        """Python expression for ``e``; ``prev``: plain names are last step's."""
+        op = e[0]
+        if op == "const":
+            return repr(e[1])
+        if op == "var":
+            name = e[1]
+            if name in self.m["defines"]:
+                return self.inline(self.m["defines"][name], prev)
+            if name not in self.m["vars"]:
+                raise ValueError(f"{self.path}: undeclared {name!r}")
+            if prev:
+                idx = self.prev.setdefault(name, len(self.prev))
+                return f"P[{idx}]"
+            return f"v_{name}"
+        if op == "next":
+            if not prev:
+                raise ValueError(f"{self.path}: next() outside next(v) := ...")
+            return self.inline(e[1], False)
+        if op == "ite":
+            c, a, b = (self.inline(x, prev) for x in e[1:])
+            return f"({a} if {c} else {b})"
+        if op in PAST or op in FUTURE:
+            raise ValueError(f"{self.path}: temporal operator {op} in ASSIGN")
+        return _PY[op].format(*(self.inline(x, prev) for x in e[1:]))
+
+    def _deps(self, e, out: set, in_next: bool) -> set:
+        """Assigned variables whose value at this step ``e`` reads."""
+        op = e[0]
+        if op == "var":
+            name = e[1]
+            if name in self.m["defines"]:
+                self._deps(self.m["defines"][name], out, in_next)
+            elif name in self.m["init"] and not in_next:
+                out.add(name)
+        elif op == "next":
+            self._deps(e[1], out, False)
+        elif op != "const":
+            for a in e[1:]:
+                self._deps(a, out, in_next)
+        return out
+
+    def assigned(self) -> list:
+        """State variables in an order where each reads only earlier ones."""
+        todo = {v: self._deps(self.m["init"][v], set(), False)
+                | self._deps(self.m["next"][v], set(), True)
+                for v in self.m["init"]}
+        order = []
+        while todo:
+            ready = sorted(v for v, d in todo.items() if not d - set(order))
+            if not ready:
+                raise ValueError(f"{self.path}: circular ASSIGN among "
+                                 f"{', '.join(sorted(todo))}")
+            order += ready
+            for v in ready:
+                del todo[v]
+        return order
+
+    # ── spec expressions with shared temporaries ────────────────────────
+    def value(self, e) -> str:
+        """Local holding the current value of ``e`` (emitted once)."""
+        hit = self.temps.get(e)
+        if hit is not None:
+            return hit
+        op = e[0]
+        if op == "var" and e[1] in self.m["defines"]:
+            name = self.value(self.m["defines"][e[1]])
+            self.temps[e] = name
+            return name
+        if op in ("const", "var"):
+            return self.inline(e, False)
+        args = [self.value(a) for a in e[1:]]
+        t    = f"t{len(self.temps)}"
+        if op in ("Y", "Z"):
+            s = f"S[{len(self.slots)}]"
+            self.slots.append(op == "Z")
+            self.lines += [f"{t} = {s}", f"{s} = {args[0]}"]
+        elif op in _PAST_STEP:
+            init, step = _PAST_STEP[op]
+            s = f"S[{len(self.slots)}]"
+            self.slots.append(init)
+            self.lines += [step.format(s=s, a=args[0], b=args[-1]), f"{t} = {s}"]
+        elif op == "ite":
+            self.lines.append(f"{t} = ({args[1]} if {args[0]} else {args[2]})")
+        elif op in FUTURE or op == "next":
+            raise ValueError(f"{self.path}: {op} inside a past-time subformula")
+        else:
+            self.lines.append(f"{t} = " + _PY[op].format(*args))
+        self.temps[e] = t
+        return t
+
+    def formula(self, e, atoms: list):
+        """ltl3 formula of ``e``; maximal non-future subformulas become atoms."""
+        if not _has(e, FUTURE) and not self._future_define(e):
+            if e == ("const", True):
+                return TT
+            if e == ("const", False):
+                return FF
+            local = self.value(e)
+            if local not in atoms:
+                atoms.append(local)
+            return ap(f"a{atoms.index(local)}")
+        op, args = e[0], e[1:]
+        if op == "var":
+            return self.formula(self.m["defines"][e[1]], atoms)
+        sub = [self.formula(a, atoms) for a in args]
+        if op == "not":
+            return Not(sub[0])
+        if op == "and":
+            return And(*sub)
+        if op == "or":
+            return Or(*sub)
+        if op == "implies":
+            return Implies(*sub)
+        if op == "iff":
+            return And(Implies(*sub), Implies(sub[1], sub[0]))
+        if op in ("G", "F", "X"):
+            return {"G": G, "F": F, "X": X}[op](sub[0])
+        if op == "U":
+            return U(*sub)
+        raise ValueError(f"{self.path}: {op} over future-time operands")
+
+    def _future_define(self, e) -> bool:
+        if e[0] == "var" and e[1] in self.m["defines"]:
+            return _has(self.m["defines"][e[1]], FUTURE) \
+                or self._future_define(self.m["defines"][e[1]])
+        return any(isinstance(a, tuple) and self._future_define(a) for a in e[1:])
+
+    # ── labeller source ─────────────────────────────────────────────────
+    def compile(self, spec) -> Spec:
+        past = not _has(spec, FUTURE) and not self._future_define(spec)
+        head = []
+        for v in self.inputs:
+            if v in self.derived:
+                head.append(f"v_{v} = d_{v}(row)")
+            elif self.m["vars"][v] is None:
+                head.append(f"v_{v} = row[{COLUMNS.index(v)}] == 1")
+            else:
+                head.append(f"v_{v} = row[{COLUMNS.index(v)}]")
+        order = self.assigned()
+        if order:
+            head.append("if S[0]:")
+            head += [f"    v_{v} = {self.inline(self.m['next'][v], True)}"
+                     for v in order]
+            head.append("else:")
+            head += [f"    v_{v} = {self.inline(self.m['init'][v], False)}"
+                     for v in order]
+        head.append("S[0] = True")
+
+        atoms   = []
+        formula = self.formula(("G", spec) if past else spec, atoms)
+        tail    = [f"P[{i}] = v_{v}" for v, i in self.prev.items()]
+        tail   += ["m = 0"] + [f"if {a}: m |= {1 << i}" for i, a in enumerate(atoms)]
+        body    = "".join(f"        {ln}\n" for ln in head + self.lines + tail)
+        source  = ("def make():\n"
+                   f"    S = {self.slots!r}\n"
+                   f"    P = [None] * {len(self.prev)}\n"
+                   + "".join(f"    d_{v} = DERIVED[{v!r}]()\n" for v in self.derived)
+                   + "    def label(row):\n" + body
+                   + "        return m\n"
+                   "    return label\n")
+        return Spec(formula, [f"a{i}" for i in range(len(atoms))], source, past)
+
+
+def compile_specs(text: str, path: str = "<smv>") -> list:
+    """One ``Spec`` per LTLSPEC of the model, in file order."""
+    model = parse(text, path)
+    if not model["specs"]:
+        raise ValueError(f"{path}: no LTLSPEC")
+    return [_Compiler(model, path).compile(spec) for spec in model["specs"]]
+
+
+def _code(source: str, path: str):
+    return compile(source, f"<labeller {os.path.basename(path)}>", "exec")
+
+
+def labeller(code):
+    """Labeller factory from a compiled ``Spec`` source (code object)."""
+    namespace = {"DERIVED": DERIVED}
+    exec(code, namespace)
+    return namespace["make"]
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Model-hash cache
+# ──────────────────────────────────────────────────────────────────────────
+def load_model(path: str) -> Model:
+    """The compiled specs of the model at ``path``, from the cache if possible."""
+    t0 = time.perf_counter()
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    key  = f"{hashlib.sha256(raw).hexdigest()}-v{FORMAT_VERSION}"
+    base = os.path.join(SMV_CACHE, key[:2], key)
+    tag  = sys.implementation.cache_tag
+
+    if SMV_CACHE != "off":
+        try:
+            with open(base + ".json", encoding="utf-8") as fh:
+                data = json.load(fh)
+            with open(f"{base}.{tag}.code", "rb") as fh:
+                codes = marshal.load(fh)
+            specs = [Spec(from_data(d["formula"]), d["names"], d["source"], d["past"])
+                     for d in data["specs"]]
+            return Model(path, specs, [labeller(c) for c in codes], True,
+                         time.perf_counter() - t0)
+        except (OSError, ValueError, KeyError, EOFError, TypeError):
+            pass
+
+    specs = compile_specs(raw.decode("utf-8"), path)
+    codes = [_code(s.source, path) for s in specs]
+    if SMV_CACHE != "off":
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        for name, write in (
+                (f"{base}.{tag}.code", lambda fh: marshal.dump(codes, fh)),
+                (base + ".json", lambda fh: fh.write(json.dumps(
+                    {"model": os.path.abspath(path),
+                     "specs": [{"formula": to_data(s.formula), "names": s.names,
+                                "source": s.source, "past": s.past}
+                               for s in specs]}).encode()))):
+            tmp = f"{name}.{os.getpid()}"
+            with open(tmp, "wb") as fh:
+                write(fh)
+            os.replace(tmp, name)
+    return Model(path, specs, [labeller(c) for c in codes], False,
+                 time.perf_counter() - t0)
+
+
+def model_monitor(model: Model, index: int = 0) -> FutureMonitor:
+    """Three-valued monitor of the ``index``-th LTLSPEC (NuRV's ``-n``)."""
+    spec = model.specs[index]
+    return FutureMonitor(spec.formula, names=spec.names,
+                         labeller=model.labellers[index])
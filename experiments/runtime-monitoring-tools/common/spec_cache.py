@@ -0,0 +1,104 @@
+"""
+On-disk cache of parsed RTAMT specifications.
+
+``parsed_spec`` declares the variables, parses the formula and pickles the
+resulting specification object, keyed by the SHA-256 of the formula text,
+the declarations, the specification class, the installed rtamt (path and
+modification time) and the Python version.  A later run with the same
+formula unpickles it and skips the parser (and the ANTLR grammar) entirely,
+which matters for the not-stopping formula with its thousands of ``prev``
+nodes and for short traces.
+
+``RTAMT_SPEC_CACHE`` sets the cache directory (default
+``~/.cache/rtamt-spec``); ``RTAMT_SPEC_CACHE=off`` always parses.  Classes
+whose parsed form cannot be pickled (the C++-backed online specifications
+of some rtamt builds) are parsed every run; a marker file records this so
+later runs do not retry the pickling.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+
+SPEC_CACHE = os.environ.get(
+    "RTAMT_SPEC_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "rtamt-spec"))
+FORMAT_VERSION = 1                      # bump when the key or layout changes
+
+# nesting of the parsed tree is linear in the formula depth
+_PICKLE_RECURSION = 100_000
+
+
+def _rtamt_stamp() -> str:
+    """Where the imported rtamt lives and when it was installed (cheap)."""
+    module = sys.modules.get("rtamt")
+    path   = getattr(module, "__file__", None)
+    if not path:
+        return "unknown"
+    try:
+        return f"{path}:{os.stat(path).st_mtime_ns}"
+    except OSError:
+        return path
+
+
+def spec_key(cls, declarations, formula: str, sub_specs=()) -> str:
+    """Cache key of ``formula`` parsed by ``cls`` with ``declarations``."""
+    h = hashlib.sha256()
+    for part in (f"v{FORMAT_VERSION}", f"{cls.__module__}.{cls.__qualname__}",
+                 _rtamt_stamp(), sys.implementation.cache_tag,
+                 repr(tuple(declarations)), *sub_specs, formula):
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def parse_spec(cls, declarations, formula: str, sub_specs=()):
+    """Parse without the cache."""
+    spec = cls()
+    for name, kind in declarations:
+        spec.declare_var(name, kind)
+    for sub in sub_specs:
+        spec.add_sub_spec(sub)
+    spec.spec = formula
+    spec.parse()
+    return spec
+
+
+def parsed_spec(cls, declarations, formula: str, sub_specs=()):
+    """
+    ``(spec, hit)``: an instance of ``cls`` with ``declarations`` (pairs of
+    name and type) declared, ``sub_specs`` added and ``formula`` parsed,
+    unpickled from the cache when ``hit``.
+    """
+    if SPEC_CACHE == "off":
+        return parse_spec(cls, declarations, formula, sub_specs), False
+    key  = spec_key(cls, declarations, formula, sub_specs)
+    base = os.path.join(SPEC_CACHE, key[:2], key)
+    try:
+        with open(base + ".pickle", "rb") as fh:
+            return pickle.load(fh), True
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+            ImportError, TypeError, ValueError):
+        pass
+
+    spec = parse_spec(cls, declarations, formula, sub_specs)
+    if os.path.exists(base + ".unpicklable"):
+        return spec, False
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, _PICKLE_RECURSION))
+    try:
+        data = pickle.dumps(spec, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+        data = None
+    finally:
+        sys.setrecursionlimit(limit)
+    try:
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        name = base + (".pickle" if data is not None else ".unpicklable")
+        tmp  = f"{name}.{os.getpid()}"
+        with open(tmp, "wb") as fh:
+            fh.write(data or formula.encode())
+        os.replace(tmp, name)
+    except OSError:
+        pass                            # read-only home: parse every run
+    return spec, False
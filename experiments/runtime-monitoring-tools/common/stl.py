@@ -0,0 +1,98 @@
+"""
+RTAMT formulas for windowed properties, in three sizes.
+
+"``var`` has kept its value for the last N steps" (N equal pairs, N+1 equal
+samples) is spelled
+
+``nested``   ``(v == prev(v)) and (v == prev(prev(v))) and …`` up to N
+             ``prev``: what RTAMT/monitor_not_stopping_rtamt.py has always
+             parsed.  Every term rebuilds its ``prev`` chain, so the formula
+             has N(N+1)/2 ``prev`` nodes per variable (4,950 for N = 99).
+``shared``   the same conjunction over one chain of sub-specifications
+             ``v_p1 = prev(v)``, ``v_p2 = prev(v_p1)``, …; each shift is
+             parsed and updated once, N ``prev`` nodes per variable.
+``bounded``  ``historically[0:N-1](v == prev(v))``: all consecutive pairs of
+             the window equal, which is the same condition; constant size,
+             the window lives in the operator's buffer.
+
+All three have the same sign of robustness at every step from N on (before
+that the drivers' warm-up guard applies), so any of them can back the
+not-stopping monitor.  ``held_for`` gives the bounded form of "predicate
+held for N steps" for other windowed properties.
+"""
+
+from collections import namedtuple
+
+FORMS  = ("nested", "shared", "bounded")
+WINDOW = 99                             # equal pairs, as in the RTAMT driver
+
+# declarations: (name, type) pairs; sub_specs: ``add_sub_spec`` texts, in order
+StlSpec = namedtuple("StlSpec", "declarations sub_specs formula")
+
+
+def nested_prev(var: str, k: int) -> str:
+    expr = var
+    for _ in range(k):
+        expr = f"prev({expr})"
+    return expr
+
+
+def build_freeze_clause(var: str, window: int = WINDOW) -> str:
+    terms = [f"({var} == {nested_prev(var, k)})" for k in range(1, window + 1)]
+    return " and ".join(terms)
+
+
+def prev_chain(var: str, window: int) -> list:
+    """Sub-specifications ``v_pk = prev(v_p(k-1))`` for k = 1..window."""
+    out, below = [], var
+    for k in range(1, window + 1):
+        out.append(f"{var}_p{k} = prev({below})")
+        below = f"{var}_p{k}"
+    return out
+
+
+def held_for(predicate: str, window: int) -> str:
+    """``predicate`` at each of the last ``window`` steps (bounded form)."""
+    return f"historically[0:{window - 1}]({predicate})"
+
+
+def constant_for(var: str, window: int = WINDOW, form: str = "nested") -> tuple:
+    """``(sub_specs, clause)``: ``var`` unchanged over ``window`` pairs."""
+    if form == "nested":
+        return [], build_freeze_clause(var, window)
+    if form == "shared":
+        return prev_chain(var, window), " and ".join(
+            f"({var} == {var}_p{k})" for k in range(1, window + 1))
+    if form == "bounded":
+        return [], held_for(f"{var} == prev({var})", window)
+    raise ValueError(f"unknown form {form!r} (choose from {', '.join(FORMS)})")
+
+
+def stillness(window: int = WINDOW, form: str = "nested",
+              variables=("x", "y", "z"), out: str = "safe",
+              body: bool = False) -> StlSpec:
+    """
+    ``out = historically(not(frozen))`` over ``variables``; with ``body``
+    only the bounded ``out = not(frozen)`` (the per-shard part).
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    subs, clauses = [], []
+    for v in variables:
+        s, c = constant_for(v, window, form)
+        subs += s
+        clauses.append(f"({c})")
+    frozen  = " and ".join(clauses)
+    formula = (f"{out} = not( {frozen} )" if body
+               else f"{out} = historically( not( {frozen} ) )")
+    decls = [(v, "int") for v in variables]
+    decls += [(s.split(" = ", 1)[0], "int") for s in subs]
+    decls.append((out, "int"))
+    return StlSpec(tuple(decls), tuple(subs), formula)
+
+
+def size(spec: StlSpec) -> dict:
+    """Text length, ``prev`` nodes and sub-specifications of ``spec``."""
+    text = "\n".join(spec.sub_specs + (spec.formula,))
+    return {"chars": len(text), "prev": text.count("prev("),
+            "sub_specs": len(spec.sub_specs)}
@@ -0,0 +1,204 @@
+"""
+Live sample streams for the online drivers.
+
+A source is one of
+
+  -                 stdin (a pipe from the tracker, ``tools/feed_trace.py``, …)
+  unix:PATH         listen on a Unix stream socket at PATH and serve one feed
+  udp:[HOST:]PORT   bind a local UDP port (default host 127.0.0.1); every
+                    datagram carries whole rows, an empty datagram ends the feed
+
+carrying rows of the six-column trace schema.  ``batches`` yields what each
+read returned as ``(arrival_ns, lines)``: the chunk is split into rows once
+at buffer level (a row cut by the read boundary waits for the next chunk),
+and ``monitor_stream`` parses the batch column-wise with
+``common.trace.columns_from_lines`` and feeds every row to the monitor before
+the next read, so updates run in lock-step with arrival.  Steps count rows
+from 0, skipped rows included, as in the file mode.
+
+Ingest-to-verdict latency is measured per row from the moment its batch was
+received to the moment its verdict is known, and goes to the usual
+``StepTimer`` histogram; ``samples_per_s`` (``steps_per_s`` in the JSON
+record) is the sustained rate from the first arrival to the last verdict.
+Ctrl-C ends the feed like EOF.
+"""
+
+import os
+import socket
+import sys
+import time
+from collections import namedtuple
+
+from common.native import MONITORS
+from common.timeline import Timeline
+from common.timing import StepTimer
+from common.trace import COLUMNS, columns_from_lines
+
+CHUNK   = 1 << 16                       # bytes per read
+UDP_BUF = 1 << 22                       # receive buffer against bursts
+
+StreamResult = namedtuple(
+    "StreamResult",
+    "steps samples batches first_violation first_violation_s wall_s samples_per_s")
+
+_ns = time.perf_counter_ns
+
+
+def parse_source(text: str) -> tuple:
+    """``("stdin", None)``, ``("unix", path)`` or ``("udp", (host, port))``."""
+    if text == "-":
+        return "stdin", None
+    kind, _, rest = text.partition(":")
+    if kind == "unix" and rest:
+        return "unix", rest
+    if kind == "udp" and rest:
+        host, _, port = rest.rpartition(":")
+        try:
+            return "udp", (host or "127.0.0.1", int(port))
+        except ValueError:
+            pass
+    raise ValueError(f"bad stream source {text!r} "
+                     f"(use -, unix:PATH or udp:[HOST:]PORT)")
+
+
+def label(text: str) -> str:
+    """File-name-safe name of a source, for the timeline sidecar."""
+    return "stream-" + ("stdin" if text == "-" else
+                        "".join(c if c.isalnum() else "-" for c in text))
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Sources → (arrival_ns, lines) batches
+# ──────────────────────────────────────────────────────────────────────────
+def _split(read):
+    """Batches of complete rows from a byte stream; ``read()`` → b"" at EOF."""
+    carry = b""
+    while True:
+        data = read()
+        now  = _ns()
+        if not data:
+            if carry.strip():
+                yield now, [carry]
+            return
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            carry += data
+            continue
+        head  = carry + data[:cut] if carry else data[:cut]
+        carry = data[cut + 1:]
+        yield now, head.split(b"\n")
+
+
+def batches(source: str):
+    """``(arrival_ns, lines)`` per read from ``source`` (see module doc)."""
+    kind, addr = parse_source(source)
+    if kind == "stdin":
+        fd = sys.stdin.fileno()
+        yield from _split(lambda: os.read(fd, CHUNK))
+    elif kind == "unix":
+        if os.path.exists(addr):
+            os.unlink(addr)                       # stale socket of a dead run
+        srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            srv.bind(addr)
+            srv.listen(1)
+            print(f"⏳ Waiting for a feed on unix:{addr}")
+            conn, _ = srv.accept()
+            with conn:
+                yield from _split(lambda: conn.recv(CHUNK))
+        finally:
+            srv.close()
+            if os.path.exists(addr):
+                os.unlink(addr)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        with sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_BUF)
+            sock.bind(addr)
+            print(f"⏳ Waiting for datagrams on udp:{addr[0]}:{addr[1]}")
+            recv = sock.recv
+            while True:
+                data = recv(CHUNK)
+                now  = _ns()
+                if not data:
+                    return
+                yield now, data.rstrip(b"\n").split(b"\n")
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Lock-step monitoring
+# ──────────────────────────────────────────────────────────────────────────
+def native_update(name: str) -> tuple:
+    """
+    ``(names, update)`` of the reference monitor of ``name`` (common/native.py).
+
+    Only the monitor's own columns are parsed, as on the RTAMT path, so both
+    drop the same rows; the others stay 0 in the row it is given.
+    """
+    monitor = MONITORS[name]()
+    names   = monitor.columns
+    row     = [0] * len(COLUMNS)
+    idx     = [COLUMNS.index(n) for n in names]
+    _update = monitor.update
+
+    def update(step, values):
+        for i, v in zip(idx, values):
+            row[i] = v
+        return _update(row)
+    return names, update
+
+
+def monitor_stream(source: str, names, update, driver: str,
+                   stop_on_final: bool = False, **extra) -> StreamResult:
+    """
+    Feed each row of ``source`` to ``update(step, values)`` (``values`` the
+    ``names`` columns as ints; returns False on a violation) as its batch
+    arrives, then print and emit the usual report with ``mode="stream"``.
+    """
+    timer    = StepTimer.from_env()
+    observe  = timer.observe
+    timeline = Timeline.from_env()
+    _add     = timeline.add if timeline else None
+
+    step, samples, n_batches = 0, 0, 0
+    first = first_s = None
+    t_first = t_last = None
+    feed = batches(source)
+    try:
+        for arrival, lines in feed:
+            if t_first is None:
+                t_first = arrival
+            n_batches += 1
+            rel, cols = columns_from_lines(lines, names)
+            for r, values in zip(rel, zip(*(cols[n] for n in names))):
+                s  = step + r
+                ok = update(s, values)
+                samples += 1
+                t_last = _ns()
+                observe(s, t_last - arrival)
+                if _add:
+                    _add(s, "true" if ok else "false")
+                if not ok and first is None:
+                    first, first_s = s, (t_last - t_first) / 1e9
+                    if stop_on_final:
+                        break
+            if stop_on_final and first is not None:
+                step = first + 1                # rows up to the final verdict
+                break
+            step += len(lines)
+    except KeyboardInterrupt:
+        print("⏹ Feed interrupted")
+    finally:
+        feed.close()
+
+    wall = (t_last - t_first) / 1e9 if t_last is not None else 0.0
+    rate = samples / wall if wall > 0 else None
+    print(f"▶ Streamed {samples} samples in {n_batches} batches from {source}: "
+          f"{wall:.3f} s" + (f" ({rate:,.0f} samples/s sustained)" if rate else ""))
+    print(f"⏱ Max ingest‑to‑verdict: {timer.max_s * 1e3:.3f} ms at step "
+          f"{timer.max_step}")
+    timer.report(driver, wall, samples, first, mode="stream", source=source,
+                 batches=n_batches, **extra)
+    if timeline:
+        timeline.write(driver, source, stem=label(source))
+    return StreamResult(step, samples, n_batches, first, first_s, wall, rate)
@@ -0,0 +1,114 @@
+"""
+Run-length-encoded verdict timelines.
+
+A timeline is the sequence of maximal runs ``(start_step, end_step, verdict)``
+of equal verdicts over a trace.  Safety properties give a handful of runs
+however long the trace is, so the full per-step verdict history of a run can
+be kept next to its timing record and analysed afterwards without
+re-verifying or logging every step.  Rows the driver skipped (no verdict)
+inside a run are covered by it.
+
+With ``RV_TIMELINE=<dir>`` every driver writes
+``<dir>/<driver>-<trace name>.timeline.json``::
+
+    {"driver": ..., "trace": ..., "step_base": 1, "steps": 57600,
+     "verdicts": ["true", "false"], "runs": [[1, 4998, 0], [4999, 57600, 1]]}
+
+where the third field of a run indexes ``verdicts``.  Without it the drivers
+skip the bookkeeping entirely (``from_env`` returns ``None``).
+"""
+
+import json
+import os
+
+TIMELINE_DIR = os.environ.get("RV_TIMELINE")
+
+
+class Timeline:
+    """Verdicts appended in step order, stored as runs."""
+
+    __slots__ = ("runs", "steps", "_verdict", "_start", "_end")
+
+    def __init__(self) -> None:
+        self.runs     = []                  # closed runs
+        self.steps    = 0
+        self._verdict = self._start = self._end = None
+
+    @classmethod
+    def from_env(cls):
+        return cls() if TIMELINE_DIR else None
+
+    def add(self, step: int, verdict) -> None:
+        self.steps += 1
+        if verdict == self._verdict and self._start is not None:
+            self._end = step
+            return
+        if self._start is not None:
+            self.runs.append((self._start, self._end, self._verdict))
+        self._verdict, self._start, self._end = verdict, step, step
+
+    def extend(self, done) -> None:
+        """Append ``(step, verdict)`` pairs."""
+        add = self.add
+        for step, verdict in done:
+            add(step, verdict)
+
+    def extend_bytes(self, verdicts, first_step: int = 0,
+                     names=("false", "true")) -> None:
+        """
+        Append one verdict byte per step (0/1, as from ``common.shard``),
+        scanning for run boundaries with ``bytes.find`` instead of per step.
+        """
+        verdicts = bytes(verdicts)
+        pos, end = 0, len(verdicts)
+        while pos < end:
+            value = verdicts[pos]
+            nxt   = verdicts.find(value ^ 1, pos)
+            if nxt < 0:
+                nxt = end
+            self.add(first_step + pos, names[value])
+            self._end   = first_step + nxt - 1
+            self.steps += nxt - pos - 1
+            pos = nxt
+
+    def intervals(self) -> list:
+        """All runs, including the open last one."""
+        if self._start is None:
+            return list(self.runs)
+        return self.runs + [(self._start, self._end, self._verdict)]
+
+    # ── sidecar ─────────────────────────────────────────────────────────
+    def write(self, driver: str, trace: str, step_base: int = 0,
+              stem: str = None) -> str:
+        """
+        Write the sidecar JSON to ``$RV_TIMELINE``; returns its path.
+
+        ``stem`` replaces the trace file's stem in the sidecar name for a
+        source that is not a file; ``trace`` is then recorded as given.
+        """
+        source = trace if stem else os.path.abspath(trace)
+        names, index, runs = [], {}, []
+        for start, end, verdict in self.intervals():
+            name = str(getattr(verdict, "_n", verdict))   # omniORB enum name
+            if name not in index:
+                index[name] = len(names)
+                names.append(name)
+            runs.append([start, end, index[name]])
+        stem = stem or os.path.splitext(os.path.basename(trace))[0]
+        path = os.path.join(TIMELINE_DIR, f"{driver}-{stem}.timeline.json")
+        os.makedirs(TIMELINE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"driver": driver, "trace": source,
+                       "step_base": step_base, "steps": self.steps,
+                       "verdicts": names, "runs": runs}, fh)
+        print(f"⏱ Verdict timeline: {len(runs)} runs over {self.steps} steps "
+              f"→ {path}")
+        return path
+
+
+def load(path: str) -> list:
+    """``[(start, end, verdict), ...]`` from a sidecar file."""
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    names = data["verdicts"]
+    return [(s, e, names[v]) for s, e, v in data["runs"]]
@@ -0,0 +1,244 @@
+"""
+Low-overhead per-step latency instrumentation shared by all drivers.
+
+Every driver wraps its per-step work in ``timer.start()`` / ``timer.stop(step)``
+(or feeds externally measured gaps through ``timer.observe``).  Latencies are
+taken with ``perf_counter_ns`` and collected in an HDR-style log-bucketed
+histogram, so the full distribution is kept at constant memory.
+
+Environment knobs (read by ``StepTimer.from_env``):
+
+  RV_TIMING_SAMPLE=N   time only every N-th step (default 1 = every step)
+  RV_TIMING_JSON=PATH  write the machine-readable report to PATH ("-" = stdout)
+
+``Startup`` splits the time before the first step (imports, formula build,
+spec parsing) into named phases for the same report.
+"""
+
+import json
+import os
+import sys
+import time
+
+_ns = time.perf_counter_ns
+
+# 2**_SUB_BITS linear sub-buckets per power of two → ≤ 1/64 relative error.
+_SUB_BITS  = 7
+_SUB_COUNT = 1 << _SUB_BITS
+_SUB_HALF  = _SUB_COUNT >> 1
+_N_BUCKETS = (64 - _SUB_BITS + 2) * _SUB_HALF
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Histogram
+# ──────────────────────────────────────────────────────────────────────────
+def _bucket_index(ns: int) -> int:
+    if ns < _SUB_COUNT:
+        return ns
+    shift = ns.bit_length() - _SUB_BITS
+    return (shift << (_SUB_BITS - 1)) + (ns >> shift)
+
+
+def _bucket_high(idx: int) -> int:
+    """Highest value that maps into bucket ``idx``."""
+    if idx < _SUB_COUNT:
+        return idx
+    shift = (idx >> (_SUB_BITS - 1)) - 1
+    top   = idx - (shift << (_SUB_BITS - 1))
+    return ((top + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of non-negative nanosecond values."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _N_BUCKETS
+        self.count  = 0
+        self.total  = 0
+        self.max    = 0
+
+    def record(self, ns: int) -> None:
+        if ns < 0:
+            ns = 0
+        self.counts[_bucket_index(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        if other.max > self.max:
+            self.max = other.max
+
+    def percentile(self, q: float) -> int:
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * q // 100))     # ceil, at least one
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= rank:
+                    return min(_bucket_high(idx), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        out = {"count": self.count,
+               "mean": self.total / self.count if self.count else 0.0}
+        for q in PERCENTILES:
+            out[f"p{q:g}"] = self.percentile(q)
+        out["max"] = self.max
+        return out
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Step timer
+# ──────────────────────────────────────────────────────────────────────────
+class StepTimer:
+    """
+    Times one monitoring step at a time, optionally only 1 in ``every`` steps.
+
+    Untimed steps cost a counter decrement and no clock read.
+    """
+
+    __slots__ = ("hist", "every", "max_ns", "max_step", "_left", "_t0")
+
+    def __init__(self, every: int = 1) -> None:
+        self.hist     = LatencyHistogram()
+        self.every    = max(1, int(every))
+        self.max_ns   = 0
+        self.max_step = None
+        self._left    = 1
+        self._t0      = 0
+
+    @classmethod
+    def from_env(cls) -> "StepTimer":
+        return cls(int(os.environ.get("RV_TIMING_SAMPLE", "1") or 1))
+
+    def start(self) -> None:
+        left = self._left - 1
+        if left:
+            self._left = left
+            self._t0   = 0
+        else:
+            self._left = self.every
+            self._t0   = _ns()
+
+    def stop(self, step) -> None:
+        t0 = self._t0
+        if t0:
+            self.observe(step, _ns() - t0)
+
+    def observe(self, step, ns: int) -> None:
+        self.hist.record(ns)
+        if ns > self.max_ns:
+            self.max_ns, self.max_step = ns, step
+
+    @property
+    def max_s(self) -> float:
+        return self.max_ns / 1e9
+
+    # ── reporting ───────────────────────────────────────────────────────
+    def summary(self) -> dict:
+        out = self.hist.summary()
+        out["max_step"]     = self.max_step
+        out["sample_every"] = self.every
+        return out
+
+    def report(self, driver: str, wall_s: float, steps: int,
+               first_violation=None, step_base: int = 0, **extra) -> dict:
+        """Print the percentile line and emit the JSON record if requested."""
+        lat = self.summary()
+        ms  = " / ".join(f"{lat[f'p{q:g}'] / 1e6:.3f}" for q in PERCENTILES)
+        print(f"⏱ Latency p50/p90/p99/p99.9/max: {ms} / "
+              f"{lat['max'] / 1e6:.3f} ms "
+              f"({lat['count']} samples, 1-in-{self.every})")
+
+        return report_batch(driver, wall_s, steps, first_violation,
+                            step_base, latency_ns=lat, **extra)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Start-up phases
+# ──────────────────────────────────────────────────────────────────────────
+class Startup:
+    """
+    Wall-clock phases from driver start to the first monitored step.
+
+    Created before the heavy imports; ``mark(name)`` closes the phase that
+    ends now, so consecutive marks partition the start-up time.
+    """
+
+    def __init__(self) -> None:
+        self.t0     = self._last = _ns()
+        self.phases = {}
+
+    def mark(self, name: str) -> None:
+        now = _ns()
+        self.phases[name] = self.phases.get(name, 0.0) + (now - self._last) / 1e9
+        self._last = now
+
+    def summary(self) -> dict:
+        return {"total_s": (self._last - self.t0) / 1e9, **self.phases}
+
+    def report(self, note: str = "") -> dict:
+        """Print the phases; returns ``summary()`` for the JSON record."""
+        out   = self.summary()
+        parts = ", ".join(f"{k} {v:.3f} s" for k, v in self.phases.items())
+        print(f"⏱ Start-up {out['total_s']:.3f} s: {parts}"
+              + (f" ({note})" if note else ""))
+        return out
+
+
+def report_batch(driver: str, wall_s: float, steps: int,
+                 first_violation=None, step_base: int = 0, **extra) -> dict:
+    """Emit the JSON record for a run without per-step latencies."""
+    record = {
+        "driver":          driver,
+        "wall_s":          wall_s,
+        "steps":           steps,
+        "steps_per_s":     steps / wall_s if wall_s > 0 else None,
+        "first_violation": first_violation,
+        "step_base":       step_base,
+    }
+    record.update(extra)
+    emit_json(record)
+    return record
+
+
+def report_early_stop(step, wall_s: float, steps_done: int,
+                      steps_left: int) -> dict:
+    """
+    Print what stopping on a final verdict at ``step`` saved.
+
+    The saving is projected from the mean step rate up to the stop.  Returns
+    the fields for the JSON record.
+    """
+    saved = wall_s / steps_done * steps_left if steps_done else 0.0
+    print(f"⏹ Final verdict at step {step}: stopped with {steps_left} steps "
+          f"left, ~{saved:.3f} s saved")
+    return {"stopped_at": step, "steps_left": steps_left, "saved_s": saved}
+
+
+def emit_json(record: dict) -> None:
+    """Write ``record`` to ``$RV_TIMING_JSON`` (one JSON object per line)."""
+    dest = os.environ.get("RV_TIMING_JSON")
+    if not dest:
+        return
+    line = json.dumps(record, sort_keys=True)
+    if dest == "-":
+        print(line)
+        sys.stdout.flush()
+    else:
+        with open(dest, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
@@ -0,0 +1,50 @@
+"""
+Readers for the six-column tool-tip trace (see README → Data).
+"""
+
+COLUMNS = ("x", "y", "z", "inCameraView", "suturing", "gauze")
+_INDEX  = {name: i for i, name in enumerate(COLUMNS)}
+
+
+def read_columns(csv_path: str, names) -> tuple:
+    """
+    Read the whole trace once and return ``(steps, columns)``.
+
+    ``steps`` holds the 0-based row index of every kept row and ``columns``
+    maps each requested name to a list of ints.  Rows that are too short or
+    whose requested fields are not integers are skipped, but still advance
+    the step counter (same convention as the per-row drivers).
+    """
+    with open(csv_path, "rb") as fh:
+        return columns_from_lines(fh.read().splitlines(), names)
+
+
+def columns_from_lines(lines, names) -> tuple:
+    """Same as ``read_columns`` for an in-memory list of raw (bytes) rows."""
+    idx  = [_INDEX[n] for n in names]
+    rows = [ln.split(b",") for ln in lines]
+
+    # Fast path: rectangular, all-integer trace → transpose once in C.
+    try:
+        if rows and len(set(map(len, rows))) == 1 and len(rows[0]) > max(idx):
+            cols = list(zip(*rows))
+            return (list(range(len(rows))),
+                    {n: list(map(int, cols[i])) for n, i in zip(names, idx)})
+    except ValueError:
+        pass
+
+    need  = max(idx) + 1
+    steps = []
+    out   = {n: [] for n in names}
+    lists = [out[n] for n in names]
+    for step, parts in enumerate(rows):
+        if len(parts) < need:
+            continue
+        try:
+            vals = [int(parts[i]) for i in idx]
+        except ValueError:
+            continue
+        steps.append(step)
+        for lst, v in zip(lists, vals):
+            lst.append(v)
+    return steps, out
@@ -0,0 +1,89 @@
+"""
+The manifest of tools/generate_trace.py against the in-process monitors.
+
+A planted freeze has to violate not_stopping in every encoding, at the step
+the manifest records for that backend's semantics.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+HERE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, HERE)
+import common.smv_parse as smv_parse
+from common.ltl3 import FALSE, FUTURE_PROPERTIES, FutureMonitor
+from common.native import MONITORS, NotStopping
+
+MODELS = os.path.join(HERE, "NuRV", "models")
+SMV_MODELS = {
+    "not_stopping":   ["not_stopping_past.smv", "not_stopping_future.smv",
+                       "not_stopping_counter_past.smv",
+                       "not_stopping_counter_future.smv",
+                       "not_stopping_pushdown_past.smv",
+                       "not_stopping_pushdown_future.smv"],
+    "in_camera_view": ["instruments_past.smv", "instruments_future.smv"],
+    "suturing_gauze": ["suture_once_past.smv"],
+}
+
+
+@pytest.fixture(scope="module")
+def trace(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("trace")
+    csv, manifest = tmp / "t.csv", tmp / "t.json"
+    subprocess.run([sys.executable, os.path.join(HERE, "tools", "generate_trace.py"),
+                    str(csv), "--rows", "4000", "--seed", "11",
+                    "--freeze-at", "1500", "--dropout-at", "3500",
+                    "--suture-at", "2500", "--manifest", str(manifest)],
+                   check=True, capture_output=True)
+    rows = []
+    with open(csv) as fh:
+        for raw in fh:
+            rows.append(tuple(int(p) for p in raw.split(",")))
+    with open(manifest) as fh:
+        return rows, json.load(fh)
+
+
+def first_false(update, rows):
+    """0-based step of the first violation reported by ``update``."""
+    for step, row in enumerate(rows):
+        if not update(row):
+            return step
+    return None
+
+
+def test_freeze_steps_per_semantics(trace):
+    _, info = trace
+    expected = info["expected_first_violation"]
+    assert expected["rtamt"]["not_stopping"] == 1500
+    assert expected["nurv"]["not_stopping"] == 1501
+
+
+def test_native_rtamt_semantics(trace):
+    rows, info = trace
+    for name, cls in MONITORS.items():
+        assert first_false(cls().update, rows) == \
+            info["expected_first_violation"]["rtamt"][name]
+    assert first_false(NotStopping(semantics="nurv").update, rows) == 1501
+
+
+@pytest.mark.parametrize("prop,model", [(p, m) for p, ms in SMV_MODELS.items()
+                                        for m in ms])
+def test_smv_models(trace, prop, model, monkeypatch):
+    rows, info = trace
+    monkeypatch.setattr(smv_parse, "SMV_CACHE", "off")
+    monitor = smv_parse.model_monitor(
+        smv_parse.load_model(os.path.join(MODELS, model)))
+    assert first_false(lambda r: monitor.update(r) != FALSE, rows) == \
+        info["expected_first_violation"]["nurv"][prop]
+
+
+@pytest.mark.parametrize("prop", sorted(FUTURE_PROPERTIES))
+def test_ltl3_properties(trace, prop):
+    rows, info = trace
+    monitor = FutureMonitor(*FUTURE_PROPERTIES[prop])
+    assert first_false(lambda r: monitor.update(r) != FALSE, rows) == \
+        info["expected_first_violation"]["nurv"][prop]
@@ -0,0 +1,816 @@
+#!/usr/bin/env python3
+"""
+Cross-backend benchmark harness.
+
+Runs a property against every available backend (RTAMT online/offline, NuRV
+offline past/future, NuRV online) on one trace, with warm-up and repeated
+trials.  Each trial is a fresh driver process; its JSON record (see
+common/timing.py) supplies wall time, steps/s, latency percentiles and the
+first violation, and ``wait4`` supplies the peak RSS.  Results are written as
+JSON and two result files can be diffed to flag regressions.  ``convert``
+times the CSV → NuRV XML trace writers (in-memory ElementTree vs streaming).
+``stillness`` compares the nested and counter SMV encodings of the
+not-stopping property (common/smv.py) over a range of window sizes.
+``pushdown`` runs the not-stopping drivers on x, y, z and with ``--pushdown``
+(the ``stopped`` predicate computed client-side, reduced model) and checks
+that both give the same verdict timeline.  ``future`` runs the in-process
+three-valued monitor (tools/ltl3_monitor.py) against NuRV on the future-time
+models.  ``window`` compares the nested, shared and bounded RTAMT spellings of
+the stillness formula (common/stl.py): parse time, per-step update time and
+memory against window size.
+
+  python tools/benchmark.py run data/tool_tip_simulation_augmented.csv \\
+      --trials 5 --warmup 1 --out results.json
+  python tools/benchmark.py compare baseline.json results.json --threshold 0.1
+  python tools/benchmark.py convert big.csv --trials 3
+  python tools/benchmark.py stillness data/tool_tip_simulation_augmented.csv \\
+      --windows 10 25 50 100 200
+  python tools/benchmark.py pushdown data/tool_tip_simulation_augmented.csv \\
+      --orb "-ORBInitRef NameService=IOR:..." --orb-pushdown "-ORBInitRef ..."
+  python tools/benchmark.py future data/tool_tip_simulation_augmented.csv \\
+      --orb not_stopping="-ORBInitRef NameService=IOR:..."
+  python tools/benchmark.py window data/tool_tip_simulation_augmented.csv \\
+      --windows 10 50 99 200
+
+NuRV backends need the NuRV binary (``$NURV_CMD``); the online backend is only
+run when ``--orb`` is given and the server has the matching model loaded.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import platform
+import shlex
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+NURV = os.path.join(HERE, "NuRV")
+RTAMT = os.path.join(HERE, "RTAMT")
+
+sys.path.insert(0, HERE)
+from common.nurv import nurv_build
+from common.nurv_trace import VARIABLES, write_trace
+from common.smv import ENCODINGS, stillness_model
+from common.spec_cache import parse_spec
+from common.stl import FORMS, size, stillness
+from common.timeline import load
+from common.timing import LatencyHistogram
+from common.trace import read_columns
+DEFAULT_NURV_CMD = "/home/okitim/Programs/RV/NuRV-2.0.0-linuxx64/NuRV"
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Property × backend registry: backend → argv before the trace path
+# ──────────────────────────────────────────────────────────────────────────
+def _nurv(script, model):
+    return [os.path.join(NURV, script), os.path.join(NURV, "models", model)]
+
+
+PROPERTIES = {
+    "in_camera_view": {
+        "rtamt-online":        [os.path.join(RTAMT, "monitor_one_tool_rtamt.py")],
+        "rtamt-offline":       [os.path.join(RTAMT, "monitor_one_tool_rtamt.py"),
+                                "--offline"],
+        "nurv-offline-past":   _nurv("monitor_one_tool_nurv_local_past.py",
+                                     "instruments_past.smv"),
+        "nurv-offline-future": _nurv("monitor_one_tool_nurv_local_future.py",
+                                     "instruments_future.smv"),
+        "nurv-online":         [os.path.join(NURV, "monitor_one_tool_nurv_online.py")],
+    },
+    "not_stopping": {
+        "rtamt-online":        [os.path.join(RTAMT, "monitor_not_stopping_rtamt.py")],
+        "rtamt-offline":       [os.path.join(RTAMT, "monitor_not_stopping_rtamt.py"),
+                                "--offline"],
+        "nurv-offline-past":   _nurv("monitor_not_stopping_nurv_local_past.py",
+                                     "not_stopping_past.smv"),
+        "nurv-offline-future": _nurv("monitor_not_stopping_nurv_local_future.py",
+                                     "not_stopping_future.smv"),
+        "nurv-online":         [os.path.join(NURV, "monitor_not_stopping_nurv_online.py")],
+    },
+    "suturing_gauze": {
+        "rtamt-online":        [os.path.join(RTAMT, "monitor_suturing_gauze_rtamt.py")],
+        "rtamt-offline":       [os.path.join(RTAMT, "monitor_suturing_gauze_rtamt.py"),
+                                "--offline"],
+        "nurv-offline-past":   _nurv("monitor_suturing_gauze_nurv_past.py",
+                                     "suture_once_past.smv"),
+        "nurv-online":         [os.path.join(NURV, "monitor_suturing_gauze_nurv_online.py")],
+    },
+}
+
+
+def available(backend: str, orb_args: list) -> tuple:
+    """Return ``(ok, reason)`` for running ``backend`` on this machine."""
+    if backend.startswith("rtamt"):
+        if importlib.util.find_spec("rtamt") is None:
+            return False, "rtamt not importable"
+    elif backend == "nurv-online":
+        if not orb_args:
+            return False, "no --orb arguments"
+        if importlib.util.find_spec("omniORB") is None:
+            return False, "omniORB not importable"
+    elif backend.startswith("nurv"):
+        if not os.access(os.environ.get("NURV_CMD", DEFAULT_NURV_CMD), os.X_OK):
+            return False, "NuRV binary not found (set NURV_CMD)"
+    return True, ""
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# One trial
+# ──────────────────────────────────────────────────────────────────────────
+def run_trial(argv: list, env: dict = None) -> dict:
+    fd, rec_path = tempfile.mkstemp(suffix=".jsonl")
+    os.close(fd)
+    env = dict(os.environ, **(env or {}), RV_TIMING_JSON=rec_path)
+    try:
+        t0   = time.perf_counter()
+        proc = subprocess.Popen(argv, env=env, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        out  = proc.stdout.read()
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode  = os.waitstatus_to_exitcode(status)
+        elapsed = time.perf_counter() - t0
+        with open(rec_path, encoding="utf-8") as fh:
+            lines = [ln for ln in fh if ln.strip()]
+    finally:
+        os.remove(rec_path)
+
+    if proc.returncode != 0 or not lines:
+        tail = out.decode("utf-8", "replace").strip().splitlines()[-5:]
+        raise RuntimeError(f"exit {proc.returncode}: " + " | ".join(tail))
+
+    rec = json.loads(lines[-1])
+    fv  = rec.get("first_violation")
+    return {
+        "process_wall_s": elapsed,
+        "wall_s":         rec["wall_s"],
+        "steps":          rec["steps"],
+        "steps_per_s":    rec.get("steps_per_s"),
+        "latency_ns":     rec.get("latency_ns"),
+        "peak_rss_kb":    usage.ru_maxrss,
+        "first_violation": None if fv is None else fv - rec.get("step_base", 0),
+    }
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+def summarise(trials: list) -> dict:
+    out = {"trials": len(trials)}
+    for key in ("wall_s", "process_wall_s", "steps_per_s"):
+        vals = [t[key] for t in trials if t[key] is not None] or [None]
+        out[key] = {"median": _median(vals),
+                    "min": min(vals, key=lambda v: v or 0),
+                    "max": max(vals, key=lambda v: v or 0)}
+    lats = [t["latency_ns"] for t in trials if t["latency_ns"]]
+    if lats:
+        out["latency_ns"] = {k: _median(l[k] for l in lats)
+                             for k in ("p50", "p90", "p99", "p99.9", "max")}
+    out["peak_rss_kb"] = max(t["peak_rss_kb"] for t in trials)
+    out["steps"]       = trials[-1]["steps"]
+    violations = sorted({t["first_violation"] for t in trials},
+                        key=lambda v: (v is None, v))
+    out["first_violation"] = violations[0] if len(violations) == 1 else violations
+    return out
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# run / compare
+# ──────────────────────────────────────────────────────────────────────────
+def cmd_run(args) -> None:
+    orb_args = shlex.split(args.orb) if args.orb else []
+    props    = list(PROPERTIES) if "all" in args.property else args.property
+    results  = {}
+    for prop in props:
+        results[prop] = {}
+        for backend, argv in PROPERTIES[prop].items():
+            if "all" not in args.backend and backend not in args.backend:
+                continue
+            ok, why = available(backend, orb_args)
+            if not ok:
+                print(f"– {prop:15s} {backend:20s} skipped: {why}")
+                results[prop][backend] = {"skipped": why}
+                continue
+            full = [sys.executable, argv[0]]
+            if backend == "nurv-online":
+                full += orb_args
+            full += argv[1:] + [args.trace]
+            try:
+                for _ in range(args.warmup):
+                    run_trial(full)
+                trials = [run_trial(full) for _ in range(args.trials)]
+            except RuntimeError as exc:
+                print(f"✘ {prop:15s} {backend:20s} failed: {exc}")
+                results[prop][backend] = {"error": str(exc)}
+                continue
+            summary = summarise(trials)
+            results[prop][backend] = summary
+            print(f"▶ {prop:15s} {backend:20s} "
+                  f"{summary['wall_s']['median']:.3f} s, "
+                  f"{summary['steps_per_s']['median'] or 0:,.0f} steps/s, "
+                  f"RSS {summary['peak_rss_kb'] / 1024:.1f} MiB, "
+                  f"first violation {summary['first_violation']}")
+
+    report = {
+        "meta": {
+            "trace":    os.path.abspath(args.trace),
+            "trace_bytes": os.path.getsize(args.trace),
+            "trials":   args.trials,
+            "warmup":   args.warmup,
+            "host":     platform.node(),
+            "python":   platform.python_version(),
+            "date":     time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Results written to {args.out}")
+
+
+# metric path, True if larger is worse
+METRICS = (
+    (("wall_s", "median"),      True),
+    (("steps_per_s", "median"), False),
+    (("latency_ns", "p99"),     True),
+    (("peak_rss_kb",),          True),
+)
+
+
+def _get(d: dict, path: tuple):
+    for key in path:
+        if not isinstance(d, dict) or key not in d:
+            return None
+        d = d[key]
+    return d
+
+
+def cmd_compare(args) -> None:
+    with open(args.old, encoding="utf-8") as fh:
+        old = json.load(fh)["results"]
+    with open(args.new, encoding="utf-8") as fh:
+        new = json.load(fh)["results"]
+
+    regressions = 0
+    for prop in sorted(set(old) & set(new)):
+        for backend in sorted(set(old[prop]) & set(new[prop])):
+            a, b = old[prop][backend], new[prop][backend]
+            if "trials" not in a or "trials" not in b:
+                continue
+            if a["first_violation"] != b["first_violation"]:
+                regressions += 1
+                print(f"✘ {prop} {backend}: first violation "
+                      f"{a['first_violation']} → {b['first_violation']}")
+            for path, larger_is_worse in METRICS:
+                va, vb = _get(a, path), _get(b, path)
+                if not va or vb is None:
+                    continue
+                change = (vb - va) / va
+                worse  = change > args.threshold if larger_is_worse \
+                         else change < -args.threshold
+                mark   = "✘" if worse else " "
+                regressions += worse
+                print(f"{mark} {prop:15s} {backend:20s} {'.'.join(path):20s} "
+                      f"{va:>14.6g} → {vb:<14.6g} ({change:+.1%})")
+    if regressions:
+        print(f"{regressions} regression(s) beyond ±{args.threshold:.0%}")
+        sys.exit(1)
+    print("No regressions.")
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# convert: CSV → NuRV XML trace writers
+# ──────────────────────────────────────────────────────────────────────────
+PROJECTIONS = {
+    "xyz":      ("x", "y", "z"),
+    "camera":   ("inCameraView",),
+    "suturing": ("suturing", "gauze"),
+}
+
+
+def etree_trace(csv_path: str, xml_path: str, variables) -> int:
+    """The offline drivers' former in-memory ElementTree conversion."""
+    import xml.etree.ElementTree as ET
+
+    cols = [VARIABLES[v] for v in variables]
+    root = ET.Element("counter-example",
+                      {"type": "0", "id": "1", "desc": "LTL Counterexample"})
+    step = 0
+    with open(csv_path, "r", encoding="utf-8") as fh:
+        for step, raw in enumerate(fh, 1):
+            parts = raw.rstrip("\n").split(",", 6)
+            if len(parts) < 6:
+                continue
+            try:
+                values = [str(int(parts[c])) if is_int else
+                          ("TRUE" if parts[c].lstrip().startswith("1") else "FALSE")
+                          for c, is_int in cols]
+            except ValueError:
+                continue
+            st = ET.SubElement(ET.SubElement(root, "node"), "state",
+                               {"id": str(step)})
+            for name, text in zip(variables, values):
+                ET.SubElement(st, "value", {"variable": name}).text = text
+    ET.ElementTree(root).write(xml_path, encoding="utf-8", xml_declaration=True)
+    return step
+
+
+WRITERS = {"etree": etree_trace, "stream": write_trace}
+
+
+def measure_child(fn, *args) -> tuple:
+    """Run ``fn(*args)`` in a forked child; return ``(wall_s, peak_rss_kb)``."""
+    t0  = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            fn(*args)
+            code = 0
+        except BaseException:
+            code = 1
+        os._exit(code)
+    _, status, usage = os.wait4(pid, 0)
+    elapsed = time.perf_counter() - t0
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"{fn.__name__} failed")
+    return elapsed, usage.ru_maxrss
+
+
+def _digest(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cmd_convert(args) -> None:
+    mb = os.path.getsize(args.trace) / 1e6
+    fd, xml_path = tempfile.mkstemp(suffix=".xml")
+    os.close(fd)
+    results = {}
+    try:
+        print(f"{'projection':<10} {'writer':<7} {'wall [s]':>9} {'MB/s':>8} "
+              f"{'peak RSS [MiB]':>15} {'XML [MB]':>9}")
+        for name in args.projection:
+            results[name] = {}
+            digests = set()
+            for writer in args.writer:
+                runs = [measure_child(WRITERS[writer], args.trace, xml_path,
+                                      PROJECTIONS[name])
+                        for _ in range(args.trials)]
+                wall = statistics.median(r[0] for r in runs)
+                rss  = max(r[1] for r in runs)
+                size = os.path.getsize(xml_path)
+                digests.add(_digest(xml_path))
+                results[name][writer] = {"wall_s": wall, "peak_rss_kb": rss,
+                                         "xml_bytes": size}
+                print(f"{name:<10} {writer:<7} {wall:>9.3f} {mb / wall:>8.1f} "
+                      f"{rss / 1024:>15.1f} {size / 1e6:>9.1f}")
+            if len(digests) > 1:
+                print(f"✘ {name}: writers produced different XML")
+                sys.exit(1)
+    finally:
+        os.remove(xml_path)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"trace": os.path.abspath(args.trace),
+                       "trace_bytes": os.path.getsize(args.trace),
+                       "results": results}, fh, indent=2)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# stillness: SMV encodings × window size
+# ──────────────────────────────────────────────────────────────────────────
+STILLNESS_DRIVERS = {
+    "past":   os.path.join(NURV, "monitor_not_stopping_nurv_local_past.py"),
+    "future": os.path.join(NURV, "monitor_not_stopping_nurv_local_future.py"),
+}
+
+
+def cmd_stillness(args) -> None:
+    ok, why = available("nurv-offline-past", [])
+    if not ok:
+        sys.exit(why)
+    tmp     = tempfile.mkdtemp(prefix="stillness-")
+    results = []
+    failed  = False
+    print(f"{'encoding':<8} {'mode':<6} {'N':>5} {'SMV [kB]':>9} "
+          f"{'build [s]':>10} {'RSS [MiB]':>10} {'p50 [µs]':>9} "
+          f"{'p99 [µs]':>9} {'verify [s]':>11} {'first violation':>16}")
+    try:
+        for mode in args.mode:
+            for n in args.windows:
+                seen = {}
+                for enc in args.encoding:
+                    model = os.path.join(tmp, f"{enc}_{mode}_{n}.smv")
+                    with open(model, "w") as fh:
+                        fh.write(stillness_model(enc, n, mode == "past"))
+                    builds = [nurv_build(model) for _ in range(args.trials)]
+                    trials = [run_trial([sys.executable, STILLNESS_DRIVERS[mode],
+                                         model, args.trace])
+                              for _ in range(args.trials)]
+                    row = {"encoding": enc, "mode": mode, "window": n,
+                           "smv_bytes": os.path.getsize(model),
+                           "build_s": statistics.median(b[0] for b in builds),
+                           "build_rss_kb": max(b[1] for b in builds),
+                           **summarise(trials)}
+                    results.append(row)
+                    seen[enc] = str(row["first_violation"])
+                    lat = row.get("latency_ns", {})
+                    print(f"{enc:<8} {mode:<6} {n:>5} "
+                          f"{row['smv_bytes'] / 1e3:>9.1f} {row['build_s']:>10.3f} "
+                          f"{row['build_rss_kb'] / 1024:>10.1f} "
+                          f"{lat.get('p50', 0) / 1e3:>9.1f} "
+                          f"{lat.get('p99', 0) / 1e3:>9.1f} "
+                          f"{row['wall_s']['median']:>11.3f} "
+                          f"{'–' if row['first_violation'] is None else row['first_violation']:>16}")
+                if len(set(seen.values())) > 1:
+                    failed = True
+                    print(f"✘ {mode} N={n}: encodings disagree on the first "
+                          f"violation {seen}")
+    finally:
+        for name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, name))
+        os.rmdir(tmp)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"trace": os.path.abspath(args.trace),
+                       "results": results}, fh, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# pushdown: x, y, z vs the client-computed stopped predicate
+# ──────────────────────────────────────────────────────────────────────────
+def _model(name: str) -> str:
+    return os.path.join(NURV, "models", name)
+
+
+def _timeline_trials(argv: list, trials: int, tmp: str) -> dict:
+    """``summarise`` of ``trials`` runs plus the last run's verdict timeline."""
+    runs = []
+    for _ in range(trials):
+        shutil.rmtree(tmp, ignore_errors=True)
+        runs.append(run_trial(argv, {"RV_TIMELINE": tmp}))
+    (name,) = os.listdir(tmp)
+    row = summarise(runs)
+    row["timeline"] = load(os.path.join(tmp, name))
+    shutil.rmtree(tmp)
+    return row
+
+
+def cmd_pushdown(args) -> None:
+    orbs = {False: shlex.split(args.orb), True: shlex.split(args.orb_pushdown)}
+    cases = []                      # (backend, pushdown?, argv)
+    if "offline" in args.path:
+        ok, why = available("nurv-offline-past", [])
+        if not ok:
+            sys.exit(why)
+        for mode in args.mode:
+            for push in (False, True):
+                model = (f"not_stopping_pushdown_{mode}.smv" if push
+                         else f"not_stopping_{mode}.smv")
+                cases.append((f"offline-{mode}", push,
+                              [sys.executable, STILLNESS_DRIVERS[mode],
+                               _model(model), args.trace]
+                              + (["--pushdown"] if push else [])))
+    if "online" in args.path:
+        if not (orbs[False] and orbs[True]):
+            print("– online skipped: needs --orb and --orb-pushdown "
+                  "(one server per model)")
+        else:
+            for push in (False, True):
+                cases.append(("online", push,
+                              [sys.executable, PROPERTIES["not_stopping"]["nurv-online"][0]]
+                              + orbs[push] + [args.trace]
+                              + (["--pushdown"] if push else [])))
+
+    # trace size per step: three integers vs one boolean
+    sizes = {}
+    fd, xml = tempfile.mkstemp(suffix=".xml")
+    os.close(fd)
+    try:
+        for push, variables in ((False, ("x", "y", "z")), (True, ("stopped",))):
+            t0 = time.perf_counter()
+            write_trace(args.trace, xml, variables)
+            sizes[push] = (os.path.getsize(xml), time.perf_counter() - t0)
+    finally:
+        os.remove(xml)
+
+    tmp     = tempfile.mkdtemp(prefix="pushdown-")
+    results = {}
+    failed  = False
+    print(f"{'path':<15} {'trace':<8} {'XML [MB]':>9} {'convert [s]':>12} "
+          f"{'wall [s]':>9} {'steps/s':>10} {'p99 [µs]':>9} {'first violation':>16}")
+    try:
+        for backend, push, argv in cases:
+            row = _timeline_trials(argv, args.trials, os.path.join(tmp, "tl"))
+            results.setdefault(backend, {})["pushdown" if push else "xyz"] = row
+            xml_mb = convert = "–"
+            if backend != "online":
+                row["xml_bytes"], row["convert_s"] = sizes[push]
+                xml_mb  = f"{row['xml_bytes'] / 1e6:.1f}"
+                convert = f"{row['convert_s']:.3f}"
+            print(f"{backend:<15} {'stopped' if push else 'x, y, z':<8} "
+                  f"{xml_mb:>9} {convert:>12} "
+                  f"{row['wall_s']['median']:>9.3f} "
+                  f"{row['steps_per_s']['median'] or 0:>10,.0f} "
+                  f"{row.get('latency_ns', {}).get('p99', 0) / 1e3:>9.1f} "
+                  f"{'–' if row['first_violation'] is None else row['first_violation']:>16}")
+            if push:
+                base = results[backend]["xyz"]
+                same = base["timeline"] == row["timeline"]
+                row["equivalent"] = same
+                speed = (base["wall_s"]["median"] / row["wall_s"]["median"]
+                         if row["wall_s"]["median"] else float("nan"))
+                print(f"{'✔' if same else '✘'} {backend}: verdict timelines "
+                      f"{'identical' if same else 'differ'} "
+                      f"({len(row['timeline'])} runs), wall ×{speed:.2f}")
+                failed |= not same
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"trace": os.path.abspath(args.trace),
+                       "results": results}, fh, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# future: in-process three-valued monitor vs NuRV on *_future.smv
+# ──────────────────────────────────────────────────────────────────────────
+LTL3 = os.path.join(HERE, "tools", "ltl3_monitor.py")
+
+
+def _falsity(timeline: list) -> list:
+    """Runs of violated / not (yet) violated; verdict names differ per backend."""
+    out = []
+    for start, end, verdict in timeline:
+        bad = verdict in ("false", "RV_False")
+        if out and out[-1][2] == bad:
+            out[-1][1] = end
+        else:
+            out.append([start, end, bad])
+    return out
+
+
+def cmd_future(args) -> None:
+    orbs = dict(o.split("=", 1) for o in args.orb)
+    tmp  = tempfile.mkdtemp(prefix="future-")
+    results, failed = {}, False
+    print(f"{'property':<15} {'backend':<20} {'wall [s]':>9} {'steps/s':>11} "
+          f"{'p50 [µs]':>9} {'p99 [µs]':>9} {'first violation':>16}")
+    try:
+        for prop in args.property:
+            cases = {"ltl3": [sys.executable, LTL3, prop, args.trace]}
+            argv  = PROPERTIES[prop]
+            for backend in ("nurv-offline-future", "nurv-online"):
+                orb_args = shlex.split(orbs.get(prop, ""))
+                ok, why  = available(backend, orb_args)
+                if not ok:
+                    print(f"– {prop:<15} {backend:<18} skipped: {why}")
+                    continue
+                full = [sys.executable, argv[backend][0]]
+                if backend == "nurv-online":
+                    full += orb_args
+                cases[backend] = full + argv[backend][1:] + [args.trace]
+            results[prop] = {}
+            for backend, full in cases.items():
+                row = _timeline_trials(full, args.trials, os.path.join(tmp, "tl"))
+                results[prop][backend] = row
+                lat = row.get("latency_ns", {})
+                print(f"{prop:<15} {backend:<20} {row['wall_s']['median']:>9.3f} "
+                      f"{row['steps_per_s']['median'] or 0:>11,.0f} "
+                      f"{lat.get('p50', 0) / 1e3:>9.1f} {lat.get('p99', 0) / 1e3:>9.1f} "
+                      f"{'–' if row['first_violation'] is None else row['first_violation']:>16}")
+            native = _falsity(results[prop]["ltl3"]["timeline"])
+            for backend, row in results[prop].items():
+                if backend == "ltl3":
+                    continue
+                same = _falsity(row["timeline"]) == native
+                row["agrees_with_ltl3"] = same
+                print(f"{'✔' if same else '✘'} {prop}: ltl3 and {backend} "
+                      f"{'agree on' if same else 'differ in'} the violated steps")
+                failed |= not same
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"trace": os.path.abspath(args.trace),
+                       "results": results}, fh, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# window: RTAMT formula forms × window size
+# ──────────────────────────────────────────────────────────────────────────
+SPEC_CLASSES = {"online-cpp": "StlDiscreteTimeOnlineSpecificationCpp",
+                "online":     "StlDiscreteTimeOnlineSpecification"}
+
+
+def _rss_kb() -> int:
+    with open("/proc/self/statm") as fh:
+        return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def child_result(fn, *args) -> dict:
+    """Run ``fn(*args)`` in a forked child; its dict plus ``peak_rss_kb``."""
+    r, w = os.pipe()
+    pid  = os.fork()
+    if pid == 0:
+        os.close(r)
+        code = 1
+        try:
+            with os.fdopen(w, "w") as fh:
+                json.dump(fn(*args), fh)
+            code = 0
+        finally:
+            os._exit(code)
+    os.close(w)
+    with os.fdopen(r) as fh:
+        data = fh.read()
+    _, status, usage = os.wait4(pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0 or not data:
+        raise RuntimeError(f"{fn.__name__}{args[:2]} failed")
+    return dict(json.loads(data), peak_rss_kb=usage.ru_maxrss)
+
+
+def _window_trial(spec_class: str, form: str, n: int, steps: list,
+                  cols: dict) -> dict:
+    """Parse the ``form`` formula for window ``n`` and feed it the rows."""
+    import rtamt
+
+    stl    = stillness(n, form)
+    before = _rss_kb()
+    t0     = time.perf_counter()
+    spec   = parse_spec(getattr(rtamt, SPEC_CLASSES[spec_class]),
+                        stl.declarations, stl.formula, stl.sub_specs)
+    parse_s = time.perf_counter() - t0
+    parsed  = _rss_kb()
+
+    hist   = LatencyHistogram()
+    update = spec.update
+    ns     = time.perf_counter_ns
+    first  = None
+    for t, x, y, z in zip(steps, cols["x"], cols["y"], cols["z"]):
+        t0  = ns()
+        rob = update(t, [("x", x), ("y", y), ("z", z)])
+        hist.record(ns() - t0)
+        if first is None and rob <= 0 and t >= n:
+            first = t
+    return {"form": form, "window": n, **size(stl), "parse_s": parse_s,
+            "parse_rss_kb": parsed - before, "run_rss_kb": _rss_kb() - before,
+            "latency_ns": hist.summary(), "steps": hist.count,
+            "first_violation": first}
+
+
+def cmd_window(args) -> None:
+    ok, why = available("rtamt-online", [])
+    if not ok:
+        sys.exit(why)
+    steps, cols = read_columns(args.trace, ("x", "y", "z"))
+    if args.steps:
+        steps = steps[:args.steps]
+    results = []
+    print(f"{'form':<8} {'N':>5} {'prev':>7} {'chars':>9} {'parse [s]':>10} "
+          f"{'parse [MiB]':>12} {'run [MiB]':>10} {'p50 [µs]':>9} "
+          f"{'p99 [µs]':>9} {'first violation':>16}")
+    failed = False
+    for n in args.windows:
+        seen = {}
+        for form in args.form:
+            trials = [child_result(_window_trial, args.spec_class, form, n,
+                                   steps, cols)
+                      for _ in range(args.trials)]
+            row = dict(trials[-1],
+                       parse_s=_median(t["parse_s"] for t in trials),
+                       latency_ns={k: _median(t["latency_ns"][k] for t in trials)
+                                   for k in ("mean", "p50", "p90", "p99", "max")},
+                       peak_rss_kb=max(t["peak_rss_kb"] for t in trials))
+            results.append(row)
+            seen[form] = row["first_violation"]
+            lat = row["latency_ns"]
+            print(f"{form:<8} {n:>5} {row['prev']:>7} {row['chars']:>9} "
+                  f"{row['parse_s']:>10.3f} {row['parse_rss_kb'] / 1024:>12.1f} "
+                  f"{row['run_rss_kb'] / 1024:>10.1f} {lat['p50'] / 1e3:>9.1f} "
+                  f"{lat['p99'] / 1e3:>9.1f} "
+                  f"{'–' if row['first_violation'] is None else row['first_violation']:>16}")
+        if len(set(seen.values())) > 1:
+            failed = True
+            print(f"✘ N={n}: forms disagree on the first violation {seen}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"trace": os.path.abspath(args.trace), "steps": len(steps),
+                       "spec_class": args.spec_class, "results": results},
+                      fh, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+def main() -> None:
+    ap  = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", help="benchmark backends on a trace")
+    run.add_argument("trace")
+    run.add_argument("--property", nargs="+", default=["all"],
+                     choices=["all"] + list(PROPERTIES))
+    run.add_argument("--backend", nargs="+", default=["all"],
+                     help="backend names, e.g. rtamt-online nurv-offline-past")
+    run.add_argument("--trials", type=int, default=3)
+    run.add_argument("--warmup", type=int, default=1)
+    run.add_argument("--orb", default="",
+                     help='ORB arguments for nurv-online, e.g. '
+                          '"-ORBInitRef NameService=IOR:..."')
+    run.add_argument("--out", default="benchmark.json")
+    run.set_defaults(func=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="diff two result files")
+    cmp_.add_argument("old")
+    cmp_.add_argument("new")
+    cmp_.add_argument("--threshold", type=float, default=0.10,
+                      help="relative change that counts as a regression")
+    cmp_.set_defaults(func=cmd_compare)
+
+    conv = sub.add_parser("convert", help="time the CSV → NuRV XML writers")
+    conv.add_argument("trace")
+    conv.add_argument("--projection", nargs="+", default=list(PROJECTIONS),
+                      choices=list(PROJECTIONS))
+    conv.add_argument("--writer", nargs="+", default=list(WRITERS),
+                      choices=list(WRITERS))
+    conv.add_argument("--trials", type=int, default=3)
+    conv.add_argument("--out", help="also write the results as JSON")
+    conv.set_defaults(func=cmd_convert)
+
+    still = sub.add_parser("stillness",
+                           help="nested vs counter SMV encoding of not_stopping")
+    still.add_argument("trace")
+    still.add_argument("--windows", nargs="+", type=int,
+                       default=[10, 25, 50, 100, 200], metavar="N")
+    still.add_argument("--encoding", nargs="+", default=list(ENCODINGS),
+                       choices=list(ENCODINGS))
+    still.add_argument("--mode", nargs="+", default=["past", "future"],
+                       choices=["past", "future"])
+    still.add_argument("--trials", type=int, default=1)
+    still.add_argument("--out", help="also write the results as JSON")
+    still.set_defaults(func=cmd_stillness)
+
+    push = sub.add_parser("pushdown",
+                          help="x, y, z vs client-computed stopped (not_stopping)")
+    push.add_argument("trace")
+    push.add_argument("--path", nargs="+", default=["offline", "online"],
+                      choices=["offline", "online"])
+    push.add_argument("--mode", nargs="+", default=["past", "future"],
+                      choices=["past", "future"])
+    push.add_argument("--orb", default="",
+                      help="ORB arguments of a server with not_stopping_*.smv")
+    push.add_argument("--orb-pushdown", default="",
+                      help="ORB arguments of a server with not_stopping_pushdown_*.smv")
+    push.add_argument("--trials", type=int, default=3)
+    push.add_argument("--out", help="also write the results as JSON")
+    push.set_defaults(func=cmd_pushdown)
+
+    fut = sub.add_parser("future",
+                         help="in-process three-valued monitor vs NuRV (future models)")
+    fut.add_argument("trace")
+    fut.add_argument("--property", nargs="+", default=["in_camera_view", "not_stopping"],
+                     choices=["in_camera_view", "not_stopping"])
+    fut.add_argument("--orb", action="append", default=[], metavar="PROPERTY=ARGS",
+                     help="ORB arguments of a NuRV server with that property's "
+                          "_future model (repeatable)")
+    fut.add_argument("--trials", type=int, default=3)
+    fut.add_argument("--out", help="also write the results as JSON")
+    fut.set_defaults(func=cmd_future)
+
+    win = sub.add_parser("window",
+                         help="nested vs shared vs bounded RTAMT stillness formula")
+    win.add_argument("trace")
+    win.add_argument("--windows", nargs="+", type=int,
+                     default=[10, 25, 50, 99, 200], metavar="N")
+    win.add_argument("--form", nargs="+", default=list(FORMS), choices=list(FORMS))
+    win.add_argument("--spec-class", choices=list(SPEC_CLASSES),
+                     default="online-cpp")
+    win.add_argument("--steps", type=int, default=20000,
+                     help="rows fed per trial (0 = whole trace)")
+    win.add_argument("--trials", type=int, default=3)
+    win.add_argument("--out", help="also write the results as JSON")
+    win.set_defaults(func=cmd_window)
+
+    args = ap.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
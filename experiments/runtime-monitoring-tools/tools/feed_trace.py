@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Play a trace into a streaming driver as a live feed.
+
+Sends the rows of a CSV trace to stdout, a Unix stream socket or a UDP port
+(the sources of common/stream.py), ``--batch`` rows per write or datagram and
+optionally paced at ``--rate`` rows/s, like a tool tracker would.  UDP ends
+with an empty datagram; a datagram that the monitor's receive buffer cannot
+take is lost, so pace UDP feeds.
+
+  python tools/feed_trace.py data/tool_tip_simulation_augmented.csv \\
+      | python RTAMT/monitor_one_tool_rtamt.py --stream -
+  python RTAMT/monitor_not_stopping_rtamt.py --stream udp:9999 &
+  python tools/feed_trace.py data/tool_tip_simulation_augmented.csv \\
+      --to udp:9999 --rate 1000 --batch 10
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+from itertools import islice
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.stream import parse_source
+
+
+def _sender(target: str, connect_s: float):
+    """``(send, close)`` for ``target``."""
+    kind, addr = parse_source(target)
+    if kind == "stdin":                                 # "-": our stdout
+        out = sys.stdout.buffer
+        def send(data):
+            out.write(data)
+            out.flush()
+        return send, out.flush
+    if kind == "unix":
+        sock     = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        deadline = time.monotonic() + connect_s
+        while True:                                     # monitor may still start
+            try:
+                sock.connect(addr)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        return sock.sendall, sock.close
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.connect(addr)
+
+    def close():
+        sock.send(b"")
+        sock.close()
+    return sock.send, close
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("csv_file")
+    ap.add_argument("--to", default="-", metavar="TARGET",
+                    help="- (stdout, default), unix:PATH or udp:[HOST:]PORT")
+    ap.add_argument("--batch", type=int, default=64, metavar="ROWS",
+                    help="rows per write / datagram (default 64)")
+    ap.add_argument("--rate", type=float, default=0, metavar="HZ",
+                    help="rows per second (default: as fast as possible)")
+    ap.add_argument("--connect-timeout", type=float, default=10.0, metavar="S",
+                    help="how long to wait for a unix: listener (default 10 s)")
+    args = ap.parse_args()
+    if args.batch < 1:
+        ap.error("--batch must be at least 1")
+
+    fh = open(args.csv_file, "rb")
+    send, close = _sender(args.to, args.connect_timeout)
+    period = args.batch / args.rate if args.rate > 0 else 0.0
+    n_rows = 0
+    t0 = time.perf_counter()
+    try:
+        # one batch of lines in memory at a time, however long the trace
+        chunks = iter(lambda: list(islice(fh, args.batch)), [])
+        for i, chunk in enumerate(chunks):
+            if period:
+                delay = t0 + i * period - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            send(b"".join(chunk))
+            n_rows += len(chunk)
+    except BrokenPipeError:                             # monitor stopped early
+        if args.to == "-":
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        fh.close()
+        try:
+            close()
+        except OSError:
+            pass
+    wall = max(time.perf_counter() - t0, 1e-9)
+    print(f"Fed {n_rows} rows in {wall:.3f} s "
+          f"({n_rows / wall:,.0f} rows/s) to {args.to}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Generate SMV models of the not-stopping property for any window size.
+
+``--encoding nested`` spells the window out as nested Y(...)/X(...) terms,
+like NuRV/models/not_stopping_{past,future}.smv; ``--encoding counter``
+uses a bounded ``still_count`` counter instead (see common/smv.py).
+``--pushdown`` declares ``stopped : boolean`` in place of x, y, z for
+traces / heartbeats that carry the precomputed predicate.
+
+  python tools/gen_smv.py --window 100 --encoding counter \\
+      -o NuRV/models/not_stopping_counter_past.smv
+  python tools/gen_smv.py --window 250 --future -o still250_future.smv
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.smv import ENCODINGS, WINDOW, stillness_model
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--window", type=int, default=WINDOW, metavar="N",
+                    help=f"rows with equal x, y, z that violate (default {WINDOW})")
+    ap.add_argument("--encoding", choices=ENCODINGS, default="counter")
+    ap.add_argument("--future", action="store_true",
+                    help="future-time LTLSPEC (verify without -r)")
+    ap.add_argument("--pushdown", action="store_true",
+                    help="observe the stopped predicate instead of x, y, z")
+    ap.add_argument("-o", "--out", help="output file (default: stdout)")
+    args = ap.parse_args()
+    if args.window < 1:
+        ap.error("--window must be at least 1")
+
+    text = stillness_model(args.encoding, args.window, not args.future,
+                           pushdown=args.pushdown)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
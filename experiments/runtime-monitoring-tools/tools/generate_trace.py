@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Synthetic tool-tip traces for monitor stress tests.
+
+Streams rows in the six-column schema of data/tool_tip_simulation_augmented.csv
+(``x,y,z,inCameraView, suturing, gauze``) to disk in constant memory, so traces
+of 10^6–10^9 rows can be produced for throughput and correctness benchmarks.
+
+The tool tip does a random walk that moves every step, interrupted by short
+stops; the camera view can drop out; gauze phases alternate with gaps and
+suturing only happens inside gaps.  With the defaults no property is violated,
+so every violation in the trace is one that was planted at a known step:
+
+  --freeze-at K        rows K-99..K+1 identical → not_stopping violated at K
+                       (RTAMT) resp. K+1 (NuRV models, ltl3_monitor.py)
+  --dropout-at K       inCameraView = 0 at K   → in_camera_view violated at K
+  --suture-at K        suturing at K while gauze has been present since step 0
+                       without a gap           → suturing_gauze violated at K
+
+The freeze is one row longer than RTAMT needs so that every encoding of
+not_stopping sees it: the NuRV models count 100 stopped steps where the RTAMT
+formula counts 99 equal pairs.  With --manifest, the first violation of each
+property is also computed with the reference monitors in common/native.py
+while generating, once per semantics (``rtamt``: RTAMT drivers and
+common/native.py; ``nurv``: NuRV models and tools/ltl3_monitor.py), and
+written next to the planted steps.  All steps are 0-based; the NuRV drivers
+and ltl3_monitor.py report step + 1.
+
+Example:
+  python tools/generate_trace.py big.csv --rows 10000000 --seed 7 \\
+      --freeze-at 5000000 --dropout-at 9000000 --manifest big.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.native import MONITORS, SEMANTICS, STILL_WINDOW, NotStopping
+
+X_MAX, Y_MAX, Z_MAX = 640, 480, 480
+BLOCK_ROWS = 1 << 16                     # rows formatted per write()
+
+
+def _range(text: str) -> tuple:
+    lo, _, hi = text.partition(":")
+    return int(lo), int(hi or lo)
+
+
+def _steps(text: str) -> list:
+    return sorted(int(t) for t in text.split(",") if t) if text else []
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Planted events → (first_step, last_step, kind) intervals sorted by start
+# ──────────────────────────────────────────────────────────────────────────
+def plan_events(args) -> list:
+    events = []
+    for k in args.freeze_at:
+        if k < STILL_WINDOW:
+            sys.exit(f"--freeze-at {k}: needs k ≥ {STILL_WINDOW}")
+        events.append((k - STILL_WINDOW, k + 1, "freeze"))   # see module doc
+    for k in args.dropout_at:
+        events.append((k, k + args.dropout_len - 1, "dropout"))
+    if len(args.suture_at) > 1:
+        sys.exit("--suture-at: only one suturing violation can be planted")
+    for k in args.suture_at:
+        events.append((k, k, "suture"))
+    for k in (e[1] for e in events):
+        if k >= args.rows:
+            sys.exit(f"planted event ends at step {k}, beyond --rows {args.rows}")
+    return sorted(events)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+# Generator
+# ──────────────────────────────────────────────────────────────────────────
+def generate(args, out) -> dict:
+    rnd      = random.Random(args.seed)
+    rand     = rnd.random
+    randint  = rnd.randint
+    stop_lo, stop_hi = args.stop_len
+    drop_lo, drop_hi = args.dropout_len_range
+    gz_lo,   gz_hi   = args.gauze_len
+    gap_lo,  gap_hi  = args.gap_len
+
+    events   = plan_events(args)
+    ev_i     = 0
+    active   = []
+    kinds    = {}
+    monitors = []                               # (semantics, monitor)
+    if args.manifest:
+        for sem in SEMANTICS:
+            monitors += [(sem, NotStopping(semantics=sem) if cls is NotStopping
+                          else cls()) for cls in MONITORS.values()]
+    first    = {sem: {n: None for n in MONITORS} for sem in SEMANTICS}
+
+    x, y, z  = X_MAX // 2, Y_MAX // 2, Z_MAX // 2
+    hold     = 0                # remaining rows of the current stop
+    was_still = False           # a stop is always followed by a move
+    drop     = 0                # remaining rows of the current dropout
+    # A planted suturing violation needs gauze present from step 0 on,
+    # so the first gauze phase lasts up to and including that step.
+    suture_k = args.suture_at[0] if args.suture_at else None
+    gauze    = 1 if suture_k is not None else 0
+    phase    = suture_k + 2 if suture_k is not None else randint(gap_lo, gap_hi)
+    moves    = (-2, -1, 1, 2)
+
+    buf = []
+    for step in range(args.rows):
+        # ── planted events override the random processes ────────────────
+        while ev_i < len(events) and events[ev_i][0] <= step:
+            active.append(events[ev_i])
+            ev_i += 1
+        if active:
+            active = [e for e in active if e[1] >= step]
+            kinds  = {e[2]: e[0] for e in active}
+
+        # ── position ────────────────────────────────────────────────────
+        if "freeze" in kinds:
+            still = step != kinds["freeze"]     # move into the frozen spot
+        elif hold:
+            hold -= 1
+            still = True
+        elif not was_still and rand() < args.stop_rate:
+            hold  = randint(stop_lo, stop_hi) - 1
+            still = True
+        else:
+            still = False
+        if not still:
+            x += moves[randint(0, 3)]
+            y += moves[randint(0, 3)]
+            z += moves[randint(0, 3)]
+            if x < 0: x = -x
+            elif x > X_MAX: x = 2 * X_MAX - x
+            if y < 0: y = -y
+            elif y > Y_MAX: y = 2 * Y_MAX - y
+            if z < 0: z = -z
+            elif z > Z_MAX: z = 2 * Z_MAX - z
+        was_still = still
+
+        # ── camera view ─────────────────────────────────────────────────
+        if "dropout" in kinds:
+            cam = 0
+        elif drop:
+            drop -= 1
+            cam = 0
+        elif rand() < args.dropout_rate:
+            drop = randint(drop_lo, drop_hi) - 1
+            cam = 0
+        else:
+            cam = 1
+
+        # ── gauze phases / gaps, suturing only inside gaps ──────────────
+        phase -= 1
+        if phase <= 0:
+            gauze = 1 - gauze
+            phase = randint(gz_lo, gz_hi) if gauze else randint(gap_lo, gap_hi)
+        if "suture" in kinds:
+            sut = 1
+        else:
+            sut = 1 if (not gauze and rand() < args.suturing) else 0
+
+        row = (x, y, z, cam, sut, gauze)
+        for sem, mon in monitors:
+            if not mon.update(row) and first[sem][mon.name] is None:
+                first[sem][mon.name] = step
+        buf.append(f"{x},{y},{z},{cam}, {sut}, {gauze}\n")
+        if len(buf) >= BLOCK_ROWS:
+            out.write("".join(buf))
+            buf.clear()
+    out.write("".join(buf))
+
+    return {
+        "rows":    args.rows,
+        "seed":    args.seed,
+        "planted": {
+            "not_stopping":   args.freeze_at,
+            "in_camera_view": args.dropout_at,
+            "suturing_gauze": args.suture_at,
+        },
+        "expected_first_violation": first if args.manifest else None,
+        "step_base": 0,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Stream a synthetic six-column tool-tip trace.")
+    ap.add_argument("out", help="output CSV path, '-' for stdout")
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--stop-rate", type=float, default=0.002,
+                    help="probability per step of starting a stop")
+    ap.add_argument("--stop-len", type=_range, default=(5, 60), metavar="MIN:MAX",
+                    help="stop length in rows (≥ 99 can violate not_stopping "
+                         "in RTAMT, ≥ 100 in the NuRV models)")
+    ap.add_argument("--dropout-rate", type=float, default=0.0,
+                    help="probability per step of a random camera dropout "
+                         "(each one violates in_camera_view)")
+    ap.add_argument("--dropout-len-range", type=_range, default=(1, 25),
+                    metavar="MIN:MAX", help="random dropout length in rows")
+    ap.add_argument("--gauze-len", type=_range, default=(500, 5000),
+                    metavar="MIN:MAX", help="gauze phase length in rows")
+    ap.add_argument("--gap-len", type=_range, default=(100, 2000),
+                    metavar="MIN:MAX", help="gap (no gauze) length in rows")
+    ap.add_argument("--suturing", type=float, default=0.5,
+                    help="probability of suturing per row inside a gap")
+    ap.add_argument("--freeze-at", type=_steps, default=[], metavar="K[,K…]")
+    ap.add_argument("--dropout-at", type=_steps, default=[], metavar="K[,K…]")
+    ap.add_argument("--dropout-len", type=int, default=1,
+                    help="length of each planted dropout")
+    ap.add_argument("--suture-at", type=_steps, default=[], metavar="K")
+    ap.add_argument("--manifest", help="write planted/expected steps as JSON")
+    args = ap.parse_args()
+
+    if args.out == "-":
+        info = generate(args, sys.stdout)
+    else:
+        with open(args.out, "w", buffering=1 << 20) as fh:
+            info = generate(args, fh)
+    if args.manifest:
+        with open(args.manifest, "w") as fh:
+            json.dump(info, fh, indent=2)
+        print(json.dumps(info["expected_first_violation"]), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
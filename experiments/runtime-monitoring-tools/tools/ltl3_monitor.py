@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Run a property through the in-process three-valued monitor.
+
+Verifies a property without NuRV: one true / false / unknown verdict per row
+(common/ltl3.py), timed per step like the other drivers, with 1-based steps
+as in NuRV.  The property is either a built-in future-time formula or any
+model of NuRV/models, read by the SMV front end (common/smv_parse.py).
+
+  python tools/ltl3_monitor.py not_stopping data/tool_tip_simulation_augmented.csv
+  python tools/ltl3_monitor.py NuRV/models/suture_once_past.smv \\
+      data/tool_tip_simulation_augmented.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.ltl3 import FALSE, FUTURE_PROPERTIES, FutureMonitor, lookahead
+from common.smv_parse import load_model, model_monitor
+from common.timeline import Timeline
+from common.timing import StepTimer, report_early_stop
+
+
+def read_rows(csv_file: str):
+    """Yield ``(step, row)`` with six integer columns; steps are 1-based."""
+    with open(csv_file, "r", encoding="utf-8") as fh:
+        for step, raw in enumerate(fh, 1):
+            parts = raw.split(",", 6)
+            if len(parts) < 6:
+                continue
+            try:
+                yield step, tuple(int(p) for p in parts[:6])
+            except ValueError:
+                continue
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("property",
+                    help=f"{' | '.join(FUTURE_PROPERTIES)} | MODEL.smv")
+    ap.add_argument("csv_file")
+    ap.add_argument("-n", "--spec", type=int, default=0, metavar="N",
+                    help="LTLSPEC index of the model (as verify_property -n)")
+    ap.add_argument("--stop-on-final", action="store_true",
+                    help="stop at the first conclusive verdict")
+    args = ap.parse_args()
+
+    extra = {}
+    if args.property.endswith(".smv"):
+        model   = load_model(args.property)
+        monitor = model_monitor(model, args.spec)
+        name    = os.path.splitext(os.path.basename(args.property))[0]
+        extra   = {"model_cache_hit": model.hit, "model_load_s": model.load_s}
+        print(f"⏱ Model {'cache hit' if model.hit else 'compiled'}: "
+              f"{model.load_s * 1e3:.1f} ms")
+    elif args.property in FUTURE_PROPERTIES:
+        monitor = FutureMonitor(*FUTURE_PROPERTIES[args.property])
+        name    = args.property
+    else:
+        ap.error(f"unknown property {args.property!r}")
+    update = monitor.update
+    driver = f"ltl3_monitor.{name}"
+    print(f"Formula lookahead: {lookahead(monitor.formula)} rows")
+
+    timer    = StepTimer.from_env()
+    _start, _stop = timer.start, timer.stop
+    timeline = Timeline.from_env()
+    _add     = timeline.add if timeline else None
+
+    rows       = read_rows(args.csv_file)
+    first      = None
+    final      = None
+    first_time = None
+    steps      = 0
+    last_step  = 0
+    t0 = time.perf_counter()
+    for step, row in rows:
+        _start()
+        verdict = update(row)
+        _stop(step)
+        steps    += 1
+        last_step = step
+        if _add:
+            _add(step, verdict)
+        if verdict == FALSE and first is None:
+            first      = step
+            first_time = time.perf_counter() - t0
+        if final is None and monitor.state.op in ("true", "false"):
+            final = verdict
+            if args.stop_on_final:
+                break
+    total = time.perf_counter() - t0
+
+    extra.update(automaton_states=monitor.states, final_verdict=final)
+    if args.stop_on_final and final is not None:
+        extra.update(report_early_stop(last_step, total, steps,
+                                       sum(1 for _ in rows)))
+    print(f"Max per-step time: {timer.max_s*1e6:.1f} µs at step {timer.max_step}")
+    print(f"▶ Wall-clock runtime: {total:.3f} s "
+          f"({monitor.states} automaton states)")
+    timer.report(driver, total, steps, first, step_base=1, mode="online", **extra)
+    if timeline:
+        timeline.write(driver, args.csv_file, step_base=1)
+    if first is None:
+        print(f"✔ No violation of {name} found "
+              f"(verdict: {final or 'unknown'}).")
+    else:
+        print(f"✘ Violation at step {first} (wall-clock time = {first_time:.3f} s)")
+
+
+if __name__ == "__main__":
+    main()
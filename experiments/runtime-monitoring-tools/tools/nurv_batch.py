@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Parallel batch runner for offline NuRV verification jobs.
+
+Runs every (model, trace) pair of a job matrix as its own ``NuRV -source``
+batch process, at most ``--workers`` at a time.  Each model's variable set
+and past/future mode come from the registry below; traces are converted
+once per variable set up front (through the trace cache of
+common/nurv_trace.py) on a process pool, then the NuRV jobs run on a thread
+pool — the threads only wait on their subprocess.  Results are printed as
+jobs finish, appended to ``--jsonl`` as they arrive, and summarised in one
+report at the end.
+
+With ``--session`` each worker keeps one interactive NuRV process per model
+(``common.nurv.NuRVSession``) and reuses its built monitor for every further
+trace of that model, instead of starting NuRV once per job.
+
+  python tools/nurv_batch.py data/*.csv --models instruments_past.smv \\
+      not_stopping_past.smv suture_once_past.smv --workers 4 --out batch.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+HERE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+MODELS_DIR = os.path.join(HERE, "NuRV", "models")
+
+sys.path.insert(0, HERE)
+from common.nurv import NURV_CMD, NuRVSession, make_cmd, run_nurv
+from common.nurv_trace import cached_trace
+
+# model file → (projected variables, past-time?)
+MODELS = {
+    "instruments_past.smv":    (("inCameraView",),      True),
+    "instruments_future.smv":  (("inCameraView",),      False),
+    "not_stopping_past.smv":   (("x", "y", "z"),        True),
+    "not_stopping_future.smv": (("x", "y", "z"),        False),
+    "not_stopping_counter_past.smv":   (("x", "y", "z"), True),
+    "not_stopping_counter_future.smv": (("x", "y", "z"), False),
+    "not_stopping_pushdown_past.smv":   (("stopped",),   True),
+    "not_stopping_pushdown_future.smv": (("stopped",),   False),
+    "suture_once_past.smv":    (("suturing", "gauze"),  True),
+}
+
+
+def _convert(job) -> tuple:
+    trace, variables = job
+    return job, cached_trace(trace, variables)
+
+
+def _run_job(job, trace, stop_on_final) -> dict:
+    model, csv_path = job
+    _, past = MODELS[os.path.basename(model)]
+    fd, cmd_file = tempfile.mkstemp(suffix=".cmd")
+    os.close(fd)
+    try:
+        make_cmd(trace.path, cmd_file, past)
+        t0 = time.perf_counter()
+        first_step, first_time, total, timer = run_nurv(model, cmd_file,
+                                                        stop_on_final)
+        wall = time.perf_counter() - t0
+    finally:
+        os.remove(cmd_file)
+    return _result(job, past, wall, total, first_step, first_time, timer)
+
+
+# worker thread → {model: NuRVSession}
+_local    = threading.local()
+_sessions = []
+_sessions_lock = threading.Lock()
+
+
+def _run_session_job(job, trace, stop_on_final) -> dict:
+    model, _ = job
+    _, past = MODELS[os.path.basename(model)]
+    t0 = time.perf_counter()
+    mine = getattr(_local, "sessions", None)
+    if mine is None:
+        mine = _local.sessions = {}
+    session = mine.get(model)
+    if session is None:
+        session = mine[model] = NuRVSession(model, past)
+        with _sessions_lock:
+            _sessions.append(session)
+    try:
+        first_step, first_time, total, timer = session.verify(trace.path,
+                                                              stop_on_final)
+    except Exception:
+        # the process is gone or out of step with its markers: start over
+        del mine[model]
+        with _sessions_lock:
+            _sessions.remove(session)
+        session.close()
+        raise
+    res = _result(job, past, time.perf_counter() - t0, total,
+                  first_step, first_time, timer)
+    res["session_trace"] = session.traces
+    return res
+
+
+def _result(job, past, wall, total, first_step, first_time, timer) -> dict:
+    model, csv_path = job
+    return {
+        "model":           os.path.basename(model),
+        "trace":           csv_path,
+        "mode":            "past" if past else "future",
+        "process_wall_s":  wall,
+        "monitor_s":       total,
+        "startup_s":       wall - total,
+        "steps":           timer.hist.count,
+        "first_violation": first_step,
+        "first_time_s":    first_time,
+        "step_base":       1,
+        "latency_ns":      timer.summary(),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("traces", nargs="+", help="CSV traces")
+    ap.add_argument("--models", nargs="+", default=list(MODELS),
+                    choices=list(MODELS), metavar="MODEL",
+                    help=f"models in NuRV/models (default: all of {', '.join(MODELS)})")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="concurrent NuRV processes")
+    ap.add_argument("--stop-on-final", action="store_true",
+                    help="terminate each NuRV job at its first violation")
+    ap.add_argument("--session", action="store_true",
+                    help="reuse one interactive NuRV process per model and worker")
+    ap.add_argument("--jsonl", help="append each job result to this file as it finishes")
+    ap.add_argument("--out", default="nurv_batch.json")
+    args = ap.parse_args()
+
+    if not os.access(NURV_CMD, os.X_OK):
+        sys.exit(f"NuRV binary not found: {NURV_CMD} (set NURV_CMD)")
+
+    args.traces = list(dict.fromkeys(args.traces))
+    jobs = [(os.path.join(MODELS_DIR, m), t) for m in args.models
+            for t in args.traces]
+    start = time.perf_counter()
+
+    # ── 1. one conversion per (trace, variable set) ─────────────────────
+    conversions = sorted({(t, MODELS[m][0]) for m in args.models
+                          for t in args.traces})
+    with ProcessPoolExecutor(max_workers=min(args.workers,
+                                             len(conversions))) as pool:
+        traces = dict(pool.map(_convert, conversions))
+    convert_s = time.perf_counter() - start
+    hits = sum(t.hit for t in traces.values())
+    print(f"⏱ {len(conversions)} traces ready in {convert_s:.3f} s "
+          f"({hits} cache hits)")
+
+    # ── 2. NuRV jobs on a bounded pool ──────────────────────────────────
+    results = {}
+    run  = _run_session_job if args.session else _run_job
+    sink = open(args.jsonl, "a", encoding="utf-8") if args.jsonl else None
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futures = {
+                pool.submit(run, job,
+                            traces[(job[1], MODELS[os.path.basename(job[0])][0])],
+                            args.stop_on_final): job
+                for job in jobs}
+            for fut in as_completed(futures):
+                job = futures[fut]
+                try:
+                    res = fut.result()
+                except Exception as exc:
+                    res = {"model": os.path.basename(job[0]), "trace": job[1],
+                           "error": str(exc)}
+                    print(f"✘ {res['model']:<24} {job[1]}: {exc}")
+                else:
+                    fv = res["first_violation"]
+                    print(f"▶ {res['model']:<24} {os.path.basename(job[1]):<32} "
+                          f"{res['process_wall_s']:8.3f} s  "
+                          + ("no violation" if fv is None else f"violation at {fv}"))
+                results[job] = res
+                if sink:
+                    sink.write(json.dumps(res, sort_keys=True) + "\n")
+                    sink.flush()
+    finally:
+        if sink:
+            sink.close()
+        for session in _sessions:
+            session.close()
+        for trace in traces.values():
+            if trace.temporary:
+                os.remove(trace.path)
+    wall = time.perf_counter() - start
+
+    # ── 3. aggregated report ─────────────────────────────────────────────
+    ordered = [results[job] for job in jobs]
+    serial  = sum(r.get("process_wall_s", 0) for r in ordered)
+    print(f"\n{'model':<24} {'trace':<32} {'steps':>9} {'wall [s]':>9} "
+          f"{'startup [s]':>11} {'first violation':>16}")
+    for r in ordered:
+        if "error" in r:
+            print(f"{r['model']:<24} {os.path.basename(r['trace']):<32} error")
+            continue
+        fv = r["first_violation"]
+        print(f"{r['model']:<24} {os.path.basename(r['trace']):<32} "
+              f"{r['steps']:>9} {r['process_wall_s']:>9.3f} {r['startup_s']:>11.3f} "
+              f"{'–' if fv is None else fv:>16}")
+    print(f"▶ {len(jobs)} jobs on {args.workers} workers: {wall:.3f} s wall "
+          f"(sum of job times {serial:.3f} s, ×{serial / wall if wall else 0:.2f})")
+    if args.session:
+        print(f"⏱ {len(_sessions)} NuRV sessions, start-up + monitor build "
+              f"{sum(x.startup_s for x in _sessions):.3f} s in total")
+
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump({"meta": {"workers": args.workers, "wall_s": wall,
+                            "session": args.session,
+                            "sessions": len(_sessions),
+                            "convert_s": convert_s, "sum_job_s": serial,
+                            "date": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                   "jobs": ordered}, fh, indent=2)
+    print(f"Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Shrink the integer domains of an SMV model to what a trace contains.
+
+Scans the trace once for the values of x, y, z and rewrites the model's
+``v : lo..hi;`` declarations (and their ``prev_v`` copies):
+
+  --mode range   tight observed ``lo..hi``; the trace encoding is unchanged
+  --mode dense   ``0..k-1`` over the k distinct values; the XML trace is
+                 rewritten with the same index and a ``<model>.dense.json``
+                 map is written for the online driver (``--remap``).  Only
+                 for models that compare the variables with each other for
+                 equality; a model using ``<``, ``>``, arithmetic or integer
+                 constants on them is refused (use ``--mode range``).
+
+With ``--bench`` the original and tightened model are both run through
+``go`` + ``build_monitor`` and a full offline verification, and the
+speedups are reported; the first violations have to agree.
+
+  python tools/tighten_smv.py NuRV/models/not_stopping_past.smv \\
+      data/tool_tip_simulation_augmented.csv --mode dense -o tight/ --bench
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.nurv import NURV_CMD, make_cmd, nurv_build, run_nurv
+from common.nurv_trace import cached_trace, write_trace
+from common.smv import (INT_VARIABLES, declared_domains, dense_conflicts,
+                        dense_maps, infer_domains, is_past, tighten)
+
+
+def _bits(lo: int, hi: int) -> int:
+    return max(1, (hi - lo).bit_length())
+
+
+def verify(model: str, xml: str, past: bool) -> dict:
+    fd, cmd = tempfile.mkstemp(suffix=".cmd")
+    os.close(fd)
+    try:
+        make_cmd(xml, cmd, past)
+        t0 = time.perf_counter()
+        first_step, _, total, timer = run_nurv(model, cmd)
+        wall = time.perf_counter() - t0
+    finally:
+        os.remove(cmd)
+    return {"process_wall_s": wall, "monitor_s": total,
+            "first_violation": first_step, "latency_ns": timer.summary()}
+
+
+def bench(model: str, xml: str, past: bool, trials: int) -> dict:
+    builds = [nurv_build(model) for _ in range(trials)]
+    runs   = [verify(model, xml, past) for _ in range(trials)]
+    return {"build_s":         statistics.median(b[0] for b in builds),
+            "build_rss_kb":    max(b[1] for b in builds),
+            "verify_s":        statistics.median(r["process_wall_s"] for r in runs),
+            "monitor_s":       statistics.median(r["monitor_s"] for r in runs),
+            "first_violation": runs[-1]["first_violation"],
+            "latency_ns":      runs[-1]["latency_ns"]}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("smv_file")
+    ap.add_argument("csv_file")
+    ap.add_argument("--mode", choices=("range", "dense"), default="range")
+    ap.add_argument("-o", "--out-dir", default=".")
+    ap.add_argument("--bench", action="store_true",
+                    help="time build_monitor and verification, before and after")
+    ap.add_argument("--trials", type=int, default=3)
+    args = ap.parse_args()
+
+    with open(args.smv_file) as fh:
+        text = fh.read()
+    declared = declared_domains(text)
+    used     = [v for v in INT_VARIABLES if v in declared]
+    if not used:
+        sys.exit(f"{args.smv_file} declares none of {', '.join(INT_VARIABLES)}")
+    dense = args.mode == "dense"
+    conflicts = dense_conflicts(text, used) if dense else []
+    if conflicts:
+        sys.exit(f"✘ {args.smv_file} does more than compare {', '.join(used)} "
+                 f"for equality, so --mode dense would change its meaning "
+                 f"(use --mode range):\n  " + "\n  ".join(conflicts))
+
+    t0      = time.perf_counter()
+    domains = infer_domains(args.csv_file, used)
+    print(f"⏱ Scanned {args.csv_file} in {time.perf_counter() - t0:.3f} s")
+    missing = [v for v in used if v not in domains]
+    if missing:
+        sys.exit(f"✘ {args.csv_file} has no usable row for {', '.join(missing)} "
+                 f"(six columns, integer coordinates); cannot infer a domain")
+
+    print(f"{'variable':<8} {'declared':>10} {'observed':>10} {'distinct':>9} "
+          f"{'bits':>9}")
+    for v in used:
+        lo, hi = declared[v]
+        d      = domains[v]
+        new    = _bits(0, len(d.values) - 1) if dense else _bits(d.lo, d.hi)
+        print(f"{v:<8} {f'{lo}..{hi}':>10} {f'{d.lo}..{d.hi}':>10} "
+              f"{len(d.values):>9} {f'{_bits(lo, hi)} → {new}':>9}")
+        if d.lo < lo or d.hi > hi:
+            print(f"⚠ {v}: trace values fall outside the declared {lo}..{hi}")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    stem   = os.path.splitext(os.path.basename(args.smv_file))[0]
+    tight  = os.path.join(args.out_dir, f"{stem}.{args.mode}.smv")
+    with open(tight, "w") as fh:
+        fh.write(tighten(text, domains, dense))
+    print(f"Model written to {tight}")
+
+    past  = is_past(text)
+    trace = cached_trace(args.csv_file, tuple(used))
+    xml   = trace.path
+    if dense:
+        maps = dense_maps(domains)
+        xml  = os.path.join(args.out_dir, f"{stem}.dense.xml")
+        write_trace(args.csv_file, xml, tuple(used), maps)
+        with open(os.path.join(args.out_dir, f"{stem}.dense.json"), "w") as fh:
+            json.dump({v: d.values for v, d in domains.items()}, fh)
+        print(f"Dense trace written to {xml}, value map to "
+              f"{os.path.join(args.out_dir, stem + '.dense.json')}")
+
+    try:
+        if not args.bench:
+            return
+        if not os.access(NURV_CMD, os.X_OK):
+            sys.exit(f"NuRV binary not found: {NURV_CMD} (set NURV_CMD)")
+        before = bench(args.smv_file, trace.path, past, args.trials)
+        after  = bench(tight, xml, past, args.trials)
+        print(f"\n{'':<10} {'build [s]':>10} {'RSS [MiB]':>10} {'verify [s]':>11} "
+              f"{'p99 [µs]':>9} {'first violation':>16}")
+        for name, r in (("declared", before), (args.mode, after)):
+            print(f"{name:<10} {r['build_s']:>10.3f} {r['build_rss_kb'] / 1024:>10.1f} "
+                  f"{r['verify_s']:>11.3f} {r['latency_ns']['p99'] / 1e3:>9.1f} "
+                  f"{'–' if r['first_violation'] is None else r['first_violation']:>16}")
+        print(f"▶ build_monitor ×{before['build_s'] / after['build_s']:.2f}, "
+              f"verification ×{before['verify_s'] / after['verify_s']:.2f}")
+        if before["first_violation"] != after["first_violation"]:
+            print("✘ The tightened model reports a different first violation")
+            sys.exit(1)
+    finally:
+        if trace.temporary:
+            os.remove(trace.path)
+
+
+if __name__ == "__main__":
+    main()